@@ -0,0 +1,67 @@
+'''
+Micro-benchmarks of the vectorised acquisition functions (hullopt.gps.acquisitions) against the previous per-element
+implementations in Aggregator, on one 180 point heel grid and on many hulls' grids stacked in one call. Also checks they agree.
+Run from the repository root: python benchmarks/bench_acquisitions.py
+'''
+import sys
+import os
+import timeit
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import numpy as np
+from scipy.stats import norm
+from hullopt.gps.acquisitions import get_acquisition
+
+N_GRID = 180
+N_HULLS = 100
+REPEATS = 200
+
+
+# The previous implementations, as they were in hullopt/gps/aggregator.py
+def a_EI_max(f_star, Xs, mu, varSigma):
+    sigma = np.sqrt(varSigma)
+    alpha = np.zeros_like(mu)
+    nonzero = sigma > 0
+    z = (mu[nonzero] - f_star) / sigma[nonzero]
+    alpha[nonzero] = ((mu[nonzero] - f_star) * norm.cdf(z) + sigma[nonzero] * norm.pdf(z))
+    return alpha
+
+
+def a_SC(dim, ndim, Xs, mu, varSigma):
+    return np.asarray([norm.pdf(0, m[0], s[0]).item() if dim < x < ndim else 0 for (x, (m, s)) in zip(Xs, zip(mu, np.sqrt(varSigma)))])
+
+
+def a_INT(bounds, Xs, mu, varSigma):
+    return np.asarray([varSigma[i][0] if bounds[0] <= x < bounds[1] else 0 for i, x in enumerate(Xs)])
+
+
+def _time(f, repeats=REPEATS):
+    return min(timeit.repeat(f, number=1, repeat=repeats))
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    Xs = np.linspace(0, np.pi, N_GRID)
+    mu = 50 * np.sin(Xs)[None, :] * rng.uniform(0.5, 2, (N_HULLS, 1)) + rng.normal(0, 5, (N_HULLS, N_GRID))
+    var = rng.uniform(0.1, 30, (N_HULLS, N_GRID))
+    sigma = np.sqrt(var)
+    f_star, lower, upper = rng.uniform(20, 60, N_HULLS), rng.uniform(0.3, 1, N_HULLS), rng.uniform(2, 3, N_HULLS)
+
+    cases = {
+        "expected_improvement": (lambda h: a_EI_max(f_star[h], Xs, mu[h][:, None], var[h][:, None])[:, 0], dict(f_star=f_star)),
+        "sign_change": (lambda h: a_SC(lower[h], upper[h], Xs, mu[h][:, None], var[h][:, None]), dict(lower=lower, upper=upper)),
+        "max_variance": (lambda h: a_INT((lower[h], upper[h]), Xs, mu[h][:, None], var[h][:, None]), dict(lower=lower, upper=upper)),
+    }
+    print(f"{N_GRID} point grid, {N_HULLS} hulls stacked")
+    for name, (previous, params) in cases.items():
+        acquisition = get_acquisition(name)
+        stacked = acquisition(Xs, mu, sigma, **params)
+        for h in range(N_HULLS):
+            single = acquisition(Xs, mu[h], sigma[h], **{k: v[h] for k, v in params.items()})
+            assert np.allclose(previous(h), single, rtol=1e-10, atol=0) and np.array_equal(single, stacked[h])
+
+        previous_one = _time(lambda: previous(0))
+        one = _time(lambda: acquisition(Xs, mu[0], sigma[0], **{k: v[0] for k, v in params.items()}))
+        previous_all = _time(lambda: [previous(h) for h in range(N_HULLS)], REPEATS // 20)
+        all_stacked = _time(lambda: acquisition(Xs, mu, sigma, **params), REPEATS // 20)
+        print(f"{name:>20}: one grid {previous_one * 1e6:8.1f} us -> {one * 1e6:6.1f} us ({previous_one / one:5.1f}x), "
+              f"{N_HULLS} grids {previous_all * 1e3:7.2f} ms -> {all_stacked * 1e3:5.2f} ms ({previous_all / all_stacked:5.1f}x)")
@@ -0,0 +1,66 @@
+'''
+Benchmark of Aggregator.f's batch (q-point) acquisition against one heel per round: wall-clock per hull,
+simulations and the resulting metrics, from GPs trained on a few random hulls, for another random hull (one with positive initial stability, which f requires).
+Run from the repository root: python benchmarks/bench_batch_acquisition.py
+'''
+import sys
+import os
+import time
+import tempfile
+import contextlib
+from copy import deepcopy
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import matplotlib
+matplotlib.use("Agg")
+import numpy as np
+from hullopt import Hull
+from hullopt.hull.utils import generate_random_hulls
+from hullopt.simulations import analytic
+from hullopt.simulations.storage import ResultStorage
+from hullopt.gps.gp import GaussianProcessSurrogate
+from hullopt.config import hyperparameters
+from hullopt.gps.aggregator import Aggregator, CONVERGENCE_METRICS
+from hullopt.gps.strategies.kernels import ConfigurablePhysicsKernel
+from hullopt.gps.strategies.priors import ZeroMeanPrior
+
+N_TRAINING_HULLS = 4
+N_TRAINING_HEELS = 24
+BUDGET = 60
+BATCH_SIZES = (1, 4)
+KERNEL_CONFIG = {"length": "rbf", "beam": "rbf", "depth": "rbf", "heel": "periodic"}
+USER_WEIGHTS = {"overall_stability": 1, "initial_stability": 1, "diminishing_stability": 1, "tipping_point": 1,
+                "righting_energy": 1, "overall_buoyancy": 1, "initial_buoyancy": 1}
+
+
+if __name__ == "__main__":
+    directory = tempfile.mkdtemp()
+    analytic.storage = ResultStorage(os.path.join(directory, "training.db"))
+    hulls = generate_random_hulls(N_TRAINING_HULLS + 10, seed=1)
+    for hull in hulls[:N_TRAINING_HULLS]:
+        analytic.run_sweep(hull, np.linspace(0, np.pi, N_TRAINING_HEELS))
+    X, y, columns = analytic.storage.to_arrays()
+    gp_righting = GaussianProcessSurrogate(ConfigurablePhysicsKernel(KERNEL_CONFIG), ZeroMeanPrior())
+    gp_buoyancy = GaussianProcessSurrogate(ConfigurablePhysicsKernel(KERNEL_CONFIG), ZeroMeanPrior())
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        gp_righting.fit(X, y[:, :1], columns)
+        gp_buoyancy.fit(X, y[:, -2:], columns)
+
+    hull = next(hull for hull in hulls[N_TRAINING_HULLS:] if analytic.run_sweep(hull, [np.pi / 179], use_cache=False).righting_moments[0, 0] > 0)
+    print(f"{os.cpu_count()} CPUs, budget {BUDGET}")
+    for batch_size in BATCH_SIZES:
+        # A fresh store per mode, so neither is served the other's simulations
+        analytic.storage = ResultStorage(os.path.join(directory, f"batch_{batch_size}.db"))
+        aggregator = Aggregator(USER_WEIGHTS, deepcopy(gp_righting), deepcopy(gp_buoyancy), columns, plot_n_steps=0, batch_size=batch_size)
+        np.random.seed(0)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(open(os.devnull, "w")):
+            score, metrics = aggregator.f(Hull(hull.params), budget=BUDGET)
+        elapsed = time.perf_counter() - start
+        assert aggregator._pool is None  # f shuts its worker pool down
+        n_samples = aggregator.gp_righting.model.num_data - len(X)
+        # Picks reserve their cost from their metric's budget, so a batch samples each metric no more than one heel per round would:
+        # the 3 anchors, then up to ceil(budget / cost) heels per sampled metric (the initial metrics are not added to the GP)
+        per_metric = np.ceil(BUDGET / sum(USER_WEIGHTS.values()) / hyperparameters.cost_analytic(hyperparameters.hydrostatic_table_iterations))
+        assert n_samples <= 3 + len(CONVERGENCE_METRICS) * per_metric
+        print(f"q={batch_size}: {elapsed:6.1f} s, {n_samples} righting GP samples, score {score:.4f}, "
+              f"tipping point {metrics['tipping_point']:.3f}, diminishing stability {metrics['diminishing_stability']:.1f}")
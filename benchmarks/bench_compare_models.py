@@ -0,0 +1,82 @@
+'''
+Benchmark of parallel GP fitting: compare_models' (model, fraction) grid and multi-restart hyperparameter optimisation,
+serially (workers=1, the previous behaviour) against a process pool (one worker per CPU).
+Run from the repository root: python benchmarks/bench_compare_models.py
+'''
+import sys
+import os
+import time
+import tempfile
+import contextlib
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import matplotlib
+matplotlib.use("Agg")
+import numpy as np
+from hullopt.gps.gp import GaussianProcessSurrogate
+from hullopt.gps.strategies.compare import compare_models
+from hullopt.gps.strategies.kernels import ConfigurablePhysicsKernel
+from hullopt.gps.strategies.priors import ZeroMeanPrior
+
+N_TRAIN = 300
+N_TEST = 200
+NUM_RESTARTS = 4
+COLUMNS = ["beam", "depth", "heel", "length"]
+KERNEL_CONFIGS = {
+    "RBF": {"length": "rbf", "beam": "rbf", "depth": "rbf", "heel": "rbf"},
+    "Periodic heel": {"length": "rbf", "beam": "rbf", "depth": "rbf", "heel": "periodic"},
+    "Matern": {"length": "matern52", "beam": "matern52", "depth": "matern52", "heel": "periodic_matern"},
+}
+
+
+def _synthetic(n, rng):
+    length = rng.uniform(2.0, 4.5, n)
+    beam = length / rng.uniform(3.0, 7.5, n)
+    depth = beam / rng.uniform(1.5, 3.0, n)
+    heel = rng.uniform(0, 2 * np.pi, n)
+    moment = -1000 * beam ** 2 / depth * np.sin(heel) * np.cos(heel / 2) ** 2 + rng.normal(0, 1, n)
+    return np.stack([beam, depth, heel, length], axis=1), moment[:, None]
+
+
+def _models(**kwargs):
+    return {name: GaussianProcessSurrogate(ConfigurablePhysicsKernel(config), ZeroMeanPrior(), **kwargs) for name, config in KERNEL_CONFIGS.items()}
+
+
+def _time(f):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        f()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    X, y = _synthetic(N_TRAIN + N_TEST, rng)
+    X_train, y_train, X_test, y_test = X[:N_TRAIN], y[:N_TRAIN], X[N_TRAIN:], y[N_TRAIN:]
+    os.chdir(tempfile.mkdtemp())
+    os.makedirs("models")
+    print(f"{os.cpu_count()} CPUs")
+
+    serial_models, parallel_models = _models(), _models()
+    serial = _time(lambda: compare_models(serial_models, X_train, y_train, X_test, y_test, COLUMNS, workers=1))
+    parallel = _time(lambda: compare_models(parallel_models, X_train, y_train, X_test, y_test, COLUMNS, workers=0))
+    for name in KERNEL_CONFIGS:
+        assert parallel_models[name].model is not None and parallel_models[name].model.num_data == N_TRAIN
+    print(f"compare_models, {len(KERNEL_CONFIGS)} models x 5 fractions: serial {serial:.1f} s, parallel {parallel:.1f} s ({serial / parallel:.2f}x)")
+
+    gps = {}
+    for workers in (1, 0):
+        gps[workers] = GaussianProcessSurrogate(ConfigurablePhysicsKernel(KERNEL_CONFIGS["Periodic heel"]), ZeroMeanPrior(), num_restarts=NUM_RESTARTS, workers=workers)
+    serial = _time(lambda: gps[1].fit(X_train, y_train, COLUMNS))
+    parallel = _time(lambda: gps[0].fit(X_train, y_train, COLUMNS))
+    print(f"Fit with {NUM_RESTARTS} restarts: serial {serial:.1f} s, parallel {parallel:.1f} s ({serial / parallel:.2f}x)")
+
+    # Warm starting from a fitted model's hyperparameters
+    cold = GaussianProcessSurrogate(ConfigurablePhysicsKernel(KERNEL_CONFIGS["Periodic heel"]), ZeroMeanPrior())
+    warm = GaussianProcessSurrogate(ConfigurablePhysicsKernel(KERNEL_CONFIGS["Periodic heel"]), ZeroMeanPrior())
+    warm.warm_start(gps[0].model)
+    X_more, y_more = _synthetic(N_TRAIN, rng)
+    X_more, y_more = np.vstack([X_train, X_more]), np.vstack([y_train, y_more])
+    cold_time = _time(lambda: cold.fit(X_more, y_more, COLUMNS))
+    warm_time = _time(lambda: warm.fit(X_more, y_more, COLUMNS))
+    print(f"Refit on {len(X_more)} rows: cold {cold_time:.1f} s (log likelihood {cold.model.log_likelihood():.1f}), "
+          f"warm started {warm_time:.1f} s (log likelihood {warm.model.log_likelihood():.1f})")
@@ -0,0 +1,103 @@
+'''
+Benchmark of Constraints.check_params_batch against check_params called per candidate, on many random candidate hulls
+(checking both agree), and of generate_random_hulls against its previous one-candidate-at-a-time loop (checking both give the same hulls, without the current one touching the global random state).
+Run from the repository root: python benchmarks/bench_constraint_batch.py
+'''
+import sys
+import os
+import time
+import contextlib
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import numpy as np
+from dataclasses import asdict
+from hullopt.hull import hull as hull_module
+from hullopt.hull.hull import Hull
+from hullopt.hull.cache import MeshCache
+from hullopt.hull.params import Params
+from hullopt.hull.constraints import Constraints
+from hullopt.hull.utils import generate_random_hulls
+
+N_CANDIDATES = 100_000
+N_HULLS = 20
+WIDEN = 0.1  # Candidates are drawn from ranges extending this fraction of their width past the constraints
+
+
+def previous_generate_random_hulls(n, cockpit_opening=False, seed=42):
+    # generate_random_hulls as it was, less comments
+    np.random.seed(seed)
+    constraints = Constraints()
+    hulls = []
+    for _ in range(n):
+        while True:
+            length = np.random.uniform(*constraints.length_range)
+            beam = length / np.random.uniform(*constraints.length_to_beam_ratio_range)
+            depth = beam / np.random.uniform(*constraints.beam_to_depth_ratio_range)
+            cross_section_exponent = np.random.uniform(*constraints.cross_section_exponent_range)
+            beam_position = np.random.uniform(*constraints.beam_position_range)
+            rocker_position = 0.5
+            rocker_exponent = np.random.uniform(*constraints.rocker_exponent_range)
+            rocker_bow = np.random.uniform(*constraints.rocker_bow_range)
+            rocker_stern = np.random.uniform(max(rocker_bow - 0.05, constraints.rocker_stern_range[0]),
+                                             min(rocker_bow, constraints.rocker_stern_range[1]))
+            hull_thickness = np.random.uniform(*constraints.hull_thickness_range)
+            cockpit_length = np.random.uniform(*constraints.cockpit_length_ratio_range) * length
+            cockpit_width = np.random.uniform(*constraints.cockpit_width_ratio_range) * beam
+            cockpit_position = np.random.uniform(*constraints.cockpit_position_range)
+            valid = (constraints.length_to_beam_ratio_range[0] <= length / beam <= constraints.length_to_beam_ratio_range[1]
+                     and constraints.beam_to_depth_ratio_range[0] <= beam / depth <= constraints.beam_to_depth_ratio_range[1]
+                     and rocker_stern <= rocker_bow)
+            if valid:
+                params = Params(density=900.0, hull_thickness=hull_thickness, length=length, beam=beam, depth=depth,
+                                cross_section_exponent=cross_section_exponent, beam_position=beam_position, rocker_bow=rocker_bow,
+                                rocker_stern=rocker_stern, rocker_position=rocker_position, rocker_exponent=rocker_exponent,
+                                cockpit_opening=cockpit_opening, cockpit_length=cockpit_length, cockpit_width=cockpit_width,
+                                cockpit_position=cockpit_position)
+                try:
+                    hull = Hull(params)
+                except:
+                    continue
+                hulls.append(hull)
+                break
+    return hulls
+
+
+if __name__ == "__main__":
+    constraints = Constraints()
+    rng = np.random.default_rng(0)
+    ranges = {"length": constraints.length_range, "beam": (0.2, 1.5), "depth": (0.07, 1.0)}
+    ranges.update({c: getattr(constraints, f"{c}_range") for c in Constraints.PARAM_COLUMNS if c not in ranges})
+    candidates = np.stack([rng.uniform(lo - WIDEN * (hi - lo), hi + WIDEN * (hi - lo), N_CANDIDATES)
+                           for lo, hi in (ranges[c] for c in Constraints.PARAM_COLUMNS)], axis=1)
+
+    start = time.perf_counter()
+    mask, violations = constraints.check_params_batch(candidates)
+    batch_time = time.perf_counter() - start
+
+    hull_module.mesh_cache = MeshCache(directory=None)
+    template = asdict(generate_random_hulls(1, seed=0)[0].params)
+    params = [Params(**{**template, **dict(zip(Constraints.PARAM_COLUMNS, row))}) for row in candidates]
+    loop_mask = np.zeros(N_CANDIDATES, dtype=bool)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        for i, p in enumerate(params):
+            try:
+                loop_mask[i] = constraints.check_params(p)
+            except ValueError:
+                pass
+    loop_time = time.perf_counter() - start
+    assert np.array_equal(mask, loop_mask)
+    assert np.array_equal(mask, np.all([v == 0 for v in violations.values()], axis=0))
+    print(f"{N_CANDIDATES} candidates, {mask.sum()} valid: check_params per candidate {loop_time:.2f} s, "
+          f"check_params_batch {batch_time * 1e3:.1f} ms ({loop_time / batch_time:.0f}x)")
+
+    for name, generate in (("previous", previous_generate_random_hulls), ("current", generate_random_hulls)):
+        hull_module.mesh_cache = MeshCache(directory=None)  # Each meshes from scratch
+        np.random.seed(0)
+        start = time.perf_counter()
+        hulls = generate(N_HULLS, seed=7)
+        elapsed = time.perf_counter() - start
+        if name == "previous":
+            reference = [asdict(h.params) for h in hulls]
+        print(f"generate_random_hulls ({name}), {N_HULLS} hulls: {elapsed:.2f} s")
+    # The same hulls, drawn from a private stream rather than the global one
+    assert [asdict(h.params) for h in hulls] == reference and np.random.random() == np.random.RandomState(0).random_sample()
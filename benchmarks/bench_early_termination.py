@@ -0,0 +1,69 @@
+'''
+Benchmark of Aggregator.f's early termination: simulations, wall-clock and metrics per hull when each metric stops sampling once its
+posterior std is within tolerance, against spending the whole budget. For a hull the GPs were trained on (well explored) and a new one.
+Run from the repository root: python benchmarks/bench_early_termination.py
+'''
+import sys
+import os
+import time
+import tempfile
+import contextlib
+from copy import deepcopy
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import numpy as np
+from hullopt import Hull
+from hullopt.config import hyperparameters
+from hullopt.hull.utils import generate_random_hulls
+from hullopt.simulations import analytic
+from hullopt.simulations.storage import ResultStorage
+from hullopt.gps.gp import GaussianProcessSurrogate
+from hullopt.gps.aggregator import Aggregator, CONVERGENCE_METRICS
+from hullopt.gps.strategies.kernels import ConfigurablePhysicsKernel
+from hullopt.gps.strategies.priors import ZeroMeanPrior
+
+N_TRAINING_HULLS = 8
+N_TRAINING_HEELS = 24
+BUDGET = 160
+TOLERANCE = 0.02  # Of each metric's weight normaliser
+KERNEL_CONFIG = {"length": "rbf", "beam": "rbf", "depth": "rbf", "heel": "periodic"}
+USER_WEIGHTS = {"overall_stability": 1, "initial_stability": 1, "diminishing_stability": 1, "tipping_point": 1,
+                "righting_energy": 1, "overall_buoyancy": 1, "initial_buoyancy": 1}
+
+
+def _positive(hull):
+    return analytic.run_sweep(hull, [np.pi / 179], use_cache=False).righting_moments[0, 0] > 0
+
+
+if __name__ == "__main__":
+    directory = tempfile.mkdtemp()
+    analytic.storage = ResultStorage(os.path.join(directory, "training.db"))
+    hulls = generate_random_hulls(N_TRAINING_HULLS + 10, seed=1)
+    for hull in hulls[:N_TRAINING_HULLS]:
+        analytic.run_sweep(hull, np.linspace(0, np.pi, N_TRAINING_HEELS))
+    X, y, columns = analytic.storage.to_arrays()
+    gp_righting = GaussianProcessSurrogate(ConfigurablePhysicsKernel(KERNEL_CONFIG), ZeroMeanPrior())
+    gp_buoyancy = GaussianProcessSurrogate(ConfigurablePhysicsKernel(KERNEL_CONFIG), ZeroMeanPrior())
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        gp_righting.fit(X, y[:, :1], columns)
+        gp_buoyancy.fit(X, y[:, -2:], columns)
+
+    tolerances = {k: TOLERANCE * hyperparameters.weight_normalisers[k] for k in CONVERGENCE_METRICS}
+    print(f"Budget {BUDGET}, tolerances {', '.join(f'{k} {v:.3g}' for k, v in tolerances.items())}")
+    test_hulls = {"trained": next(filter(_positive, hulls[:N_TRAINING_HULLS])), "new": next(filter(_positive, hulls[N_TRAINING_HULLS:]))}
+    for hull_name, hull in test_hulls.items():
+        results = {}
+        for mode, mode_tolerances in (("full budget", {}), ("early termination", tolerances)):
+            # A fresh store per run, so neither is served the other's simulations
+            analytic.storage = ResultStorage(os.path.join(directory, f"{hull_name}_{len(mode_tolerances)}.db"))
+            aggregator = Aggregator(USER_WEIGHTS, deepcopy(gp_righting), deepcopy(gp_buoyancy), columns, plot_n_steps=0, verbose=False, tolerances=mode_tolerances)
+            np.random.seed(0)
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(open(os.devnull, "w")):
+                score, metrics = aggregator.f(Hull(hull.params), budget=BUDGET)
+            elapsed = time.perf_counter() - start
+            n_samples = aggregator.gp_righting.model.num_data - len(X)
+            results[mode] = metrics
+            unused = sum(aggregator.unused_budget.values())
+            print(f"{hull_name:>7} hull, {mode:>17}: {elapsed:5.1f} s, {n_samples:3d} simulations, unused budget {unused:5.1f}, score {score:.4f}")
+        for k in CONVERGENCE_METRICS:
+            print(f"{'':>9}{k}: {results['full budget'][k]:.4g} vs {results['early termination'][k]:.4g} (tolerance {tolerances[k]:.3g})")
@@ -0,0 +1,80 @@
+'''
+Benchmark of the array-based simple hull generator against the original per-point loop.
+Run from the repository root: python benchmarks/bench_generation.py
+'''
+import sys
+import os
+import timeit
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import numpy as np
+from trimesh import Trimesh
+from hullopt.hull.generation import super_ellipse, generate_simple_hull, simple_hull_arrays
+
+PARAMS = dict(length=2.6, beam=0.65, depth=0.35, cross_section_exponent=2.0, beam_position=0.5)
+RESOLUTIONS = {"1x": (60, 32), "4x": (120, 64), "16x": (240, 128)}
+BATCH_SIZE = 64
+
+
+def _generate_simple_hull_loop(length, beam, depth, cross_section_exponent, beam_position, N_STATIONS=60, N_POINTS=32, type='outer') -> Trimesh:
+    """
+    The original nested-loop generator, kept here as the reference implementation
+    """
+    vertices = []
+    faces = []
+    stat_vals = np.linspace(0, 1.0, N_STATIONS)
+    angle_vals = np.linspace(0, 2 * np.pi, N_POINTS, endpoint=False)
+    for stat in stat_vals:
+        x_pos = length * stat
+        if stat <= beam_position:
+            width_taper_factor = np.sin((stat / beam_position) * (np.pi / 2.0))
+        else:
+            width_taper_factor = np.sin(((stat - beam_position) / (1.0 - beam_position)) * (np.pi / 2.0) + (np.pi / 2.0))
+        curr_width = max(beam * width_taper_factor, 1e-4)
+        curr_depth = max(depth * width_taper_factor, 1e-4)
+        for angle in angle_vals:
+            if 0 <= angle <= np.pi:
+                y_pos, z_raw = super_ellipse(angle, curr_width / 2.0, curr_depth, cross_section_exponent)
+                z_pos = -np.abs(z_raw)
+            else:
+                y_pos, z_raw = super_ellipse(angle, curr_width / 2.0, curr_depth, n=2.0)
+                z_pos = np.abs(z_raw) * (0.2 if type == 'outer' else 0.1)
+            vertices.append([x_pos, y_pos, z_pos])
+    for i in range(N_STATIONS - 1):
+        for j in range(N_POINTS):
+            curr_stat_idx = i * N_POINTS + j
+            curr_stat_next_idx = i * N_POINTS + ((j + 1) % N_POINTS)
+            next_stat_idx = (i + 1) * N_POINTS + j
+            next_stat_next_idx = (i + 1) * N_POINTS + ((j + 1) % N_POINTS)
+            faces.append([curr_stat_idx, curr_stat_next_idx, next_stat_next_idx])
+            faces.append([curr_stat_idx, next_stat_next_idx, next_stat_idx])
+    bow_tip_idx = len(vertices)
+    stern_tip_idx = len(vertices) + 1
+    vertices.append([0.0, 0.0, 0.0])
+    vertices.append([length, 0.0, 0.0])
+    for j in range(N_POINTS):
+        next_j = (j + 1) % N_POINTS
+        faces.append([bow_tip_idx, j, next_j])
+        last_ring_start = (N_STATIONS - 1) * N_POINTS
+        faces.append([stern_tip_idx, last_ring_start + next_j, last_ring_start + j])
+    hull_mesh = Trimesh(vertices=np.array(vertices), faces=np.array(faces), process=True)
+    hull_mesh.fix_normals()
+    return hull_mesh
+
+
+def _best_of(f, repeat=5):
+    return min(timeit.repeat(f, number=1, repeat=repeat))
+
+
+if __name__ == "__main__":
+    stacked = np.tile([PARAMS[k] for k in ("length", "beam", "depth", "cross_section_exponent", "beam_position")], (BATCH_SIZE, 1))
+    print(f"{'resolution':>10} {'loop (ms)':>10} {'array (ms)':>11} {'speedup':>8} {'batch/hull (ms)':>16}")
+    for name, (n_stations, n_points) in RESOLUTIONS.items():
+        reference = _generate_simple_hull_loop(**PARAMS, N_STATIONS=n_stations, N_POINTS=n_points)
+        vectorised = generate_simple_hull(**PARAMS, N_STATIONS=n_stations, N_POINTS=n_points)
+        assert np.array_equal(reference.faces, vectorised.faces)
+        assert np.allclose(reference.vertices, vectorised.vertices, rtol=0, atol=1e-12)
+
+        t_loop = _best_of(lambda: _generate_simple_hull_loop(**PARAMS, N_STATIONS=n_stations, N_POINTS=n_points))
+        t_array = _best_of(lambda: generate_simple_hull(**PARAMS, N_STATIONS=n_stations, N_POINTS=n_points))
+        t_batch = _best_of(lambda: simple_hull_arrays(stacked, n_stations, n_points)) / BATCH_SIZE
+        print(f"{name:>10} {t_loop*1e3:10.2f} {t_array*1e3:11.2f} {t_loop/t_array:7.1f}x {t_batch*1e3:16.3f}")
@@ -0,0 +1,65 @@
+'''
+Benchmark of predictions on a registered query grid (GaussianProcessSurrogate.set_query_grid), as in Aggregator.f's loop:
+predict both ways on a 180 point heel grid between single observation updates, checking the cached predictions match GPy's.
+Run from the repository root: python benchmarks/bench_grid_cache.py
+'''
+import sys
+import os
+import time
+import contextlib
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import numpy as np
+from hullopt.gps.gp import GaussianProcessSurrogate
+from hullopt.gps.base_functions import update_gp
+from hullopt.gps.strategies.kernels import ConfigurablePhysicsKernel
+from hullopt.gps.strategies.priors import ZeroMeanPrior
+
+N_INITIAL = 1000
+N_UPDATES = 40
+N_GRID = 180
+KERNEL_CONFIG = {"length": "rbf", "beam": "rbf", "depth": "rbf", "heel": "periodic"}
+COLUMNS = ["beam", "depth", "heel", "length"]
+
+
+def _synthetic(n, rng):
+    length = rng.uniform(2.0, 4.5, n)
+    beam = length / rng.uniform(3.0, 7.5, n)
+    depth = beam / rng.uniform(1.5, 3.0, n)
+    heel = rng.uniform(0, 2 * np.pi, n)
+    moment = -1000 * beam ** 2 / depth * np.sin(heel) * np.cos(heel / 2) ** 2 + rng.normal(0, 1, n)
+    return np.stack([beam, depth, heel, length], axis=1), moment[:, None]
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    X, y = _synthetic(N_INITIAL, rng)
+    gp = GaussianProcessSurrogate(ConfigurablePhysicsKernel(KERNEL_CONFIG), ZeroMeanPrior())
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        gp.fit(X, y, COLUMNS)
+
+    # One hull's heel grid, and new observations on it
+    hull = X[0]
+    X_grid = np.tile(hull, (N_GRID, 1))
+    X_grid[:, COLUMNS.index("heel")] = np.linspace(0, np.pi, N_GRID)
+    X_new = X_grid[rng.integers(0, N_GRID, N_UPDATES)]
+    y_new = rng.normal(0, 100, (N_UPDATES, 1))
+    gp.set_query_grid(X_grid)
+
+    cached, uncached = [], []
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        for i in range(N_UPDATES):
+            start = time.perf_counter()
+            mu, var = gp.predict(X_grid)
+            cached.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            mu_ref, var_ref = gp.model.predict(X_grid)
+            uncached.append(time.perf_counter() - start)
+            assert np.allclose(mu, mu_ref, rtol=1e-6, atol=1e-6 * np.abs(mu_ref).max())
+            assert np.allclose(var, var_ref, rtol=1e-4, atol=1e-6 * var_ref.max())
+            update_gp(gp, X_new[i:i + 1], y_new[i:i + 1], COLUMNS)
+
+    cached, uncached = np.asarray(cached), np.asarray(uncached)
+    print(f"{N_INITIAL} training points, {N_GRID} point grid, {N_UPDATES} updates")
+    print(f"model.predict:       median {np.median(uncached) * 1000:7.2f} ms")
+    print(f"cached grid predict: median {np.median(cached) * 1000:7.2f} ms, mean {cached.mean() * 1000:.2f} ms (including rebuilds after re-optimisation)")
+    print(f"Speedup: {np.median(uncached) / np.median(cached):.0f}x median")
@@ -0,0 +1,79 @@
+'''
+Benchmark of Aggregator.f headless (no plotting or printing) against plotting every round, as f did before,
+and with a diagnostics recorder attached: wall-clock and peak Python memory per hull. Also checks the recorded trace round-trips through disk.
+Run from the repository root: python benchmarks/bench_headless_aggregator.py
+'''
+import sys
+import os
+import time
+import tempfile
+import tracemalloc
+import contextlib
+from copy import deepcopy
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import matplotlib
+matplotlib.use("Agg")
+import numpy as np
+from hullopt import Hull
+from hullopt.hull.utils import generate_random_hulls
+from hullopt.simulations import analytic
+from hullopt.simulations.storage import ResultStorage
+from hullopt.gps.gp import GaussianProcessSurrogate
+from hullopt.gps.aggregator import Aggregator
+from hullopt.gps.diagnostics import DiagnosticsRecorder
+from hullopt.gps.strategies.kernels import ConfigurablePhysicsKernel
+from hullopt.gps.strategies.priors import ZeroMeanPrior
+
+N_TRAINING_HULLS = 4
+N_TRAINING_HEELS = 24
+BUDGET = 60
+KERNEL_CONFIG = {"length": "rbf", "beam": "rbf", "depth": "rbf", "heel": "periodic"}
+USER_WEIGHTS = {"overall_stability": 1, "initial_stability": 1, "diminishing_stability": 1, "tipping_point": 1,
+                "righting_energy": 1, "overall_buoyancy": 1, "initial_buoyancy": 1}
+
+
+if __name__ == "__main__":
+    directory = tempfile.mkdtemp()
+    analytic.storage = ResultStorage(os.path.join(directory, "training.db"))
+    hulls = generate_random_hulls(N_TRAINING_HULLS + 10, seed=1)
+    for hull in hulls[:N_TRAINING_HULLS]:
+        analytic.run_sweep(hull, np.linspace(0, np.pi, N_TRAINING_HEELS))
+    X, y, columns = analytic.storage.to_arrays()
+    gp_righting = GaussianProcessSurrogate(ConfigurablePhysicsKernel(KERNEL_CONFIG), ZeroMeanPrior())
+    gp_buoyancy = GaussianProcessSurrogate(ConfigurablePhysicsKernel(KERNEL_CONFIG), ZeroMeanPrior())
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        gp_righting.fit(X, y[:, :1], columns)
+        gp_buoyancy.fit(X, y[:, -2:], columns)
+
+    hull = next(hull for hull in hulls[N_TRAINING_HULLS:] if analytic.run_sweep(hull, [np.pi / 179], use_cache=False).righting_moments[0, 0] > 0)
+    # Simulate every heel f can choose up front, so all modes are served the same cached simulations and only f itself is timed
+    analytic.run_sweep(hull, np.linspace(0, np.pi, 180))
+    modes = {
+        "plotting": dict(plot_n_steps=10 ** 6),
+        "recorder": dict(plot_n_steps=0, diagnostics=DiagnosticsRecorder(), verbose=False),
+        "headless": dict(plot_n_steps=0, verbose=False),
+    }
+    results = {}
+    for name, kwargs in modes.items():
+        aggregator = Aggregator(USER_WEIGHTS, deepcopy(gp_righting), deepcopy(gp_buoyancy), columns, workers=1, **kwargs)
+        np.random.seed(0)
+        tracemalloc.start()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(open(os.devnull, "w")):
+            results[name] = aggregator.f(Hull(hull.params), budget=BUDGET)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{name:>9}: {elapsed:6.2f} s, peak {peak / 2 ** 20:6.1f} MB, score {results[name][0]:.4f}")
+    # The same seed draws the same acquisitions in every mode
+    assert results["headless"][0] == results["plotting"][0] == results["recorder"][0]
+
+    recorder = modes["recorder"]["diagnostics"]
+    path = os.path.join(directory, "trace.npz")
+    recorder.dump(path)
+    loaded = DiagnosticsRecorder.load(path)
+    assert len(loaded.rounds) == len(recorder.rounds) > 0 and loaded.hulls == recorder.hulls
+    for r, l in zip(recorder.rounds, loaded.rounds):
+        assert np.array_equal(r.mu, l.mu) and [(k, i) for k, _, i in r.acquisitions] == [(k, i) for k, _, i in l.acquisitions]
+    loaded.render([0])
+    print(f"Recorded {len(recorder.rounds)} rounds, {os.path.getsize(path) / 2 ** 10:.0f} KB on disk")
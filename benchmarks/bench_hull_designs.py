@@ -0,0 +1,58 @@
+'''
+Benchmark of training design generation: sampling hull params in the ratio parameterisation with Sobol/Latin hypercube/uniform designs
+(without meshing), their space-filling quality, and meshing a design serially against over a process pool,
+against generate_random_hulls' draw-check-mesh loop.
+Run from the repository root: python benchmarks/bench_hull_designs.py
+'''
+import sys
+import os
+import time
+import contextlib
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import numpy as np
+from scipy.stats import qmc
+from scipy.spatial.distance import pdist
+from hullopt.hull import hull as hull_module
+from hullopt.hull.cache import MeshCache
+from hullopt.hull.constraints import Constraints
+from hullopt.hull.utils import sample_hull_params, build_hulls, generate_random_hulls
+
+N_DESIGN = 1024  # Sobol designs are balanced at powers of 2
+N_MESHED = 200
+
+
+def _unit(params_list):
+    # The design's drawn coordinates, ratios in place of beam and depth, scaled to the unit cube
+    X = np.asarray([[p.length, p.length / p.beam, p.beam / p.depth, p.cross_section_exponent, p.beam_position,
+                     p.rocker_exponent, p.rocker_bow, p.rocker_stern, p.hull_thickness] for p in params_list])
+    return (X - X.min(axis=0)) / (X.max(axis=0) - X.min(axis=0))
+
+
+if __name__ == "__main__":
+    constraints = Constraints()
+    print(f"{os.cpu_count()} CPUs")
+    designs = {}
+    for design in ("random", "lhs", "sobol"):
+        start = time.perf_counter()
+        designs[design] = sample_hull_params(N_DESIGN, design)
+        elapsed = time.perf_counter() - start
+        valid, _ = constraints.check_params_batch(Constraints.params_array(designs[design]))
+        assert len(designs[design]) == N_DESIGN and valid.all()
+        X = _unit(designs[design])
+        print(f"{design:>6}: {N_DESIGN} params in {elapsed * 1e3:6.1f} ms, centred L2 discrepancy {qmc.discrepancy(X):.4f}, "
+              f"min pairwise distance {pdist(X).min():.4f}")
+
+    hull_module.mesh_cache = MeshCache(directory=None)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        generate_random_hulls(N_MESHED)
+    loop = time.perf_counter() - start
+    print(f"generate_random_hulls, {N_MESHED} hulls: {loop:.1f} s ({loop / N_MESHED * 1e3:.0f} ms per hull)")
+    for workers in (1, 0):
+        hull_module.mesh_cache = MeshCache(directory=None)
+        start = time.perf_counter()
+        hulls = build_hulls(designs["sobol"][:N_MESHED], workers=workers)
+        elapsed = time.perf_counter() - start
+        assert len(hulls) == N_MESHED
+        print(f"build_hulls (sobol), {N_MESHED} hulls, workers={workers}: {elapsed:.1f} s ({elapsed / N_MESHED * 1e3:.0f} ms per hull, "
+              f"{elapsed / N_MESHED * 1000 / 60:.1f} min per 1000)")
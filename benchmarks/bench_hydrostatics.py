@@ -0,0 +1,57 @@
+'''
+Benchmark of the hydrostatic tables against the slice-and-boolean path of the analytic simulator.
+Validates draught, displacement, centre of buoyancy and reserve buoyancy on the closed default hulls.
+Run from the repository root: python benchmarks/bench_hydrostatics.py
+'''
+import sys
+import os
+import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import numpy as np
+import trimesh
+from hullopt.config import hyperparameters
+from hullopt.config.defaults import symmetric_default_hull, example_hull_1
+from hullopt.simulations import analytic
+from hullopt.simulations.hydrostatics import Hydrostatics
+
+HEELS = (0.0, 0.5, 1.2, 3.0)
+DISPLACEMENT_RTOL = 1e-4
+CENTRE_BUOYANCY_ATOL = 1e-4  # m
+
+
+def _heeled(hull, heel):
+    mesh = hull.mesh.copy().apply_transform(trimesh.transformations.translation_matrix(hull.mesh.center_mass))
+    return mesh.apply_transform(trimesh.transformations.rotation_matrix(heel, [1, 0, 0], hull.mesh.center_mass))
+
+
+if __name__ == "__main__":
+    for name, hull in (("symmetric_default_hull", symmetric_default_hull), ("example_hull_1", example_hull_1)):
+        print(name)
+        for heel in HEELS:
+            mesh = _heeled(hull, heel)
+
+            start = time.perf_counter()
+            hydrostatics = Hydrostatics.from_mesh(mesh)
+            _, draught = hydrostatics.draught(hull.density)
+            _, reserve, reserve_hull = hydrostatics.reserve_buoyancy(hull.density, draught)
+            table_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            _, boolean_draught = analytic._iterate_draught(mesh, hull.density)
+            boolean_time = time.perf_counter() - start
+            _, boolean_reserve, boolean_reserve_hull = analytic._reserve_buoyancy(mesh, hull.density, boolean_draught)
+
+            # Compare both paths at the same waterline, then the solved waterlines
+            cob, displacement, hull_displacement = hydrostatics.centre_buoyancy_and_displacement(boolean_draught)
+            boolean_cob, boolean_displacement, boolean_hull_displacement = analytic._calculate_centre_buoyancy_and_displacement(mesh, boolean_draught)
+            assert np.isclose(displacement, boolean_displacement, rtol=DISPLACEMENT_RTOL), (displacement, boolean_displacement)
+            assert np.isclose(hull_displacement, boolean_hull_displacement, rtol=DISPLACEMENT_RTOL), (hull_displacement, boolean_hull_displacement)
+            assert np.allclose(cob, boolean_cob, rtol=0, atol=CENTRE_BUOYANCY_ATOL), (cob, boolean_cob)
+            depth = mesh.bounds[1][2] - mesh.bounds[0][2]
+            assert abs(draught - boolean_draught) < 2 * hyperparameters.draught_threshold * depth, (draught, boolean_draught)
+            assert np.isclose(reserve, boolean_reserve, rtol=DISPLACEMENT_RTOL), (reserve, boolean_reserve)
+            assert np.isclose(reserve_hull, boolean_reserve_hull, rtol=DISPLACEMENT_RTOL), (reserve_hull, boolean_reserve_hull)
+
+            print(f"  heel {heel:.1f}: draught {draught:+.5f} m (vs {boolean_draught:+.5f}), "
+                  f"reserve buoyancy {reserve:.3f} kg (vs {boolean_reserve:.3f})")
+            print(f"    tables: {table_time:6.3f} s, boolean draught solve: {boolean_time:6.3f} s")
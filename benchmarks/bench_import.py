@@ -0,0 +1,34 @@
+'''
+Import-time benchmark for `import hullopt`, with a regression budget.
+Each sample imports hullopt in a fresh interpreter, then checks no heavy optional modules were imported and no hulls were built.
+Run from the repository root: python benchmarks/bench_import.py [budget seconds]
+'''
+import sys
+import os
+import subprocess
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+N_SAMPLES = 5
+IMPORT_BUDGET = 2.0  # s, median wall time of `import hullopt`
+HEAVY_MODULES = ("GPy", "optuna", "matplotlib", "sklearn", "pandas")
+
+PROBE = f'''
+import sys, time
+start = time.perf_counter()
+import hullopt
+elapsed = time.perf_counter() - start
+from hullopt.config import defaults
+assert defaults._default_hull.cache_info().currsize == 0, "default hulls built at import"
+heavy = [m for m in {HEAVY_MODULES!r} if m in sys.modules]
+assert not heavy, f"heavy modules imported eagerly: {{heavy}}"
+print(elapsed)
+'''
+
+
+if __name__ == "__main__":
+    budget = float(sys.argv[1]) if len(sys.argv) > 1 else IMPORT_BUDGET
+    samples = sorted(float(subprocess.run([sys.executable, "-c", PROBE], cwd=ROOT, check=True, capture_output=True, text=True).stdout.split()[-1])
+                     for _ in range(N_SAMPLES))
+    median = samples[len(samples) // 2]
+    print(f"import hullopt: median {median:.3f} s (min {samples[0]:.3f} s, max {samples[-1]:.3f} s), budget {budget:.3f} s")
+    assert median <= budget, f"import hullopt took {median:.3f} s, over the {budget:.3f} s budget"
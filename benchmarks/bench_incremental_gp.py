@@ -0,0 +1,77 @@
+'''
+Benchmark of update_gp's incremental posterior updates against the previous full refit (set_XY + optimize) per sample,
+as Aggregator.f does for every acquisition sample. Also checks the incremental posterior matches GPy's own inference.
+Run from the repository root: python benchmarks/bench_incremental_gp.py
+'''
+import sys
+import os
+import time
+import contextlib
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import numpy as np
+from hullopt.config import hyperparameters
+from hullopt.gps.gp import GaussianProcessSurrogate
+from hullopt.gps.base_functions import update_gp
+from hullopt.gps.strategies.kernels import ConfigurablePhysicsKernel
+from hullopt.gps.strategies.priors import ZeroMeanPrior
+
+N_INITIAL = 500
+N_UPDATES = 50
+N_REFITS = 5  # Full refits are slow, time a few
+KERNEL_CONFIG = {"length": "rbf", "beam": "rbf", "depth": "rbf", "heel": "periodic"}
+COLUMNS = ["beam", "depth", "heel", "length"]
+
+
+def _synthetic(n, rng):
+    length = rng.uniform(2.0, 4.5, n)
+    beam = length / rng.uniform(3.0, 7.5, n)
+    depth = beam / rng.uniform(1.5, 3.0, n)
+    heel = rng.uniform(0, 2 * np.pi, n)
+    moment = -1000 * beam ** 2 / depth * np.sin(heel) * np.cos(heel / 2) ** 2 + rng.normal(0, 1, n)
+    return np.stack([beam, depth, heel, length], axis=1), moment[:, None]
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    X, y = _synthetic(N_INITIAL + N_UPDATES, rng)
+    gp = GaussianProcessSurrogate(ConfigurablePhysicsKernel(KERNEL_CONFIG), ZeroMeanPrior())
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        gp.fit(X[:N_INITIAL], y[:N_INITIAL], COLUMNS)
+
+    # Incremental updates match exact inference over the total set (same hyperparameters and normalisation)
+    gp.add_data(X[N_INITIAL:N_INITIAL + 3], y[N_INITIAL:N_INITIAL + 3])
+    model = gp.model
+    posterior, log_likelihood, _ = model.inference_method.inference(model.kern, model.X, model.likelihood, model.Y_normalized, model.mean_function)
+    assert np.allclose(model.posterior.woodbury_vector, posterior.woodbury_vector, atol=1e-6 * np.abs(posterior.woodbury_vector).max())
+    assert np.isclose(model.log_likelihood(), log_likelihood, rtol=1e-8)
+    mu, var = gp.predict(X[-20:])
+    mu_ref, var_ref = posterior._raw_predict(model.kern, X[-20:], model.X)
+    assert np.allclose(mu, model.normalizer.inverse_mean(mu_ref), rtol=1e-6, atol=1e-6)
+
+    gp = GaussianProcessSurrogate(ConfigurablePhysicsKernel(KERNEL_CONFIG), ZeroMeanPrior())
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        gp.fit(X[:N_INITIAL], y[:N_INITIAL], COLUMNS)
+    refit = GaussianProcessSurrogate(ConfigurablePhysicsKernel(KERNEL_CONFIG), ZeroMeanPrior(), model=gp.model.copy())
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        for i in range(N_REFITS):
+            X_total = np.vstack([refit.model.X, X[N_INITIAL + i:N_INITIAL + i + 1]])
+            y_total = np.vstack([refit.model.Y, y[N_INITIAL + i:N_INITIAL + i + 1]])
+            refit.model.set_XY(X_total, y_total)
+            refit.model.optimize()
+    refit_time = (time.perf_counter() - start) / N_REFITS
+
+    times = []
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        for i in range(N_UPDATES):
+            start = time.perf_counter()
+            update_gp(gp, X[N_INITIAL + i:N_INITIAL + i + 1], y[N_INITIAL + i:N_INITIAL + i + 1], COLUMNS)
+            times.append(time.perf_counter() - start)
+    times = np.asarray(times)
+    assert gp.model.num_data == N_INITIAL + N_UPDATES
+
+    print(f"{N_INITIAL} initial points, {N_UPDATES} single point updates (re-optimising every {hyperparameters.gp_reoptimise_every})")
+    print(f"Full refit per sample:       {refit_time:8.3f} s")
+    print(f"update_gp per sample (mean): {times.mean():8.3f} s, median {np.median(times):.4f} s")
+    print(f"Speedup: {refit_time / times.mean():.1f}x mean, {refit_time / np.median(times):.0f}x median")
@@ -0,0 +1,87 @@
+'''
+Benchmark of GaussianProcessSurrogate.save/load against pickling the GPy model (the previous format): load time, size on disk,
+and that the reloaded model predicts the same without re-optimising.
+Pickles already in models/ are timed too.
+Run from the repository root: python benchmarks/bench_model_io.py
+'''
+import sys
+import os
+import glob
+import time
+import pickle
+import tempfile
+import contextlib
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import numpy as np
+from hullopt.gps.gp import GaussianProcessSurrogate
+from hullopt.gps.strategies.kernels import ConfigurablePhysicsKernel
+from hullopt.gps.strategies.priors import ZeroMeanPrior
+
+N_FIT = 500
+N_TOTAL = 2000
+REPEATS = 3
+KERNEL_CONFIG = {"length": "rbf", "beam": "rbf", "depth": "rbf", "heel": "periodic"}
+COLUMNS = ["beam", "depth", "heel", "length"]
+
+
+def _synthetic(n, rng):
+    length = rng.uniform(2.0, 4.5, n)
+    beam = length / rng.uniform(3.0, 7.5, n)
+    depth = beam / rng.uniform(1.5, 3.0, n)
+    heel = rng.uniform(0, 2 * np.pi, n)
+    moment = -1000 * beam ** 2 / depth * np.sin(heel) * np.cos(heel / 2) ** 2 + rng.normal(0, 1, n)
+    return np.stack([beam, depth, heel, length], axis=1), moment[:, None]
+
+
+def _load_pickle(path):
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def _time_load(f):
+    times = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(open(os.devnull, "w")):
+            result = f()
+        times.append(time.perf_counter() - start)
+    return np.median(times), result
+
+
+def _size(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(p) for p in glob.glob(os.path.join(path, "*")))
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    X, y = _synthetic(N_TOTAL, rng)
+    gp = GaussianProcessSurrogate(ConfigurablePhysicsKernel(KERNEL_CONFIG), ZeroMeanPrior())
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        gp.fit(X[:N_FIT], y[:N_FIT], COLUMNS)
+        gp.add_data(X[N_FIT:], y[N_FIT:])  # Grows the training set without re-optimising, normalisation stays frozen
+
+    directory = tempfile.mkdtemp()
+    pickle_path, model_path = os.path.join(directory, "gp.pkl"), os.path.join(directory, "gp")
+    with open(pickle_path, "wb") as f:
+        pickle.dump(gp.model, f)
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        gp.save(model_path)
+
+    pickle_time, _ = _time_load(lambda: _load_pickle(pickle_path))
+    load_time, loaded = _time_load(lambda: (lambda g: (g.load(model_path), g)[1])(GaussianProcessSurrogate()))
+
+    X_test, _ = _synthetic(200, rng)
+    mu, var = gp.predict(X_test)
+    mu_loaded, var_loaded = loaded.predict(X_test)
+    assert type(loaded.k_strat) is ConfigurablePhysicsKernel and loaded.column_order == COLUMNS
+    assert np.allclose(mu, mu_loaded, rtol=1e-5, atol=1e-5 * np.abs(mu).max())
+    assert np.allclose(var, var_loaded, rtol=1e-4, atol=1e-6 * var.max())
+
+    print(f"{N_TOTAL} training rows")
+    print(f"pickle:   load {pickle_time:6.3f} s, {_size(pickle_path) / 1e6:7.2f} MB")
+    print(f"manifest: load {load_time:6.3f} s, {_size(model_path) / 1e6:7.2f} MB")
+    for path in sorted(glob.glob("models/*.pkl")):
+        existing_time, _ = _time_load(lambda: _load_pickle(path))
+        print(f"{path}: load {existing_time:.3f} s, {_size(path) / 1e6:.2f} MB")
@@ -0,0 +1,50 @@
+'''
+Benchmark of optimise with trials in parallel worker processes against one worker, on a persistent SQLite study.
+The objective stands in for Aggregator.f: a fixed delay per hull (its simulations) and a cheap score of the hull's params.
+Also checks a study resumes (n_trials more on top of the stored ones) and that the best hull is recorded in the study.
+Run from the repository root: python benchmarks/bench_parallel_optimise.py
+'''
+import sys
+import os
+import time
+import tempfile
+import contextlib
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import optuna
+from hullopt.hull.constraints import Constraints
+from hullopt.optimise import optimise, best_result
+
+N_TRIALS = 24
+WORKERS = 4
+TRIAL_TIME = 0.25  # s per hull
+
+
+def objective(hull):
+    time.sleep(TRIAL_TIME)
+    score = hull.params.beam / hull.params.length - abs(hull.params.depth - 0.3)
+    return score, {"beam_length": hull.params.beam / hull.params.length, "depth": hull.params.depth}
+
+
+if __name__ == "__main__":
+    directory = tempfile.mkdtemp()
+    print(f"{os.cpu_count()} CPUs, {N_TRIALS} trials of {TRIAL_TIME} s")
+    for workers in (1, WORKERS):
+        storage = f"sqlite:///{os.path.join(directory, f'study_{workers}.db')}"
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(open(os.devnull, "w")):
+            best_params = optimise(objective, Constraints(), time=10, storage=storage, workers=workers, n_trials=N_TRIALS)
+        elapsed = time.perf_counter() - start
+
+        study = optuna.load_study(study_name="hullopt", storage=storage)
+        assert len(study.trials) >= N_TRIALS
+        params, score, metrics = best_result(storage)
+        assert params == best_params and score == study.best_value and metrics == study.best_trial.user_attrs["metrics"]
+        print(f"{workers} workers: {elapsed:5.1f} s for {len(study.trials)} trials ({elapsed / len(study.trials):.3f} s per trial), best score {score:.4f}")
+
+    # Resuming the last study adds to its trials
+    n_before = len(study.trials)
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        optimise(objective, Constraints(), time=10, storage=storage, workers=WORKERS, n_trials=N_TRIALS // 2)
+    study = optuna.load_study(study_name="hullopt", storage=storage)
+    assert len(study.trials) >= n_before + N_TRIALS // 2
+    print(f"Resumed: {n_before} -> {len(study.trials)} trials, best score {best_result(storage)[1]:.4f}")
@@ -0,0 +1,77 @@
+'''
+Benchmark of optimise's Pareto mode: one study over the metric vector, then each weighting answered by rerank from the stored trials'
+metrics (checked against scoring every trial directly, and for non-negative weights against the Pareto front alone),
+against the cost of a weighted optimisation per weighting.
+Run from the repository root: python benchmarks/bench_pareto.py
+'''
+import sys
+import os
+import time
+import tempfile
+import contextlib
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import numpy as np
+import optuna
+from hullopt.config import hyperparameters
+from hullopt.hull import hull as hull_module
+from hullopt.hull.cache import MeshCache
+from hullopt.hull.constraints import Constraints
+from hullopt.hull.utils import generate_random_hulls
+from hullopt.simulations import analytic
+from hullopt.simulations.storage import ResultStorage
+from hullopt.gps.gp import GaussianProcessSurrogate
+from hullopt.gps.aggregator import Aggregator
+from hullopt.gps.strategies.kernels import ConfigurablePhysicsKernel
+from hullopt.gps.strategies.priors import ZeroMeanPrior
+from hullopt.optimise import optimise, rerank, pareto_front, PARETO_OBJECTIVES
+
+N_TRAINING_HULLS = 8
+N_TRAINING_HEELS = 24
+N_TRIALS = 30
+N_WEIGHTINGS = 20
+KERNEL_CONFIG = {"length": "rbf", "beam": "rbf", "depth": "rbf", "heel": "periodic"}
+METRICS = list(hyperparameters.weight_normalisers)
+
+
+if __name__ == "__main__":
+    directory = tempfile.mkdtemp()
+    hull_module.mesh_cache = MeshCache(directory=None)
+    analytic.storage = ResultStorage(os.path.join(directory, "training.db"))
+    for hull in generate_random_hulls(N_TRAINING_HULLS, seed=1):
+        analytic.run_sweep(hull, np.linspace(0, np.pi, N_TRAINING_HEELS))
+    X, y, columns = analytic.storage.to_arrays()
+    gp_righting = GaussianProcessSurrogate(ConfigurablePhysicsKernel(KERNEL_CONFIG), ZeroMeanPrior())
+    gp_buoyancy = GaussianProcessSurrogate(ConfigurablePhysicsKernel(KERNEL_CONFIG), ZeroMeanPrior())
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        gp_righting.fit(X, y[:, :1], columns)
+        gp_buoyancy.fit(X, y[:, -2:], columns)
+
+    aggregator = Aggregator({k: 1 for k in METRICS}, gp_righting, gp_buoyancy, columns, plot_n_steps=0, verbose=False)
+    storage = f"sqlite:///{os.path.join(directory, 'study.db')}"
+    np.random.seed(0)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(open(os.devnull, "w")), contextlib.redirect_stderr(open(os.devnull, "w")):
+        front_params = optimise(aggregator.f, Constraints(), time=60, storage=storage, study_name="pareto", n_trials=N_TRIALS,
+                                objectives=PARETO_OBJECTIVES)
+    optimisation = time.perf_counter() - start
+    front = pareto_front(storage, "pareto")
+    assert len(front) == len(front_params)
+    study = optuna.load_study(study_name="pareto", storage=storage)
+    scored = [t for t in study.trials if set(METRICS) <= set(t.user_attrs.get("metrics", {})) and all(c <= 0 for c in t.constraints.values())]
+    print(f"Pareto study: {N_TRIALS} trials in {optimisation:.1f} s, {len(scored)} feasible with metrics, {len(front)} on the front")
+
+    rng = np.random.default_rng(0)
+    weightings = [{k: 1.0 for k in METRICS}] + [dict(zip(METRICS, rng.dirichlet(np.ones(len(METRICS))))) for _ in range(N_WEIGHTINGS - 2)]
+    weightings.append({**weightings[1], "initial_stability": -1.0})  # A preference for less initial stability
+    times = []
+    for weights in weightings:
+        start = time.perf_counter()
+        params, score, metrics = rerank(weights, storage, "pareto")
+        times.append(time.perf_counter() - start)
+        direct = max(hyperparameters.weighted_score(t.user_attrs["metrics"], weights) for t in scored)
+        assert np.isclose(score, direct)
+        if all(w >= 0 for w in weights.values()):
+            # With every objective maximised, some hull on the front is best for any non-negative weighting
+            assert np.isclose(score, max(hyperparameters.weighted_score(m, weights) for _, m in front))
+    print(f"rerank, {len(weightings)} weightings: {np.mean(times) * 1e3:.1f} ms each, against {optimisation:.1f} s "
+          f"({optimisation / np.mean(times):.0f}x) for a weighted optimisation of as many trials per weighting")
@@ -0,0 +1,110 @@
+'''
+Benchmark of surrogate pre-screening in optimise: trials whose optimistic posterior score (Aggregator.screen) cannot beat the incumbent
+are not simulated. Runs a fixed design of candidates with and without screening against the best score so far (simulations, wall-clock, best score),
+checks how many screened-out designs would in fact have beaten their incumbent, and ends with optimise's screening report.
+Run from the repository root: python benchmarks/bench_prescreening.py
+'''
+import sys
+import os
+import time
+import tempfile
+import contextlib
+from copy import deepcopy
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import numpy as np
+import optuna
+from hullopt import Hull
+from hullopt.hull import hull as hull_module
+from hullopt.hull.cache import MeshCache
+from hullopt.hull.constraints import Constraints
+from hullopt.hull.utils import generate_random_hulls, sample_hull_params
+from hullopt.simulations import analytic
+from hullopt.simulations.storage import ResultStorage
+from hullopt.gps.gp import GaussianProcessSurrogate
+from hullopt.gps.aggregator import Aggregator
+from hullopt.gps.strategies.kernels import ConfigurablePhysicsKernel
+from hullopt.gps.strategies.priors import ZeroMeanPrior
+from hullopt.optimise import optimise, screening_report
+
+N_TRAINING_HULLS = 8
+N_TRAINING_HEELS = 24
+N_CANDIDATES = 32
+N_TRIALS = 24
+KERNEL_CONFIG = {"length": "rbf", "beam": "rbf", "depth": "rbf", "heel": "periodic"}
+USER_WEIGHTS = {"overall_stability": 1, "initial_stability": 1, "diminishing_stability": 1, "tipping_point": 1,
+                "righting_energy": 1, "overall_buoyancy": 1, "initial_buoyancy": 1}
+
+
+if __name__ == "__main__":
+    directory = tempfile.mkdtemp()
+    hull_module.mesh_cache = MeshCache(directory=None)
+    analytic.storage = ResultStorage(os.path.join(directory, "training.db"))
+    for hull in generate_random_hulls(N_TRAINING_HULLS, seed=1):
+        analytic.run_sweep(hull, np.linspace(0, np.pi, N_TRAINING_HEELS))
+    X, y, columns = analytic.storage.to_arrays()
+    gp_righting = GaussianProcessSurrogate(ConfigurablePhysicsKernel(KERNEL_CONFIG), ZeroMeanPrior())
+    gp_buoyancy = GaussianProcessSurrogate(ConfigurablePhysicsKernel(KERNEL_CONFIG), ZeroMeanPrior())
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        gp_righting.fit(X, y[:, :1], columns)
+        gp_buoyancy.fit(X, y[:, -2:], columns)
+
+    aggregator = Aggregator(USER_WEIGHTS, deepcopy(gp_righting), deepcopy(gp_buoyancy), columns, plot_n_steps=0, verbose=False)
+    params = generate_random_hulls(1, seed=3)[0].params
+    start = time.perf_counter()
+    for _ in range(20):
+        expected, optimistic = aggregator.screen(params)
+    print(f"Aggregator.screen: {(time.perf_counter() - start) / 20 * 1e3:.1f} ms per candidate (expected {expected:.4f}, optimistic {optimistic:.4f})")
+
+    # The same fixed design of candidates, each simulated, or screened against the best score so far first
+    candidates = sample_hull_params(N_CANDIDATES, "sobol", seed=5)
+    runs = {}
+    for mode in ("full", "screened"):
+        # Fresh GPs and simulation store per run, so neither benefits from the other's simulations
+        analytic.storage = ResultStorage(os.path.join(directory, f"{mode}.db"))
+        aggregator = Aggregator(USER_WEIGHTS, deepcopy(gp_righting), deepcopy(gp_buoyancy), columns, plot_n_steps=0, verbose=False)
+        np.random.seed(0)
+        incumbent, simulations, screened = None, 0, []
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(open(os.devnull, "w")):
+            for params in candidates:
+                if mode == "screened" and incumbent is not None and aggregator.screen(params)[1] <= incumbent:
+                    screened.append((params, incumbent))
+                    continue
+                try:
+                    score, _ = aggregator.f(Hull(params))
+                except ValueError:
+                    continue  # An acquisition with no mass left to sample from
+                simulations += aggregator.simulations
+                incumbent = score if incumbent is None else max(incumbent, score)
+        elapsed = time.perf_counter() - start
+        runs[mode] = (screened, simulations, elapsed)
+        print(f"{mode:>8}: {N_CANDIDATES} candidates in {elapsed:5.1f} s, {len(screened):2d} screened out, {simulations:4d} simulations, "
+              f"best score {incumbent:.4f}, {simulations / elapsed * 3600:.0f} simulations per hour")
+    (screened, simulations, elapsed), (_, full_simulations, full_elapsed) = runs["screened"], runs["full"]
+    assert screened and simulations < full_simulations
+    print(f"Screening saved {full_simulations - simulations} simulations ({1 - simulations / full_simulations:.0%}) and "
+          f"{full_elapsed - elapsed:.1f} s, {(full_simulations - simulations) / elapsed * 3600:.0f} simulations per hour of the screened run")
+
+    # Would any screened-out design have beaten the incumbent it was screened against?
+    analytic.storage = ResultStorage(os.path.join(directory, "check.db"))
+    aggregator = Aggregator(USER_WEIGHTS, deepcopy(gp_righting), deepcopy(gp_buoyancy), columns, plot_n_steps=0, verbose=False)
+    missed = 0
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        for params, incumbent in screened:
+            try:
+                missed += aggregator.f(Hull(params))[0] > incumbent
+            except ValueError:
+                pass
+    print(f"{missed} of {len(screened)} screened-out designs would have beaten their incumbent")
+
+    analytic.storage = ResultStorage(os.path.join(directory, "optimise.db"))
+    aggregator = Aggregator(USER_WEIGHTS, deepcopy(gp_righting), deepcopy(gp_buoyancy), columns, plot_n_steps=0, verbose=False)
+    storage = f"sqlite:///{os.path.join(directory, 'study.db')}"
+    with contextlib.redirect_stdout(open(os.devnull, "w")), contextlib.redirect_stderr(open(os.devnull, "w")):
+        optimise(aggregator.f, Constraints(), time=60, storage=storage, n_trials=N_TRIALS, screen=aggregator.screen)
+    print(f"optimise, {N_TRIALS} trials, screening:")
+    study = optuna.load_study(study_name="hullopt", storage=storage)
+    screening_report(study)
+    # Screened trials end failed, so only simulated scores reach the sampler and the best trial
+    assert all(t.state == optuna.trial.TrialState.FAIL for t in study.trials if "screened" in t.user_attrs)
+    assert "screened" not in study.best_trial.user_attrs and "metrics" in study.best_trial.user_attrs
@@ -0,0 +1,37 @@
+'''
+Benchmark of boolean-free hollow shell construction against the boolean difference path in Hull.generate_mesh.
+Run from the repository root: python benchmarks/bench_shell.py [engine]   (engine defaults to blender)
+'''
+import sys
+import os
+import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import numpy as np
+from hullopt import Hull
+from hullopt.config.defaults import symmetric_default_hull, example_hull_1
+
+N_HULLS = 10
+VOLUME_RTOL = 1e-6
+CENTRE_MASS_ATOL = 1e-6  # m
+
+
+def _hulls_per_second(params, engine):
+    start = time.perf_counter()
+    for _ in range(N_HULLS):
+        Hull.generate_mesh(params, engine=engine)
+    return N_HULLS / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    engine = sys.argv[1] if len(sys.argv) > 1 else "blender"
+    for name, hull in (("symmetric_default_hull", symmetric_default_hull), ("example_hull_1", example_hull_1)):
+        stitched = Hull.generate_mesh(hull.params)
+        boolean = Hull.generate_mesh(hull.params, engine=engine)
+        assert stitched.is_watertight
+        assert np.isclose(stitched.volume, boolean.volume, rtol=VOLUME_RTOL, atol=0), (stitched.volume, boolean.volume)
+        assert np.allclose(stitched.center_mass, boolean.center_mass, rtol=0, atol=CENTRE_MASS_ATOL), (stitched.center_mass, boolean.center_mass)
+
+        print(f"{name}: volume {stitched.volume:.6e} (vs {boolean.volume:.6e}), "
+              f"centre of mass offset {np.linalg.norm(stitched.center_mass - boolean.center_mass):.2e} m")
+        print(f"  stitched: {_hulls_per_second(hull.params, None):8.2f} hulls/s")
+        print(f"  {engine}: {_hulls_per_second(hull.params, engine):8.2f} hulls/s")
@@ -0,0 +1,69 @@
+'''
+Benchmark of the sparse (inducing point) GaussianProcessSurrogate against the exact GP as the training set grows:
+fit time, predict time and test RMSE.
+Uses the simulation result store if given, otherwise a synthetic righting moment curve over random hull shapes.
+Run from the repository root: python benchmarks/bench_sparse_gp.py [gp_data.db]
+'''
+import sys
+import os
+import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import numpy as np
+from hullopt.gps.gp import GaussianProcessSurrogate
+from hullopt.gps.strategies.kernels import ConfigurablePhysicsKernel
+from hullopt.gps.strategies.priors import ZeroMeanPrior
+
+SIZES = (250, 500, 1000, 2000)
+N_TEST = 500
+NUM_INDUCING = 200
+KERNEL_CONFIG = {"length": "rbf", "beam": "rbf", "depth": "rbf", "heel": "periodic"}
+
+
+def _synthetic(n, rng):
+    length = rng.uniform(2.0, 4.5, n)
+    beam = length / rng.uniform(3.0, 7.5, n)
+    depth = beam / rng.uniform(1.5, 3.0, n)
+    heel = rng.uniform(0, 2 * np.pi, n)
+    # Stiffer for wide shallow hulls, capsizing past a depth dependent angle
+    moment = -1000 * beam ** 2 / depth * np.sin(heel) * np.cos(heel / 2) ** 2 + rng.normal(0, 1, n)
+    return np.stack([beam, depth, heel, length], axis=1), moment[:, None], ["beam", "depth", "heel", "length"]
+
+
+def _load(filepath, rng):
+    from hullopt.simulations.storage import ResultStorage
+    X, y, columns = ResultStorage(filepath).to_arrays()
+    order = rng.permutation(len(X))
+    return X[order], y[order, :1], columns
+
+
+def _time_gp(gp, X, y, X_test, y_test, columns):
+    start = time.perf_counter()
+    gp.fit(X, y, columns)
+    fit_time = time.perf_counter() - start
+    start = time.perf_counter()
+    mu, _ = gp.predict(X_test)
+    predict_time = time.perf_counter() - start
+    return fit_time, predict_time, np.sqrt(np.mean((mu - y_test) ** 2))
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    if len(sys.argv) > 1:
+        X_all, y_all, columns = _load(sys.argv[1], rng)
+    else:
+        X_all, y_all, columns = _synthetic(max(SIZES) + N_TEST, rng)
+    X_test, y_test = X_all[-N_TEST:], y_all[-N_TEST:]
+
+    print(f"{'n':>6} | {'model':>14} | {'fit (s)':>8} | {'predict (s)':>11} | {'RMSE':>10}")
+    for n in SIZES:
+        if n > len(X_all) - N_TEST:
+            break
+        X, y = X_all[:n], y_all[:n]
+        models = {
+            "exact": GaussianProcessSurrogate(ConfigurablePhysicsKernel(KERNEL_CONFIG), ZeroMeanPrior()),
+            "sparse kmeans": GaussianProcessSurrogate(ConfigurablePhysicsKernel(KERNEL_CONFIG), ZeroMeanPrior(), num_inducing=NUM_INDUCING),
+            "sparse variance": GaussianProcessSurrogate(ConfigurablePhysicsKernel(KERNEL_CONFIG), ZeroMeanPrior(), num_inducing=NUM_INDUCING, inducing_method="variance"),
+        }
+        for name, gp in models.items():
+            fit_time, predict_time, rmse = _time_gp(gp, X, y, X_test, y_test, columns)
+            print(f"{n:>6} | {name:>14} | {fit_time:8.2f} | {predict_time:11.4f} | {rmse:10.4f}", flush=True)
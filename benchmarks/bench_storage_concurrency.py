@@ -0,0 +1,68 @@
+'''
+Stress test of concurrent writers to one ResultStorage: several processes append batches of results at once,
+then every record is checked to have arrived intact and exactly once.
+Run from the repository root: python benchmarks/bench_storage_concurrency.py [n_writers]
+'''
+import sys
+import os
+import time
+import tempfile
+import multiprocessing
+from dataclasses import replace
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import numpy as np
+from hullopt import simulations
+from hullopt.hull import Params
+from hullopt.simulations.storage import ResultStorage
+
+N_BATCHES = 50
+BATCH_SIZE = 20
+HULL_PARAMS = Params(density=900, hull_thickness=0.005, length=2.6, beam=0.65, depth=0.35, cross_section_exponent=2.0,
+                     beam_position=0.5, rocker_bow=0.25, rocker_stern=0.25, rocker_position=0.5, rocker_exponent=2.0)
+
+
+class _Hull:
+    # Stands in for a Hull: storage only needs its params
+    def __init__(self, params):
+        self.params = params
+
+
+def _writer(filepath, writer):
+    storage = ResultStorage(filepath)
+    # Each writer owns a hull (by length), each record encodes its writer, batch and index in its outputs
+    hull = _Hull(replace(HULL_PARAMS, length=2.0 + writer / 100))
+    for batch in range(N_BATCHES):
+        heels = [(batch * BATCH_SIZE + i) / (N_BATCHES * BATCH_SIZE) for i in range(BATCH_SIZE)]
+        results = [simulations.Result(righting_moment=(writer, batch, i), reserve_buoyancy=heel, reserve_buoyancy_hull=-heel, scene=None, cost=1)
+                   for i, heel in enumerate(heels)]
+        storage.store_many(results, [simulations.Params(heel) for heel in heels], hull)
+
+
+if __name__ == "__main__":
+    n_writers = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    with tempfile.TemporaryDirectory() as directory:
+        filepath = os.path.join(directory, "stress.db")
+        start = time.perf_counter()
+        processes = [multiprocessing.Process(target=_writer, args=(filepath, w)) for w in range(n_writers)]
+        for p in processes:
+            p.start()
+        for p in processes:
+            p.join()
+            assert p.exitcode == 0, p.exitcode
+        elapsed = time.perf_counter() - start
+
+        storage = ResultStorage(filepath)
+        X, y, columns = storage.to_arrays()
+        expected = n_writers * N_BATCHES * BATCH_SIZE
+        assert len(X) == expected, (len(X), expected)
+        # Every (writer, batch, index) arrived exactly once, with its inputs and outputs from the same record
+        assert len(np.unique(y[:, :3], axis=0)) == expected
+        heel = X[:, columns.index("heel")]
+        assert np.array_equal(heel, y[:, 3]) and np.array_equal(heel, -y[:, 4])
+        assert np.allclose(X[:, columns.index("length")], 2.0 + y[:, 0] / 100)
+        for writer in range(n_writers):
+            hull = _Hull(replace(HULL_PARAMS, length=2.0 + writer / 100))
+            assert storage.lookup(simulations.Params(0.5), hull).righting_moment[0] == writer
+
+        print(f"{n_writers} writers x {N_BATCHES} batches x {BATCH_SIZE} results: all {expected} records intact")
+        print(f"  {expected / elapsed:8.0f} records/s")
@@ -0,0 +1,38 @@
+'''
+Benchmark of analytic.run_sweep against one analytic.run per heel angle.
+Run from the repository root: python benchmarks/bench_sweep.py
+'''
+import sys
+import os
+import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import numpy as np
+from hullopt import simulations
+from hullopt.config.defaults import symmetric_default_hull
+from hullopt.simulations import analytic
+
+N_HEELS = 64
+MOMENT_ATOL = 1e-6  # Nm
+BUOYANCY_ATOL = 1e-6  # kg
+
+
+if __name__ == "__main__":
+    heels = np.linspace(-np.pi, np.pi, N_HEELS, endpoint=False)
+
+    start = time.perf_counter()
+    sweep = analytic.run_sweep(symmetric_default_hull, heels, use_cache=False)
+    sweep_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = [analytic.run(symmetric_default_hull, simulations.Params(heel), use_cache=False) for heel in heels]
+    runs_time = time.perf_counter() - start
+
+    singles = simulations.SweepResult.from_results(heels, results)
+    assert np.allclose(sweep.righting_moments, singles.righting_moments, rtol=0, atol=MOMENT_ATOL)
+    assert np.allclose(sweep.reserve_buoyancy, singles.reserve_buoyancy, rtol=0, atol=BUOYANCY_ATOL)
+    assert np.allclose(sweep.reserve_buoyancy_hull, singles.reserve_buoyancy_hull, rtol=0, atol=BUOYANCY_ATOL)
+    assert np.array_equal(sweep.costs, singles.costs)
+
+    print(f"{N_HEELS} heels")
+    print(f"  run_sweep: {sweep_time:8.3f} s")
+    print(f"  run x {N_HEELS}: {runs_time:8.3f} s ({runs_time / sweep_time:.1f}x slower)")
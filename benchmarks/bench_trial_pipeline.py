@@ -0,0 +1,90 @@
+'''
+Benchmark of optimise's trial pipeline: constraints checked on params before any mesh work and the hull built once,
+against the previous pipeline (a hull built for check_hull, whose mesh build came before its own constraint check, then a second hull for F).
+Params are drawn from ranges wider than the constraints, so some are rejected. Ends with optimise's per-stage timing report.
+Run from the repository root: python benchmarks/bench_trial_pipeline.py
+'''
+import sys
+import os
+import time
+import tempfile
+import contextlib
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import numpy as np
+import optuna
+from hullopt.hull import hull as hull_module
+from hullopt.hull.hull import Hull
+from hullopt.hull.params import Params
+from hullopt.hull.cache import MeshCache
+from hullopt.hull.constraints import Constraints
+from hullopt.optimise import optimise, timing_report
+
+N_PARAMS = 100
+N_TRIALS = 30
+WIDEN = 0.05  # Sampled ranges extend this fraction of their width past the constraints
+
+
+def F(hull):
+    return hull.mass, {"mass": hull.mass}
+
+
+def _random_params(constraints, rng):
+    def draw(bounds):
+        width = bounds[1] - bounds[0]
+        return rng.uniform(bounds[0] - WIDEN * width, bounds[1] + WIDEN * width)
+    return Params.from_ratio_parameterisation(
+        density=900.0, hull_thickness=rng.uniform(*constraints.hull_thickness_range), length=draw(constraints.length_range),
+        length_beam_ratio=draw(constraints.length_to_beam_ratio_range), beam_depth_ratio=draw(constraints.beam_to_depth_ratio_range),
+        cross_section_exponent=draw(constraints.cross_section_exponent_range), beam_position=draw(constraints.beam_position_range),
+        rocker_bow=draw(constraints.rocker_bow_range), rocker_stern=draw(constraints.rocker_stern_range),
+        rocker_position=draw(constraints.rocker_position_range), rocker_exponent=draw(constraints.rocker_exponent_range),
+        cockpit_length_ratio=rng.uniform(*constraints.cockpit_length_ratio_range), cockpit_width_ratio=rng.uniform(*constraints.cockpit_width_ratio_range),
+        cockpit_position=rng.uniform(*constraints.cockpit_position_range), cockpit_opening=False)
+
+
+def previous(params, constraints):
+    # Hull.__init__ used to build (or load) the mesh before checking the default constraints
+    hull_module.mesh_cache.get_or_build(params, Hull.generate_mesh)
+    try:
+        constraints.check_params(params)
+    except ValueError:
+        return None
+    constraints.check_hull(Hull(params))
+    return F(Hull(params))
+
+
+def current(params, constraints):
+    try:
+        constraints.check_params(params)
+    except ValueError:
+        return None
+    return F(Hull(params, constraints=constraints))
+
+
+if __name__ == "__main__":
+    constraints = Constraints()
+    rng = np.random.default_rng(0)
+    params = [_random_params(constraints, rng) for _ in range(N_PARAMS)]
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        accepted = [current(p, constraints) is not None for p in params]
+    print(f"{N_PARAMS} param sets, {N_PARAMS - sum(accepted)} rejected by constraints")
+
+    for cache_name, cache in (("no mesh cache", lambda: MeshCache(directory=None, max_memory_entries=0)), ("memory mesh cache", lambda: MeshCache(directory=None))):
+        for name, pipeline in (("previous", previous), ("current", current)):
+            hull_module.mesh_cache = cache()
+            accepted_times, rejected_times = [], []
+            with contextlib.redirect_stdout(open(os.devnull, "w")):
+                for p, ok in zip(params, accepted):
+                    start = time.perf_counter()
+                    result = pipeline(p, constraints)
+                    (accepted_times if ok else rejected_times).append(time.perf_counter() - start)
+                    assert (result is not None) == ok
+            print(f"{cache_name:>17}, {name:>8}: accepted {np.mean(accepted_times) * 1e3:7.2f} ms, rejected {np.mean(rejected_times) * 1e6:9.1f} us per trial")
+
+    hull_module.mesh_cache = MeshCache(directory=None)
+    storage = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'study.db')}"
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        optimise(F, constraints, time=10, storage=storage, n_trials=N_TRIALS)
+    print(f"optimise, {N_TRIALS} trials:")
+    report = timing_report(optuna.load_study(study_name="hullopt", storage=storage))
+    assert report["suggest"][0] == N_TRIALS
@@ -1,5 +1,4 @@
 # Example usage of tool
-import pickle
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -14,16 +13,19 @@ from gui import WeightSelector, ResultVisualizer
 from sklearn.model_selection import train_test_split
 from hullopt.gps.base_functions import create_gp, update_gp
 from hullopt.gps.gp import GaussianProcessSurrogate
-from hullopt.optimise import optimise
+from hullopt.optimise import optimise, best_result, rerank, PARETO_OBJECTIVES
 from hullopt.hull import Hull
 import numpy as np
 import hullopt
 
 
 # Configuration variables here
-DATA_PATH = "gp_data.pkl"
-BUOYANCY_MODEL_PATH = "models/boat_buoyancy_gp.pkl"
-RIGHTING_MODEL_PATH = "models/boat_righting_gp.pkl"
+DATA_PATH = "gp_data.db"
+BUOYANCY_MODEL_PATH = "models/boat_buoyancy_gp"
+RIGHTING_MODEL_PATH = "models/boat_righting_gp"
+PARETO_MODE = False  # Optimise every metric at once, so other weights need no new simulations
+PARETO_STUDY = "hullopt_pareto"
+WORKERS = 1  # optimise's worker processes. Only a serial run updates (and saves) the GPs as it simulates
 KERNEL_CONFIG_HYDRO_PROD = {"length": "rbf",
                  "beam": "rbf",
                  "depth": "rbf",
@@ -90,76 +92,6 @@ KERNEL_CONFIG_LINEAR = {"length": "linear",
                  "heel": "linear" }
 
 
-# Initial data gathering for GP
-if not os.path.exists(DATA_PATH):
-    print(os.getcwd())
-    from hullopt.hull.utils import generate_random_hulls
-    from hullopt.config.defaults import dummy_hull
-    
-    from hullopt.simulations.params import Params
-    from hullopt.simulations.analytic import run
-    hulls = generate_random_hulls(n=100, cockpit_opening=False, seed=42)
-    # Second step: We run a simulation for a given heel angle:
-    for idx, hull in enumerate(hulls):
-        print("Simulating random hull: " + str(idx))
-        for k in range(64):
-            heel = np.pi / 32 * k
-            print(f"heel: {heel}", end="\r")
-            run(hull, Params(heel=heel))
-        r = np.random.random()*35 # Add some extra random points
-        for k in range(int(r)):
-            heel = np.random.random()*2*np.pi
-            print(f"heel: {heel}\r", end="\r")
-            result = run(hull, Params(heel=heel))
-
-    
-X_full, y_full, column_order = load_simulation_data(DATA_PATH)
-
-X_train, X_test, y_train, y_test = train_test_split(
-        X_full, y_full, test_size=0.2, random_state=42
-    )
-
-def remove_costs(Xs):
-    i = column_order.index("cost")
-    print(i)
-    return np.delete(Xs, i, axis=1)
-
-#X_train = remove_costs(X_train)
-#X_text = remove_costs(X_test)
-
-# --- Batch 1: Righting (First 3 cols) ---
-if os.path.exists(RIGHTING_MODEL_PATH):
-    print(f"Loading {RIGHTING_MODEL_PATH}...")
-    with open(RIGHTING_MODEL_PATH, 'rb') as f:
-        gp_righting = GaussianProcessSurrogate(model=pickle.load(f))
-        gp_righting.k_strat = ConfigurablePhysicsKernel(KERNEL_CONFIG_HYDRO_PROD)
-        gp_righting.p_strat = ZeroMeanPrior()
-else:
-    print("Training Batch 1 (Righting)...")
-    gps = [GaussianProcessSurrogate(ConfigurablePhysicsKernel(KC), ZeroMeanPrior()) for KC in (KERNEL_CONFIG_HYDRO_PROD, KERNEL_CONFIG_HYDRO_SUM, KERNEL_CONFIG_HYDRO_PERIODIC, KERNEL_CONFIG_MATERN, KERNEL_CONFIG_RBF, KERNEL_CONFIG_LINEAR)]
-    
-    compare_models({"HYDRO_PROD": gps[0], "HYDRO_SUM": gps[1], "HYDRO_PERIODIC": gps[2], "MATERN": gps[3], "RBF": gps[4], "LINEAR": gps[5]},
-        X_train, y_train[:, :1], X_test, y_test[:, :1], column_order, file_name="righting_gp_comparison_plot.png")
-        
-    gp_righting = gps[0]
-    gp_righting.save(RIGHTING_MODEL_PATH)
-
-# --- Batch 2: Buoyancy (Last 2 cols) ---
-if os.path.exists(BUOYANCY_MODEL_PATH):
-    print(f"Loading {BUOYANCY_MODEL_PATH}...")
-    with open(BUOYANCY_MODEL_PATH, 'rb') as f:
-        gp_buoyancy = GaussianProcessSurrogate(model=pickle.load(f))
-else:
-    print("Training Batch 2 (Buoyancy)...")
-    gps = [GaussianProcessSurrogate(ConfigurablePhysicsKernel(KC), ZeroMeanPrior()) for KC in (KERNEL_CONFIG_HYDRO_PROD, KERNEL_CONFIG_HYDRO_SUM, KERNEL_CONFIG_HYDRO_PERIODIC, KERNEL_CONFIG_MATERN, KERNEL_CONFIG_RBF, KERNEL_CONFIG_LINEAR)]
-    
-    compare_models({"HYDRO_PROD": gps[0], "HYDRO_SUM": gps[1], "HYDRO_PERIODIC": gps[2], "MATERN": gps[3], "RBF": gps[4], "LINEAR": gps[5]},
-        X_train, y_train[:, -2:], X_test, y_test[:, -2:], column_order, file_name="buoyancy_gp_comparison_plot.png")
-        
-    gp_buoyancy = gps[0]
-    gp_buoyancy.save(BUOYANCY_MODEL_PATH)
-
-
 @dataclass
 class GP_Result:
     overall_stability: float
@@ -170,16 +102,87 @@ class GP_Result:
     overall_buoyancy: float
     initial_buoyancy: float
 
-user_weights = WeightSelector(GP_Result).run()
-time = user_weights["time"]
-del user_weights["time"]
-aggregator = Aggregator(user_weights, gp_righting, gp_buoyancy, column_order, plot_n_steps=6)
-f = aggregator.f
-best_params = optimise(f, Constraints(), time=time)
-print("Optimised!! Now Saving")
 
-gp_righting.save(RIGHTING_MODEL_PATH)
-gp_buoyancy.save(BUOYANCY_MODEL_PATH)
+def remove_costs(Xs, column_order):
+    i = column_order.index("cost")
+    print(i)
+    return np.delete(Xs, i, axis=1)
+
 
-visualizer = ResultVisualizer(best_params, hullopt.optimise.best_dict, hullopt.optimise.best_score, Hull)
-visualizer.run()
+# Worker processes (datagen's pool, optimise's workers) may re-import this script, so everything runs from main
+def main():
+    # Initial data gathering for GP
+    # Only simulates what is not already stored, so an interrupted run resumes. See python -m hullopt.datagen --help to run it standalone
+    from hullopt.datagen import generate
+    generate(DATA_PATH, n_hulls=100, n_heels=64, max_extra_heels=35, seed=42, cockpit_opening=False)
+
+    X_full, y_full, column_order = load_simulation_data(DATA_PATH)
+
+    X_train, X_test, y_train, y_test = train_test_split(
+            X_full, y_full, test_size=0.2, random_state=42
+        )
+
+    #X_train = remove_costs(X_train, column_order)
+    #X_text = remove_costs(X_test, column_order)
+
+    # --- Batch 1: Righting (First 3 cols) ---
+    # Saved models bring their strategies with them
+    gp_righting = GaussianProcessSurrogate()
+    if gp_righting.load(RIGHTING_MODEL_PATH):
+        print(f"Loaded {RIGHTING_MODEL_PATH}")
+    else:
+        print("Training Batch 1 (Righting)...")
+        gps = [GaussianProcessSurrogate(ConfigurablePhysicsKernel(KC), ZeroMeanPrior()) for KC in (KERNEL_CONFIG_HYDRO_PROD, KERNEL_CONFIG_HYDRO_SUM, KERNEL_CONFIG_HYDRO_PERIODIC, KERNEL_CONFIG_MATERN, KERNEL_CONFIG_RBF, KERNEL_CONFIG_LINEAR)]
+
+        compare_models({"HYDRO_PROD": gps[0], "HYDRO_SUM": gps[1], "HYDRO_PERIODIC": gps[2], "MATERN": gps[3], "RBF": gps[4], "LINEAR": gps[5]},
+            X_train, y_train[:, :1], X_test, y_test[:, :1], column_order, file_name="righting_gp_comparison_plot.png")
+
+        gp_righting = gps[0]
+        if gp_righting.model is None:
+            # Every comparison fit of it failed, fit it on the full training set so the error surfaces here
+            gp_righting.fit(X_train, y_train[:, :1], column_order)
+        gp_righting.save(RIGHTING_MODEL_PATH)
+
+    # --- Batch 2: Buoyancy (Last 2 cols) ---
+    gp_buoyancy = GaussianProcessSurrogate()
+    if gp_buoyancy.load(BUOYANCY_MODEL_PATH):
+        print(f"Loaded {BUOYANCY_MODEL_PATH}")
+    else:
+        print("Training Batch 2 (Buoyancy)...")
+        gps = [GaussianProcessSurrogate(ConfigurablePhysicsKernel(KC), ZeroMeanPrior()) for KC in (KERNEL_CONFIG_HYDRO_PROD, KERNEL_CONFIG_HYDRO_SUM, KERNEL_CONFIG_HYDRO_PERIODIC, KERNEL_CONFIG_MATERN, KERNEL_CONFIG_RBF, KERNEL_CONFIG_LINEAR)]
+
+        compare_models({"HYDRO_PROD": gps[0], "HYDRO_SUM": gps[1], "HYDRO_PERIODIC": gps[2], "MATERN": gps[3], "RBF": gps[4], "LINEAR": gps[5]},
+            X_train, y_train[:, -2:], X_test, y_test[:, -2:], column_order, file_name="buoyancy_gp_comparison_plot.png")
+
+        gp_buoyancy = gps[0]
+        if gp_buoyancy.model is None:
+            # Every comparison fit of it failed, fit it on the full training set so the error surfaces here
+            gp_buoyancy.fit(X_train, y_train[:, -2:], column_order)
+        gp_buoyancy.save(BUOYANCY_MODEL_PATH)
+
+    user_weights = WeightSelector(GP_Result).run()
+    time = user_weights["time"]
+    del user_weights["time"]
+    if PARETO_MODE:
+        # Budgets are split evenly, the chosen weights only rank the stored hulls (rerun just the rerank for other weights)
+        aggregator = Aggregator({k: 1 for k in user_weights}, gp_righting, gp_buoyancy, column_order, plot_n_steps=6)
+        optimise(aggregator.f, Constraints(), time=time, study_name=PARETO_STUDY, objectives=PARETO_OBJECTIVES, workers=WORKERS)
+    else:
+        aggregator = Aggregator(user_weights, gp_righting, gp_buoyancy, column_order, plot_n_steps=6)
+        f = aggregator.f
+        optimise(f, Constraints(), time=time, screen=aggregator.screen, workers=WORKERS)
+    if WORKERS == 1:
+        print("Optimised!! Now Saving")
+        gp_righting.save(RIGHTING_MODEL_PATH)
+        gp_buoyancy.save(BUOYANCY_MODEL_PATH)
+    else:
+        # Each worker updated its own copy of the GPs, these are unchanged. The new simulations are in DATA_PATH to retrain from
+        print("Optimised!! GPs were not updated by the parallel run, not saving them")
+
+    best_params, best_score, best_dict = rerank(user_weights, study_name=PARETO_STUDY) if PARETO_MODE else best_result()
+    visualizer = ResultVisualizer(best_params, best_dict, best_score, Hull)
+    visualizer.run()
+
+
+if __name__ == "__main__":
+    main()
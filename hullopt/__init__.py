@@ -1,8 +1,17 @@
+import importlib
 from .hull import Hull # Directly export Hull class (must be done before config)
-from hullopt import hull, config, simulations, gps, optimise, graphing
+from hullopt import hull, config, simulations
 
 # Aliases
 ParamsSim = simulations.Params
 ParamsHull = hull.Params
 
-__all__ = ["config", "hull", "gps", "simulations", "graphing", "optimise", "Hull", "ParamsSim", "ParamsHull"]
+# Modules with heavy dependencies (GPy, optuna, matplotlib) are only imported on first access
+_lazy_modules = ("gps", "optimise", "graphing", "datagen")
+
+def __getattr__(name: str):
+    if name in _lazy_modules:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+__all__ = ["config", "hull", "gps", "simulations", "graphing", "optimise", "datagen", "Hull", "ParamsSim", "ParamsHull"]
@@ -1,3 +1,10 @@
-from . import constants, defaults, hyperparameters
+import importlib
+from . import constants, hyperparameters
+
+# defaults builds on hullopt.hull, which reads constants while it is being imported, so it is only imported on first access
+def __getattr__(name: str):
+    if name == "defaults":
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 __all__ = ["constants", "defaults", "hyperparameters"]
@@ -1,5 +1,10 @@
 """
 Various constant values that don't describe learning process
 """
+import os
+
 water_density: float = 997 # kg/m^3
 gravity_on_earth: float = 9.81 # N/m
+
+# On-disk tier of the shared hull mesh cache (see hullopt.hull.cache), one per user rather than per working directory
+mesh_cache_directory: str = os.environ.get("HULLOPT_MESH_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "hullopt", "meshes"))
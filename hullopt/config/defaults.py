@@ -1,6 +1,8 @@
 """
 Default values for user inputs. e.g. hull constraints
+Default hulls are built on first access (not at import), then cached
 """
+from functools import lru_cache
 from hullopt.hull import Hull, Params
 import trimesh
 
@@ -17,7 +19,7 @@ def _bathtub():
 
 # hull_bathtub = Hull.from_mesh(_bathtub())
     
-dummy_hull = Hull(Params(
+dummy_hull_params = Params(
     density=kayak_density,
     hull_thickness=0.005,
     length=2.6,
@@ -33,9 +35,9 @@ dummy_hull = Hull(Params(
     cockpit_width=0.50,
     cockpit_position=0.50,
     cockpit_opening=True
-))
+)
 
-symmetric_default_hull = Hull(Params(
+symmetric_default_hull_params = Params(
     density=kayak_density,
     hull_thickness=0.005,
     length=2.6,
@@ -48,9 +50,9 @@ symmetric_default_hull = Hull(Params(
     rocker_position=0.50,
     rocker_exponent=2.0,
     cockpit_opening=False
-))
+)
 
-example_hull_1 = Hull(Params(
+example_hull_1_params = Params(
     density=kayak_density,
     hull_thickness=0.006,
     length=3.0,
@@ -63,4 +65,20 @@ example_hull_1 = Hull(Params(
     rocker_position=0.50,
     rocker_exponent=2.0,
     cockpit_opening=False
-))
\ No newline at end of file
+)
+
+_default_hull_params = {
+    "dummy_hull": dummy_hull_params,
+    "symmetric_default_hull": symmetric_default_hull_params,
+    "example_hull_1": example_hull_1_params,
+}
+
+@lru_cache(maxsize=None)
+def _default_hull(name: str) -> Hull:
+    return Hull(_default_hull_params[name])
+
+def __getattr__(name: str):
+    # Module level __getattr__ (PEP 562): builds default hulls lazily, e.g. on `from hullopt.config.defaults import dummy_hull`
+    if name in _default_hull_params:
+        return _default_hull(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
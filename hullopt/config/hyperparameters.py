@@ -14,9 +14,35 @@ weight_normalisers = {
     "initial_buoyancy": 801.7866
 }
 
+def weighted_score(metrics: dict, user_weights: dict) -> float:
+    """
+    Score of a hull's metrics (floats, or arrays of them) under user_weights, each metric normalised and weighted by its share of the total weight
+    """
+    tot = sum(abs(w) for w in user_weights.values())
+    aggregate = 0
+    for k, norm in weight_normalisers.items():
+        aggregate += metrics[k] * user_weights[k] / (norm * tot)
+    return aggregate
+
 # Analytic Simulator
 draught_threshold: float = 0.0001  # 99.99% accuracy in draught level
 draught_max_iterations: int = 100
+hydrostatic_table_levels: int = 64  # waterlines tabulated per (hull, heel) to bracket the draught
+# Simulations solved from the tables are charged a fixed number of iterations on the slicing solver's scale (24-32 per simulation),
+# so budgets and the stored cost column mean the same whichever solver ran
+hydrostatic_table_iterations: int = 30
+
+# GP updates: observations are added with fixed hyperparameters, which are re-optimised on this schedule
+gp_reoptimise_every: int = 25  # observations between re-optimisations (0 to only re-optimise on drift)
+gp_reoptimise_drift: float = 0.5  # change in per-observation log marginal likelihood (nats) that forces a re-optimisation
+
+# Aggregator early termination: an acquisition stops sampling once the posterior std of its metric is below its tolerance
+# (e.g. {"tipping_point": 0.02}, in the metric's units). Metrics without a tolerance use their whole budget
+aggregator_tolerances: dict = {}
+aggregator_convergence_samples: int = 64  # posterior righting/buoyancy curves drawn to estimate the metrics' std
+
+# Surrogate pre-screening (see Aggregator.screen): a candidate is only simulated if this quantile of its posterior score beats the incumbent
+screening_quantile: float = 0.95
 
 # Simulation cost weightings & functions
 cost_analytic_weight: float = 1
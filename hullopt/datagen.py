@@ -0,0 +1,111 @@
+"""
+Parallel training data generation for the GPs.
+Random hulls are simulated at a sweep of heels (plus some random extras) by a pool of worker processes, one hull per task,
+with results written through ResultStorage. Jobs already in the store are skipped, so an interrupted run resumes where it stopped.
+
+Hull params are planned without meshing them, each worker meshes its own hulls.
+
+Usage: python -m hullopt.datagen [--hulls 100] [--design sobol] [--workers N] [--output gp_data.db] ...
+"""
+
+import os
+import time
+import argparse
+from types import SimpleNamespace
+import multiprocessing
+from typing import List, Tuple
+import numpy as np
+from hullopt.hull import Hull, Params
+from hullopt.hull.utils import sample_hull_params
+from hullopt.simulations import analytic
+from hullopt.simulations.params import Params as ParamsSim
+from hullopt.simulations.storage import ResultStorage
+
+
+def plan_jobs(n_hulls: int, n_heels: int = 64, max_extra_heels: int = 35, seed: int = 42, cockpit_opening: bool = False,
+              design: str = "random") -> List[Tuple[Params, np.ndarray]]:
+    """
+    (hull params, heels) for each hull of the design (see sample_hull_params): n_heels evenly spaced heels in [0, 2pi), plus up to max_extra_heels random heels.
+    Deterministic in seed, so a resumed run plans the same jobs
+    """
+    rng = np.random.default_rng(seed)
+    jobs = []
+    for params in sample_hull_params(n_hulls, design, cockpit_opening, seed):
+        heels = np.pi / (n_heels / 2) * np.arange(n_heels)
+        extra = rng.random(int(rng.random() * max_extra_heels)) * 2 * np.pi
+        jobs.append((params, np.concatenate([heels, extra])))
+    return jobs
+
+
+def _remaining(storage: ResultStorage, jobs: List[Tuple[Params, np.ndarray]]) -> List[Tuple[Params, np.ndarray]]:
+    """
+    Drops the heels (and hulls) already in storage
+    """
+    remaining = []
+    for params, heels in jobs:
+        hull = SimpleNamespace(params=params)  # Lookups only need the hull params
+        todo = np.asarray([storage.lookup(ParamsSim(float(heel)), hull) is None for heel in heels], dtype=bool)
+        if np.any(todo):
+            remaining.append((params, heels[todo]))
+    return remaining
+
+
+def _init_worker(filepath: str) -> None:
+    analytic.storage = ResultStorage(filepath)
+
+
+def _simulate(job: Tuple[Params, np.ndarray]) -> int:
+    """
+    Simulates one hull at all its heels, storing the results. The mesh is built (or loaded from the mesh cache) once per hull
+    """
+    params, heels = job
+    try:
+        hull = Hull(params)
+    except (RuntimeError, ValueError) as e:
+        print(f"Warning: Skipping hull {params}: {e}")
+        return 0
+    analytic.run_sweep(hull, heels, use_cache=True)
+    return len(heels)
+
+
+def generate(filepath: str = "gp_data.db",
+             n_hulls: int = 100,
+             n_heels: int = 64,
+             max_extra_heels: int = 35,
+             seed: int = 42,
+             cockpit_opening: bool = False,
+             workers: int = 0,
+             design: str = "random") -> int:
+    """
+    Simulates the hulls of a design ("random", "sobol" or "lhs", see sample_hull_params) into the result store at filepath,
+    over workers processes (0 for one per CPU). Returns the number of simulations run
+    """
+    jobs = _remaining(ResultStorage(filepath), plan_jobs(n_hulls, n_heels, max_extra_heels, seed, cockpit_opening, design))
+    total = sum(len(heels) for _, heels in jobs)
+    print(f"{len(jobs)} hulls ({total} simulations) to run, {n_hulls - len(jobs)} hulls already stored")
+    if not jobs:
+        return 0
+
+    done = 0
+    start = time.perf_counter()
+    with multiprocessing.Pool(workers or os.cpu_count(), initializer=_init_worker, initargs=(filepath,)) as pool:
+        for i, n in enumerate(pool.imap_unordered(_simulate, jobs)):
+            done += n
+            elapsed = time.perf_counter() - start
+            print(f"Hull {i + 1}/{len(jobs)}, {done}/{total} simulations ({done / elapsed:.1f}/s)", end="\r")
+    print("")
+    return done
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate GP training data by simulating random hulls in parallel")
+    parser.add_argument("--output", default="gp_data.db", help="result store to write to (and resume from)")
+    parser.add_argument("--hulls", type=int, default=100, help="number of random hulls")
+    parser.add_argument("--heels", type=int, default=64, help="evenly spaced heels per hull")
+    parser.add_argument("--extra-heels", type=int, default=35, help="maximum number of extra random heels per hull")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--cockpit", action="store_true", help="generate hulls with a cockpit opening")
+    parser.add_argument("--design", default="random", choices=["random", "sobol", "lhs"], help="how hull params are drawn: uniformly, or a space-filling design")
+    parser.add_argument("--workers", type=int, default=0, help="worker processes (0 for one per CPU)")
+    args = parser.parse_args()
+    generate(args.output, args.hulls, args.heels, args.extra_heels, args.seed, args.cockpit, args.workers, args.design)
@@ -0,0 +1,75 @@
+"""
+Acquisition functions for Aggregator.f, evaluated over a whole heel grid with NumPy.
+Every acquisition takes the grid Xs (g,), the posterior mean mu and standard deviation sigma (..., g) and its own parameters
+(scalars, or arrays of shape (...) with one value per grid), so several grids (e.g. many hulls) can be stacked along the leading axes
+and evaluated in one call. New acquisitions are added to ACQUISITION_REGISTRY with register_acquisition.
+"""
+
+from typing import Callable, Dict
+import numpy as np
+from scipy.special import ndtr
+
+Acquisition = Callable[..., np.ndarray]
+
+ACQUISITION_REGISTRY: Dict[str, Acquisition] = {}
+
+_INV_SQRT_2PI = 1 / np.sqrt(2 * np.pi)
+
+
+def register_acquisition(name: str) -> Callable[[Acquisition], Acquisition]:
+    """
+    Decorator adding an acquisition, f(Xs, mu, sigma, **params) -> (..., g), to the registry under name
+    """
+    def register(f: Acquisition) -> Acquisition:
+        ACQUISITION_REGISTRY[name] = f
+        return f
+    return register
+
+
+def get_acquisition(name: str) -> Acquisition:
+    if name not in ACQUISITION_REGISTRY:
+        raise ValueError(f"Unknown acquisition '{name}'. Supported: {list(ACQUISITION_REGISTRY.keys())}")
+    return ACQUISITION_REGISTRY[name]
+
+
+def _per_grid(p) -> np.ndarray:
+    """
+    A parameter with one value per stacked grid, broadcastable over the grid axis
+    """
+    return np.asarray(p, dtype=float)[..., None]
+
+
+def _pdf(z: np.ndarray) -> np.ndarray:
+    return np.exp(-0.5 * z ** 2) * _INV_SQRT_2PI
+
+
+@register_acquisition("expected_improvement")
+def expected_improvement(Xs: np.ndarray, mu: np.ndarray, sigma: np.ndarray, f_star=0.0) -> np.ndarray:
+    """
+    Expected Improvement over f_star, to find the maximum
+    """
+    improvement = mu - _per_grid(f_star)
+    nonzero = sigma > 0
+    z = np.divide(improvement, sigma, out=np.zeros_like(improvement), where=nonzero)
+    return np.where(nonzero, improvement * ndtr(z) + sigma * _pdf(z), 0)
+
+
+@register_acquisition("sign_change")
+def sign_change(Xs: np.ndarray, mu: np.ndarray, sigma: np.ndarray, lower=0.0, upper=np.pi) -> np.ndarray:
+    """
+    'Sign-change' acquisition to find roots: the density of y = 0 for y ~ N(mu, sigma^2), only strictly between lower and upper
+    (i.e. larger than the point of diminishing stability)
+    """
+    inside = (_per_grid(lower) < Xs) & (Xs < _per_grid(upper)) & (sigma > 0)
+    safe_sigma = np.where(sigma > 0, sigma, 1)
+    return np.where(inside, _pdf(mu / safe_sigma) / safe_sigma, 0)
+
+
+@register_acquisition("max_variance")
+def max_variance(Xs: np.ndarray, mu: np.ndarray, sigma: np.ndarray, lower=0.0, upper=np.pi) -> np.ndarray:
+    """
+    Maximum variance sampling in [lower, upper), for integrals
+    TODO: Explore Quadrature acquisition functions
+    """
+    inside = (_per_grid(lower) <= Xs) & (Xs < _per_grid(upper))
+    return np.where(inside, sigma ** 2, 0)
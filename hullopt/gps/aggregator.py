@@ -1,40 +1,99 @@
 from hullopt import Hull, simulations, config
 from hullopt.gps.gp import GaussianProcessSurrogate
 from hullopt.gps.base_functions import update_gp
+from hullopt.gps.diagnostics import DiagnosticsRecorder, Round, plot_round
+from hullopt.gps.acquisitions import get_acquisition
 
-from typing import Tuple
-from scipy.stats import norm
+import os
+import multiprocessing
+from typing import Tuple, List, Optional, Dict
 import numpy as np
 
 from copy import deepcopy
 
-# Expected Improvement to find the maximum
-def a_EI_max(f_star, Xs, mu, varSigma):
-
-    sigma = np.sqrt(varSigma)
-    alpha = np.zeros_like(mu)
-
-    nonzero = sigma > 0
-    z = (mu[nonzero] - f_star) / sigma[nonzero]
-    alpha[nonzero] = ((mu[nonzero] - f_star) * norm.cdf(z)
-                   + sigma[nonzero] * norm.pdf(z))
-    return alpha
-# 'Sign-change' acquisition to find roots
-# SC(x) = p(y = 0) i.e. for y ~ N(mu(x), varSigma(x))
-# Only consider if LARGER than point of diminishing stability (maximum)
-def a_SC(dim, ndim, Xs, mu, varSigma):
-    print(f"Dim guess: {dim}")
-    return np.asarray([norm.pdf(0, m[0], s[0]).item() if dim < x < ndim else 0 for (x, (m, s)) in zip(Xs, zip(mu, np.sqrt(varSigma)))])
-
-# Integrals
-# Maximum variance sampling (up to point)
-# TODO: Explore Quadrature acquisition functions
-def a_INT(bounds, Xs, mu, varSigma):
-    return np.asarray([varSigma[i][0] if bounds[0] <= x < bounds[1] else 0 for i, x in enumerate(Xs)])
+def _posterior_covariance(gp: GaussianProcessSurrogate, X: np.ndarray) -> Tuple[np.ndarray, float]:
+    """
+    Posterior covariance of the GP's first output over X and its noise variance, both in output units
+    """
+    model = gp.model
+    scale = model.normalizer.std[0] ** 2 if model.normalizer is not None else 1.0
+    return gp.posterior_covariance(X), float(model.likelihood.variance[0]) * scale
+
+def _believer_update(cov: np.ndarray, i: int, noise: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Kriging believer: the posterior covariance over a grid after observing grid point i at its posterior mean
+    (which leaves the mean unchanged), and the reduction in variance at each grid point
+    """
+    reduction = cov[:, i] ** 2 / (cov[i, i] + noise)
+    return cov - np.outer(cov[:, i], cov[i, :]) / (cov[i, i] + noise), reduction
+
+# Metrics whose posterior std can end their acquisition's sampling early (see config.hyperparameters.aggregator_tolerances)
+CONVERGENCE_METRICS = ("overall_stability", "diminishing_stability", "tipping_point", "righting_energy", "overall_buoyancy")
+
+def _curve_samples(gp: GaussianProcessSurrogate, X: np.ndarray, mu: np.ndarray, n_samples: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Posterior draws (n_samples, g) of the GP's first output over X, in output units, around its predicted mean mu
+    """
+    return rng.multivariate_normal(mu, gp.posterior_covariance(X), size=n_samples, method="eigh", check_valid="ignore")
+
+def _draw_metrics(X_heels: np.ndarray, righting: np.ndarray, buoyancy: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """
+    Metrics (unclipped) of each drawn curve (n_samples, g), computed as f computes them from the mean
+    """
+    dx = X_heels[1] / (2 * np.pi)
+    crossings = righting[:, 1:-2] * righting[:, 2:-1] < 0
+    roots = np.where(crossings.any(axis=1), X_heels[crossings.argmax(axis=1)], np.pi)
+    below = X_heels[None, :] < roots[:, None]
+    metrics = {
+        "overall_stability": np.sum(righting * below, axis=1) * dx,
+        "initial_stability": righting[:, 1] / X_heels[1] * 2 * np.pi,
+        "diminishing_stability": righting.max(axis=1),
+        "tipping_point": roots,
+        "righting_energy": np.sum(righting * (~below & (X_heels < np.pi)), axis=1) * dx,
+    }
+    if buoyancy is not None:
+        metrics["overall_buoyancy"] = buoyancy.mean(axis=1)
+        metrics["initial_buoyancy"] = buoyancy[:, 0]
+    return metrics
+
+def _metric_stds(X_heels: np.ndarray, righting: np.ndarray, buoyancy: Optional[np.ndarray] = None) -> Dict[str, float]:
+    """
+    Posterior std of each convergence metric, over the drawn curves
+    """
+    return {k: np.std(v) for k, v in _draw_metrics(X_heels, righting, buoyancy).items() if k in CONVERGENCE_METRICS}
+
+def _simulate_heels(job) -> simulations.SweepResult:
+    params, heels = job
+    return simulations.analytic.run_sweep(Hull(params), heels)
 
 class Aggregator:
-    def __init__(self, user_weights, gp_righting: GaussianProcessSurrogate, gp_buoyancy: GaussianProcessSurrogate, column_order, plot_n_steps):
+    def __init__(self, user_weights, gp_righting: GaussianProcessSurrogate, gp_buoyancy: GaussianProcessSurrogate, column_order, plot_n_steps,
+                 batch_size: int = 1, workers: int = 0, diagnostics: Optional[DiagnosticsRecorder] = None, verbose: bool = True,
+                 tolerances: Optional[Dict[str, float]] = None):
+        """
+        plot_n_steps: rounds of the next f calls to plot (and show). Nothing is drawn once they are used up
+        batch_size: heels selected per round (q). Each is chosen with the righting GP's variance updated as if the heels
+                    before it had been observed at their predicted values (kriging believer), then all q are simulated
+                    concurrently and the GP is updated once
+        workers: processes simulating a batch (0 for one per CPU, 1 to simulate in this process)
+        diagnostics: recorder for every round (posterior, acquisitions, budgets), to dump and render later.
+                     Without one, rounds past plot_n_steps are neither recorded nor drawn
+        verbose: print budgets, acquisitions, GP updates and results
+        tolerances: posterior std per metric (of CONVERGENCE_METRICS) below which its acquisition stops sampling, leaving the rest
+                    of its budget unused (see unused_budget). Defaults to config.hyperparameters.aggregator_tolerances
+        """
+        self.tolerances = config.hyperparameters.aggregator_tolerances if tolerances is None else tolerances
+        unsupported = set(self.tolerances) - set(CONVERGENCE_METRICS)
+        if unsupported:
+            raise ValueError(f"No convergence criterion for {sorted(unsupported)}. Supported: {list(CONVERGENCE_METRICS)}")
+        self.unused_budget: Dict[str, float] = {}  # Budget left when each metric converged, in the last f call
+        self.simulations = 0  # Simulations run in the last f call
         self.plot_n_steps = plot_n_steps
+        self.batch_size = batch_size
+        self.workers = workers
+        self.diagnostics = diagnostics
+        self.verbose = verbose
+        self._pool = None
         self.weights = {}
         self.user_weights = user_weights
         tot = 0
@@ -45,23 +104,90 @@ class Aggregator:
         self.tot = tot
         self._weights_mut = None
         self._tot_mut = None
-        print(self.weights)
+        if verbose:
+            print(self.weights)
         self.gp_righting = gp_righting
         self.gp_buoyancy = gp_buoyancy
         self.column_order = column_order
 
-    def f(self, hull: Hull, budget: int = 160) -> Tuple[float, dict]:
-        self._weights_mut = deepcopy(self.weights)
-        self._tot_mut = self.tot
+    def _simulate(self, hull: Hull, heels: List[float]) -> List[simulations.Result]:
+        """
+        Simulates the hull at heels, split over the worker pool for batches
+        """
+        self.simulations += len(heels)
+        workers = min(self.workers or os.cpu_count(), len(heels))
+        if workers <= 1:
+            return [simulations.analytic.run(hull, simulations.Params(x)) for x in heels]
+        if self._pool is None:
+            self._pool = multiprocessing.Pool(self.workers or os.cpu_count())
+        sweeps = self._pool.map(_simulate_heels, [(hull.params, chunk) for chunk in np.array_split(np.asarray(heels), workers)])
+        return [sweep.result(i) for sweep in sweeps for i in range(len(sweep))]
+
+    def close(self) -> None:
+        """
+        Shuts down the simulation worker pool, if batches started one. f does this once it has scored a hull
+        """
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def _query_grid(self, params) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Heels from 0 to pi, and the GP inputs (in column_order) of the hull params at each
+        """
         def add_hull_params(x):
             def f(k):
                 match k:
                     case "cost": return 0
                     case "heel": return x
-                    case k: return getattr(hull.params, k)
+                    case k: return getattr(params, k)
             return np.asarray([f(k) for k in self.column_order])
         X_heels = np.linspace(0, np.pi, 180)
-        X_grid = np.asarray(list(map(add_hull_params, X_heels)))
+        return X_heels, np.asarray(list(map(add_hull_params, X_heels)))
+
+    def screen(self, params) -> Tuple[float, float]:
+        """
+        Scores hull params from the GPs' posteriors alone, without simulating: the score of the posterior mean curves (the scale f scores on),
+        and an optimistic bound, that score plus the spread of the scores of posterior draws up to their config.hyperparameters.screening_quantile
+        """
+        X_heels, X_grid = self._query_grid(params)
+        # The means and covariances below share one set of cached cross-covariance terms per GP
+        self.gp_righting.set_query_grid(X_grid)
+        self.gp_buoyancy.set_query_grid(X_grid)
+        mu_r, _ = self.gp_righting.predict(X_grid)
+        mu_b, _ = self.gp_buoyancy.predict(X_grid)
+
+        def score(righting, buoyancy):
+            metrics = _draw_metrics(X_heels, righting, buoyancy)
+            # Clipped as f clips the metrics of the mean
+            metrics["overall_stability"] = np.maximum(metrics["overall_stability"], 0)
+            metrics["righting_energy"] = np.minimum(metrics["righting_energy"], 0)
+            return config.hyperparameters.weighted_score(metrics, self.user_weights)
+
+        expected = float(score(mu_r[:, 0][None, :], mu_b[:, 0][None, :])[0])
+        rng = np.random.default_rng(0)
+        n_samples = config.hyperparameters.aggregator_convergence_samples
+        scores = score(_curve_samples(self.gp_righting, X_grid, mu_r[:, 0], n_samples, rng),
+                       _curve_samples(self.gp_buoyancy, X_grid, mu_b[:, 0], n_samples, rng))
+        # The metrics are nonlinear in the curve, so the draws' scores are not centred on the mean curve's. Only their spread is used
+        return expected, expected + float(np.quantile(scores - scores.mean(), config.hyperparameters.screening_quantile))
+
+    def f(self, hull: Hull, budget: int = 160) -> Tuple[float, dict]:
+        try:
+            return self._f(hull, budget)
+        finally:
+            # The worker pool lives for one hull's batches, so no processes are left behind between (or after) calls
+            self.close()
+
+    def _f(self, hull: Hull, budget: int) -> Tuple[float, dict]:
+        self._weights_mut = deepcopy(self.weights)
+        self._tot_mut = self.tot
+        self.simulations = 0
+        X_heels, X_grid = self._query_grid(hull.params)
+        # Both GPs are predicted on X_grid every iteration, between updates that only add rows
+        self.gp_righting.set_query_grid(X_grid)
+        self.gp_buoyancy.set_query_grid(X_grid)
 
         mx = (0, 0) # Max val
         root_estimate = np.pi / 2 # Estimated root based on mu
@@ -69,20 +195,25 @@ class Aggregator:
         initial_buoyancy = 0
 
         def update(xs, samples, righting=True):
-            print("")
-            print(f"(Updating {'righting' if righting else 'buoyancy'} GP at: {xs})")
+            if self.verbose:
+                print("")
+                print(f"(Updating {'righting' if righting else 'buoyancy'} GP at: {xs})")
             update_gp(self.gp_righting if righting else self.gp_buoyancy,
                       np.asarray([[x if k == "heel" else (getattr(hull.params, k) if k != "cost" else 0) for k in self.column_order] for x in xs]),
                       np.asarray([[sample.righting_moment_heel()] for sample in samples]) if righting else\
                       np.asarray([[sample.reserve_buoyancy, sample.reserve_buoyancy_hull] for sample in samples]),
-                      self.column_order)
+                      self.column_order, verbose=self.verbose)
         # Simulate at 0, X_heels[1] and pi, these anchors help stability
         # TODO: Avoid wasting simulations at 0 and pi, righting moment is definitionally equal to 0
         res1 = simulations.analytic.run(hull, simulations.Params(X_heels[1]))
+        self.simulations += 1
         if res1.righting_moment_heel() < 0:
             print("Warning: Bugged Hull? Negative Initial Stability.")
             return -1, {}
+        if self.diagnostics is not None:
+            self.diagnostics.start_hull(hull.params)
         update([0, X_heels[1], np.pi], [simulations.analytic.run(hull, simulations.Params(0)), res1, simulations.analytic.run(hull, simulations.Params(np.pi))])
+        self.simulations += 2
 
         def adjust_budgets(budgets, k, cost):
             budgets[k] -= cost
@@ -94,12 +225,15 @@ class Aggregator:
                         if not k2 == k: self._weights_mut[k2][0] -= diff
                         self._weights_mut[k2][1] -= diff
 
-        heel_index = self.column_order.index("heel")
         budgets = {k: (self._weights_mut[k][1]-self._weights_mut[k][0])/self._tot_mut * budget for k in self._weights_mut.keys()}
+        # Reserved from a metric's budget as each heel is picked, so one batch cannot overspend it. Settled at the actual cost after simulating
+        reserve = config.hyperparameters.cost_analytic(config.hyperparameters.hydrostatic_table_iterations)
+        self.unused_budget = {}
+        rng = np.random.default_rng(0)  # For posterior draws, leaving np.random's acquisition stream untouched
 
-        import matplotlib.pyplot as plt
         while any(budget > 0 for budget in budgets.values()):
-            print(f"Aggregator Budgets: {budgets}")
+            if self.verbose:
+                print(f"Aggregator Budgets: {budgets}")
             mu_r, varSigma_r = self.gp_righting.predict(X_grid)
             mu_b, varSigma_b = self.gp_buoyancy.predict(X_grid)
 
@@ -108,83 +242,116 @@ class Aggregator:
             diminishing_stability_estimate = X_heels[np.argmax(mu_r)]
             neg_diminishing_stability_estimate = X_heels[np.argmin(mu_r)]
 
-            # Temporary plotting for visualisation
-            plt.plot(X_heels, mu_r[:,0], label="μ")
-            plt.plot(X_heels, mu_r[:,0] + 2*np.sqrt(varSigma_r[:,0]), label="μ")
-            plt.plot(X_heels, mu_r[:,0] - 2*np.sqrt(varSigma_r[:,0]), label="μ")
-            plt.fill_between(
-                X_heels,
-                mu_r[:,0] - 2*np.sqrt(varSigma_r)[:,0],
-                mu_r[:,0] + 2*np.sqrt(varSigma_r)[:,0],
-                alpha=0.3,
-                label="μ ± 2σ"
-            )
-            
-            k = ""
-            r = np.random.random() * self._tot_mut # For selecting acquisition func            
-            for k2 in self._weights_mut.keys():
-                if self._weights_mut[k2][0] <= r < self._weights_mut[k2][1]:
-                    k = k2
+            # Stop sampling for metrics the posterior already pins down to within their tolerance
+            stds = {}
+            converging = [k for k in self.tolerances if budgets.get(k, 0) > 0]
+            if converging:
+                n_samples = config.hyperparameters.aggregator_convergence_samples
+                stds = _metric_stds(X_heels, _curve_samples(self.gp_righting, X_grid, mu_r[:, 0], n_samples, rng),
+                                    _curve_samples(self.gp_buoyancy, X_grid, mu_b[:, 0], n_samples, rng) if "overall_buoyancy" in converging else None)
+                for k in converging:
+                    if stds[k] < self.tolerances[k]:
+                        if k == "diminishing_stability":
+                            # Known without sampling it, the maximum is the posterior's
+                            mx = (X_heels[np.argmax(mu_r)], max(mx[1], mu_r.max()))
+                        self.unused_budget[k] = budgets[k]
+                        adjust_budgets(budgets, k, budgets[k])
+                if not any(budget > 0 for budget in budgets.values()):
                     break
 
-            # TODO: WORK OUT HOW SURE EACH ACQUISITION FUNCTION IS ON ITS RESULT (to optimise by terminating early)
-            print(f"Sampling for: {k}")
-            match k:
-                case "diminishing_stability":
-                    a = a_EI_max(mx[1], X_heels, mu_r, varSigma_r)
-                    x = X_heels[np.argmax(a)]
-                    sample = simulations.analytic.run(hull, simulations.Params(x))
-                    mx = (x, max(sample.righting_moment_heel(), mx[1]))
-                    update([mx[0]], [sample])
-                    adjust_budgets(budgets, k, sample.cost)
-
-                    plt.plot(X_heels, a/max(a)*max(mu_r[:,0] + 2*np.sqrt(varSigma_r[:,0])), label="EI Acquisition")
-                case "tipping_point":
-                    # Look for roots only exceeding our estimate of diminishing stability location
-                    # TODO: More principled proabilistic ways to determine root estimate and diminishing stability estimates.
-                    a = a_SC(diminishing_stability_estimate, neg_diminishing_stability_estimate, X_heels, mu_r, varSigma_r)
-                    x = X_heels[np.random.choice(len(a), p=a/(a.sum() if a.sum() > 0 else 1))]
-                    sample = simulations.analytic.run(hull, simulations.Params(x))
-                    y = sample.righting_moment_heel()
-                    update([x], [sample])
-                    adjust_budgets(budgets, k, sample.cost)
-
-                    plt.plot(X_heels, a/max(a)*max(mu_r[:,0] + 2*np.sqrt(varSigma_r[:,0])), label="Root Acquisition")
-         
-                case "overall_stability" | "righting_energy" | "overall_buoyancy":
-                    bounds = (0,0)
-                    moments = True
-                    match k:
-                        case "overall_stability": bounds = (0, root_estimate)
-                        case "righting_energy": bounds = (root_estimate, np.pi)
-                        case "overall_buoyancy":
-                            moments = False
-                            bounds = (0, np.pi)
-                    a = a_INT(bounds, X_heels, mu_r if moments else mu_b, varSigma_r if moments else varSigma_b)
-                    x = X_heels[np.random.choice(len(a), p=a/(a.sum() if a.sum() > 0 else 1))]
-                    sample = simulations.analytic.run(hull, simulations.Params(x))
-                    update([x], [sample])
-                    adjust_budgets(budgets, k, sample.cost)
-
-                    plt.plot(X_heels, a/max(a)*max(mu_r[:,0] + 2*np.sqrt(varSigma_r[:,0])), label=f"Variance Acquisition ({k})")
-
-                case "initial_stability":
-                    x = X_heels[1]
-                    initial_stability = simulations.analytic.run(hull, simulations.Params(x)).righting_moment_heel() / x * 2 * np.pi if varSigma_r[1][0] > 0 else mu_r[x][0]
+            # Only kept when it will be plotted or recorded
+            trace = None
+            if self.plot_n_steps > 0 or self.diagnostics is not None:
+                hull_index = len(self.diagnostics.hulls) - 1 if self.diagnostics is not None else 0
+                trace = Round(hull_index, X_heels, mu_r[:, 0].copy(), varSigma_r[:, 0].copy(), budgets=dict(budgets), metric_stds=dict(stds))
+            if self.batch_size > 1:
+                cov_r, noise_r = _posterior_covariance(self.gp_righting, X_grid)
+
+            # Select the round's heels: (acquisition, grid index)
+            batch = []
+            prior_var_r = varSigma_r  # The believer updates below replace varSigma_r, this keeps the round's posterior
+            for _ in range(self.batch_size):
+                if not any(budget > 0 for budget in budgets.values()):
+                    break
+                r = np.random.random() * self._tot_mut # For selecting acquisition func
+                # Metrics with budget left, their intervals tile [0, _tot_mut). Float drift as budgets retire can leave r past the last one
+                live = [k2 for k2 in self._weights_mut.keys() if self._weights_mut[k2][0] < self._weights_mut[k2][1]]
+                k = next((k2 for k2 in live if r < self._weights_mut[k2][1]), live[-1])
+
+                if self.verbose:
+                    print(f"Sampling for: {k}")
+                a = None
+                sigma_r = np.sqrt(varSigma_r[:, 0])
+                match k:
+                    case "diminishing_stability":
+                        a = get_acquisition("expected_improvement")(X_heels, mu_r[:, 0], sigma_r, f_star=mx[1])
+                        i = np.argmax(a)
+                    case "tipping_point":
+                        # Look for roots only exceeding our estimate of diminishing stability location
+                        # TODO: More principled proabilistic ways to determine root estimate and diminishing stability estimates.
+                        a = get_acquisition("sign_change")(X_heels, mu_r[:, 0], sigma_r, lower=diminishing_stability_estimate, upper=neg_diminishing_stability_estimate)
+                        i = np.random.choice(len(a), p=a/(a.sum() if a.sum() > 0 else 1))
+                    case "overall_stability" | "righting_energy" | "overall_buoyancy":
+                        bounds = (0,0)
+                        moments = True
+                        match k:
+                            case "overall_stability": bounds = (0, root_estimate)
+                            case "righting_energy": bounds = (root_estimate, np.pi)
+                            case "overall_buoyancy":
+                                moments = False
+                                bounds = (0, np.pi)
+                        mu, sigma = (mu_r[:, 0], sigma_r) if moments else (mu_b[:, 0], np.sqrt(varSigma_b[:, 0]))
+                        a = get_acquisition("max_variance")(X_heels, mu, sigma, lower=bounds[0], upper=bounds[1])
+                        i = np.random.choice(len(a), p=a/(a.sum() if a.sum() > 0 else 1))
+                    case "initial_stability":
+                        i = 1
+                    case "initial_buoyancy":
+                        i = 0
+                batch.append((k, i))
+                if trace is not None:
+                    trace.acquisitions.append((k, a, int(i)))
+
+                if a is not None:
+                    adjust_budgets(budgets, k, reserve)
+                    if self.batch_size > 1:
+                        # The rest of the batch is chosen as if this heel had been observed (at the predicted value)
+                        cov_r, reduction = _believer_update(cov_r, i, noise_r)
+                        varSigma_r = np.maximum(varSigma_r - reduction[:, None], 0)
+                else:
+                    # Initial stability/buoyancy are one-off samples, they use their whole budget
                     adjust_budgets(budgets, k, budgets[k])
-                            
-                case "initial_buoyancy":
-                    x = 0
-                    initial_buoyancy = simulations.analytic.run(hull, simulations.Params(x)).reserve_buoyancy
-                    adjust_budgets(budgets, k, budgets[k]) if varSigma_b[x][0] > 0 else mu_b[x]
-
-            plt.ylim(1.1*min(mu_r[:,0] - 2*np.sqrt(varSigma_r[:,0])), 1.1*max(mu_r[:,0] + 2*np.sqrt(varSigma_r[:,0])))
-            plt.title(f"Acquiring for: {k}")
-            plt.legend()
+
+            samples = self._simulate(hull, [X_heels[i] for _, i in batch])
+            updates = ([], [])
+            for (k, i), sample in zip(batch, samples):
+                x = X_heels[i]
+                match k:
+                    case "initial_stability":
+                        initial_stability = sample.righting_moment_heel() / x * 2 * np.pi if prior_var_r[1][0] > 0 else mu_r[1][0]
+                    case "initial_buoyancy":
+                        initial_buoyancy = sample.reserve_buoyancy
+                    case _:
+                        if k == "diminishing_stability":
+                            mx = (x, max(sample.righting_moment_heel(), mx[1]))
+                        updates[0].append(x)
+                        updates[1].append(sample)
+                        if budgets[k] > 0:
+                            # A retired metric stays retired, it is not refunded a cheaper simulation
+                            adjust_budgets(budgets, k, sample.cost - reserve)
+            if updates[0]:
+                update(*updates)
+
+            if self.diagnostics is not None:
+                self.diagnostics.record(trace)
             if self.plot_n_steps > 0:
+                import matplotlib.pyplot as plt
+                plot_round(trace)
                 plt.show()
+                plt.close()
                 self.plot_n_steps -= 1
 
+        if self.verbose and self.unused_budget:
+            print(f"Converged early, unused budget: {self.unused_budget}")
         # I use root_estimate here because, root may be wildly inaccurate for low budgets or when tipping point is not a priority
         overall_stability = sum(mu_r[np.where(X_heels < root_estimate)][:,0]) * (X_heels[1] / (2*np.pi))
         righting_energy = sum(mu_r[np.where([root_estimate <= x < np.pi for x in X_heels])][:,0]) * X_heels[1] / (2 * np.pi)
@@ -198,10 +365,9 @@ class Aggregator:
             "overall_buoyancy": overall_buoyancy,
             "initial_buoyancy": initial_buoyancy
         }
-        print(result)
-        aggregate = 0
-        for k, norm in config.hyperparameters.weight_normalisers.items():
-            aggregate += result[k] * (self.user_weights[k]) / (norm * self.tot)
-        print(aggregate)
+        aggregate = config.hyperparameters.weighted_score(result, self.user_weights)
+        if self.verbose:
+            print(result)
+            print(aggregate)
         return aggregate, result
                         
@@ -34,21 +34,24 @@ def update_gp(
     y_new_total: np.ndarray,
     column_order: List[str],
     X_test: Optional[np.ndarray] = None,
-    y_test: Optional[np.ndarray] = None
+    y_test: Optional[np.ndarray] = None,
+    verbose: bool = True
 ) -> float:
     """
-    Refits the GP model with new/updated data.
+    Adds new data to the GP model. The posterior is updated with the hyperparameters held fixed, and they are only
+    re-optimised on the schedule in config.hyperparameters (see GaussianProcessSurrogate.reoptimise_due).
+    verbose: print re-optimisation progress.
     Returns RMSE if test data is provided, otherwise returns None.
     """
     try:
-        # Exactly the logic from the loop (re-fitting with the new total set)
-
-        X_total = np.vstack([model.model.X, X_new_total]) if model.model.X is not None else X_new_total
-        y_total = np.vstack([model.model.Y, y_new_total]) if model.model.Y is not None else y_new_total
-        print(f"Fitting on {len(X_total)} samples")
-        model.model.set_XY(X_total, y_total)
-        model.model.kern.constrain_bounded(1e-3, 1000.0, warning=False)
-        model.model.optimize(messages=True)
+        model.add_data(X_new_total, y_new_total)
+        if model.reoptimise_due():
+            if verbose:
+                print(f"Fitting on {model.model.num_data} samples")
+            # Rescales the output normalisation to the total set too
+            model.model.set_XY(model.model.X, model.model.Y)
+            # Warm started from the current hyperparameters, which are rarely far off
+            model.optimise(num_restarts=1, messages=verbose)
         if X_test is not None and y_test is not None:
             mu, _ = model.predict(X_test)
             rmse = np.sqrt(mean_squared_error(y_test, mu))
@@ -0,0 +1,113 @@
+"""
+Diagnostics for Aggregator.f.
+Each acquisition round (the righting GP's posterior over the heel grid, the acquisition functions evaluated and the heels they chose,
+and the remaining budgets) is recorded as plain arrays, without plotting, so headless runs can dump the trace to disk and render it later.
+"""
+
+import json
+from dataclasses import dataclass, field, asdict
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+
+
+@dataclass
+class Round:
+    """
+    One acquisition round of Aggregator.f
+
+    hull - index of the hull in DiagnosticsRecorder.hulls
+    heels - rad (g,): heel grid
+    mu, var - (g,): righting GP posterior mean and variance over the grid, before the round's samples
+    acquisitions - (acquisition name, acquisition over the grid or None for fixed samples, chosen grid index) per sample
+    budgets - budget left per acquisition at the start of the round
+    metric_stds - posterior std of the metrics checked for convergence this round
+    """
+    hull: int
+    heels: np.ndarray
+    mu: np.ndarray
+    var: np.ndarray
+    acquisitions: List[Tuple[str, Optional[np.ndarray], int]] = field(default_factory=list)
+    budgets: Dict[str, float] = field(default_factory=dict)
+    metric_stds: Dict[str, float] = field(default_factory=dict)
+
+
+def plot_round(r: Round, ax: Any = None) -> Any:
+    """
+    Draws a round: μ ± 2σ over the heel grid, with each acquisition function scaled to the plot. Returns the axes
+    """
+    import matplotlib.pyplot as plt
+    if ax is None:
+        _, ax = plt.subplots()
+    std = np.sqrt(r.var)
+    ax.plot(r.heels, r.mu, label="μ")
+    ax.fill_between(r.heels, r.mu - 2*std, r.mu + 2*std, alpha=0.3, label="μ ± 2σ")
+    top = max(r.mu + 2*std)
+    labels = {"diminishing_stability": "EI Acquisition", "tipping_point": "Root Acquisition"}
+    for k, a, i in r.acquisitions:
+        if a is not None and max(a) > 0:
+            ax.plot(r.heels, a/max(a)*top, label=labels.get(k, f"Variance Acquisition ({k})"))
+        ax.axvline(r.heels[i], color="grey", linestyle=":")
+    ax.set_ylim(1.1*min(r.mu - 2*std), 1.1*top)
+    ax.set_title(f"Acquiring for: {', '.join(k for k, _, _ in r.acquisitions)}")
+    ax.legend()
+    return ax
+
+
+class DiagnosticsRecorder:
+    """
+    Sink for Aggregator.f's per-round diagnostics (attach with Aggregator(..., diagnostics=recorder))
+    """
+    def __init__(self, max_rounds: Optional[int] = None):
+        """
+        max_rounds: keep at most this many rounds, the most recent (None for all)
+        """
+        self.max_rounds = max_rounds
+        self.hulls: List[Dict[str, Any]] = []
+        self.rounds: List[Round] = []
+
+    def start_hull(self, hull_params: Any) -> None:
+        self.hulls.append(asdict(hull_params))
+
+    def record(self, r: Round) -> None:
+        self.rounds.append(r)
+        if self.max_rounds is not None and len(self.rounds) > self.max_rounds:
+            del self.rounds[0]
+
+    def dump(self, filepath: str) -> None:
+        """
+        Writes the trace to an .npz of arrays plus a JSON manifest of everything else
+        """
+        arrays = {}
+        manifest = {"hulls": self.hulls, "rounds": []}
+        for n, r in enumerate(self.rounds):
+            arrays[f"{n}_heels"], arrays[f"{n}_mu"], arrays[f"{n}_var"] = r.heels, r.mu, r.var
+            for j, (k, a, i) in enumerate(r.acquisitions):
+                if a is not None:
+                    arrays[f"{n}_acquisition_{j}"] = a
+            manifest["rounds"].append({"hull": r.hull,
+                                       "acquisitions": [[k, a is not None, int(i)] for k, a, i in r.acquisitions],
+                                       "budgets": {k: float(v) for k, v in r.budgets.items()},
+                                       "metric_stds": {k: float(v) for k, v in r.metric_stds.items()}})
+        np.savez(filepath, manifest=np.array(json.dumps(manifest)), **arrays)
+
+    @classmethod
+    def load(cls, filepath: str) -> "DiagnosticsRecorder":
+        recorder = cls()
+        with np.load(filepath) as data:
+            manifest = json.loads(str(data["manifest"]))
+            recorder.hulls = manifest["hulls"]
+            for n, r in enumerate(manifest["rounds"]):
+                acquisitions = [(k, data[f"{n}_acquisition_{j}"] if has_array else None, i)
+                                for j, (k, has_array, i) in enumerate(r["acquisitions"])]
+                recorder.rounds.append(Round(r["hull"], data[f"{n}_heels"], data[f"{n}_mu"], data[f"{n}_var"], acquisitions, r["budgets"],
+                                            r.get("metric_stds", {})))
+        return recorder
+
+    def render(self, rounds: Optional[List[int]] = None) -> None:
+        """
+        Plots the given rounds (default all), one figure each
+        """
+        import matplotlib.pyplot as plt
+        for n in (range(len(self.rounds)) if rounds is None else rounds):
+            plot_round(self.rounds[n])
+            plt.show()
@@ -1,15 +1,138 @@
 import os
+import json
 import pickle
+import importlib
+import multiprocessing
 import numpy as np
 import GPy
 import matplotlib.pyplot as plt 
+from scipy.cluster.vq import kmeans2
+from scipy.linalg import solve_triangular, cho_solve
+from GPy.core.parameterization.observable_array import ObsAr
+from GPy.inference.latent_function_inference.exact_gaussian_inference import ExactGaussianInference
+from GPy.inference.latent_function_inference.posterior import PosteriorExact
 from sklearn.model_selection import train_test_split 
 
-from typing import Dict, Any, Tuple, Optional, List
+from typing import Dict, Any, Tuple, Optional, List, Union
 from .strategies.interfaces import KernelStrategy, PriorStrategy
+from hullopt.config import hyperparameters
 
 
 
+def select_inducing_points(X: np.ndarray, num_inducing: int, method: str = "kmeans", kernel: Optional[GPy.kern.Kern] = None, seed: int = 0) -> np.ndarray:
+    """
+    Picks num_inducing inducing inputs summarising X (over the whole hull/heel space).
+    kmeans: cluster centres of X, with columns standardised so no parameter dominates by scale
+    variance: greedily picks the training point with the greatest prior variance left unexplained by the points picked so far
+              (a pivoted Cholesky of kernel's covariance)
+    """
+    if num_inducing >= len(X):
+        return X.copy()
+    if method == "kmeans":
+        scale = X.std(axis=0)
+        scale[scale == 0] = 1
+        centres, _ = kmeans2(X / scale, num_inducing, minit='++', seed=np.random.default_rng(seed))
+        return centres * scale
+    if method == "variance":
+        assert kernel is not None, "Greedy variance selection needs a kernel."
+        residual = kernel.Kdiag(X).astype(np.float64)
+        L = np.zeros((len(X), num_inducing))
+        picked = []
+        for j in range(num_inducing):
+            i = int(np.argmax(residual))
+            picked.append(i)
+            L[:, j] = (kernel.K(X, X[i:i+1])[:, 0] - L[:, :j] @ L[i, :j]) / np.sqrt(residual[i])
+            residual = np.maximum(residual - L[:, j] ** 2, 0)
+        return X[picked].copy()
+    raise ValueError(f"Unknown inducing point selection '{method}'. Supported: ['kmeans', 'variance']")
+
+
+# Version of the save format, see GaussianProcessSurrogate.save
+MODEL_FORMAT_VERSION = 1
+
+
+def _hyperparameters(parameterized: GPy.core.Parameterized) -> Dict[str, List[float]]:
+    """
+    Hyperparameter values by name, relative to the root (so a model's kernel parameters are named as in the bare kernel)
+    """
+    return {p.hierarchy_name().split(".", 1)[1]: np.asarray(p).ravel().tolist() for p in parameterized.flattened_parameters}
+
+
+def _set_hyperparameters(parameterized: GPy.core.Parameterized, values: Dict[str, Any], prefix: str = "") -> None:
+    """
+    Sets the hyperparameters named in values (see _hyperparameters) that parameterized has, prefix being its own name
+    relative to the model root ("" for the model itself)
+    """
+    for param in parameterized.flattened_parameters:
+        name = param.hierarchy_name().split(".", 1)[1]
+        name = f"{prefix}.{name}" if prefix else name
+        if name in values and np.size(values[name]) == param.size:
+            param[:] = np.reshape(values[name], param.shape)
+
+
+def _strategy_spec(strategy: Any) -> Optional[Dict[str, Any]]:
+    if strategy is None:
+        return None
+    return {"class": f"{type(strategy).__module__}.{type(strategy).__qualname__}", "config": strategy.get_config()}
+
+
+def _strategy_from_spec(spec: Optional[Dict[str, Any]]) -> Any:
+    if spec is None:
+        return None
+    module, name = spec["class"].rsplit(".", 1)
+    return getattr(importlib.import_module(module), name).from_config(spec["config"])
+
+
+def _save_array(path: str, array: np.ndarray) -> None:
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, np.ascontiguousarray(array, dtype=np.float64))
+    os.replace(tmp_path, path)
+
+
+class _GridCache:
+    """
+    Cross-covariance terms between the training inputs and a fixed query grid, valid for one (exact) posterior.
+    Predictions on the grid are then matrix-vector products, and adding training rows extends the terms by those rows
+    """
+    def __init__(self, model: GPy.core.GP, grid: np.ndarray):
+        self.grid = grid
+        self.K_cross = model.kern.K(np.asarray(model.X), grid)
+        self.L_inv_K_cross = solve_triangular(model.posterior.woodbury_chol, self.K_cross, lower=True)
+        self.K_diag = model.kern.Kdiag(grid)
+        self.prior_mean = model.mean_function.f(grid) if model.mean_function is not None else 0
+        self.posterior = model.posterior
+        self._K_grid: Optional[np.ndarray] = None  # Prior covariance of the grid, only built if a covariance is asked for
+
+    def extend(self, model: GPy.core.GP, X_new: np.ndarray, B: np.ndarray, C: np.ndarray) -> None:
+        """
+        Adds rows X_new, whose Cholesky factor block rows are [B^T, C] (see GaussianProcessSurrogate.add_data): O(n k g)
+        """
+        K_cross_new = model.kern.K(X_new, self.grid)
+        self.L_inv_K_cross = np.vstack([self.L_inv_K_cross, solve_triangular(C, K_cross_new - B.T @ self.L_inv_K_cross, lower=True)])
+        self.K_cross = np.vstack([self.K_cross, K_cross_new])
+        self.posterior = model.posterior
+
+    def predict(self, model: GPy.core.GP) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        As model.predict(self.grid)
+        """
+        mu = self.K_cross.T @ self.posterior.woodbury_vector + self.prior_mean
+        var = (self.K_diag - np.sum(self.L_inv_K_cross ** 2, axis=0))[:, None]
+        mu, var = model.likelihood.predictive_values(mu, var)
+        if model.normalizer is not None:
+            mu, var = model.normalizer.inverse_mean(mu), model.normalizer.inverse_variance(var)
+        return mu, var
+
+    def covariance(self, model: GPy.core.GP) -> np.ndarray:
+        """
+        Posterior covariance of the latent function over the grid, in normalised units: O(n g^2), with no solve against the training set
+        """
+        if self._K_grid is None:
+            self._K_grid = model.kern.K(self.grid)
+        return self._K_grid - self.L_inv_K_cross.T @ self.L_inv_K_cross
+
+
 class GaussianProcessSurrogate:
     """
     Wrapper for GPy to handle boring shit
@@ -17,10 +140,76 @@ class GaussianProcessSurrogate:
     def __init__(self, 
                  kernel_strat: KernelStrategy=None, 
                  prior_strat: PriorStrategy=None,
-                 model=None):
+                 model=None,
+                 num_inducing: Optional[int]=None,
+                 inducing_method: str="kmeans",
+                 num_restarts: int=1,
+                 workers: int=0):
+        """
+        num_inducing: fit a sparse GP with this many inducing points once there is more training data than that (None for an exact GP)
+        inducing_method: how inducing points are selected, "kmeans" or "variance" (see select_inducing_points)
+        num_restarts: hyperparameter optimisations per fit, one from the default (or warm start) hyperparameters and the rest
+                      from random ones. The best marginal likelihood is kept
+        workers: processes to run the restarts over (0 for one per CPU, 1 to run them serially)
+        """
         self.k_strat = kernel_strat
         self.p_strat = prior_strat
-        self.model: Optional[GPy.models.GPRegression] = model
+        self.model: Optional[GPy.core.GP] = model
+        self.num_inducing = num_inducing
+        self.inducing_method = inducing_method
+        self._since_optimise = 0  # Observations added since the hyperparameters were last optimised
+        self._ll_optimised: Optional[float] = None  # Per-observation log marginal likelihood when they were
+        self.num_restarts = num_restarts
+        self.workers = workers
+        self._warm_start: Dict[str, np.ndarray] = {}
+        self._query_grid: Optional[np.ndarray] = None
+        self._grid_cache: Optional[_GridCache] = None
+        self.column_order: Optional[List[str]] = None  # Input columns the model was fit on
+
+    def set_query_grid(self, X_grid: Optional[np.ndarray]) -> None:
+        """
+        Registers a grid of inputs that will be predicted at repeatedly (None to clear it).
+        Exact GPs cache the grid's cross-covariance with the training set, so predicting on it costs matrix-vector products,
+        and the cache is extended rather than rebuilt as observations are added (see add_data)
+        """
+        self._query_grid = None if X_grid is None else np.array(X_grid, dtype=np.float64)
+        self._grid_cache = None
+
+    def _is_query_grid(self, X_new: np.ndarray) -> bool:
+        return self._query_grid is not None and X_new.shape == self._query_grid.shape and np.array_equal(X_new, self._query_grid)
+
+    def _cached_grid(self) -> Optional[_GridCache]:
+        """
+        The grid cache for the current posterior, (re)built if the model was refit, or None if it does not apply
+        """
+        if self._query_grid is None or not isinstance(self.model.posterior, PosteriorExact) or self.model.posterior.woodbury_chol is None:
+            return None
+        if self._grid_cache is None or self._grid_cache.posterior is not self.model.posterior:
+            self._grid_cache = _GridCache(self.model, self._query_grid)
+        return self._grid_cache
+
+    def warm_start(self, source: Union[str, GPy.core.GP]) -> bool:
+        """
+        Starts later fits from the hyperparameters of a saved model (a filepath, see save) or a fitted GPy model.
+        Hyperparameters are matched by name, so the source should use the same kernel configuration.
+        Returns False if there is no saved model at source
+        """
+        if isinstance(source, str):
+            manifest_path = os.path.join(source, "manifest.json")
+            if os.path.isfile(manifest_path):
+                # Only the manifest is read, not the training data
+                with open(manifest_path) as f:
+                    hyperparameters = json.load(f)["hyperparameters"]
+            elif os.path.isfile(source):  # Legacy pickled GPy model
+                with open(source, 'rb') as f:
+                    hyperparameters = _hyperparameters(pickle.load(f))
+            else:
+                return False
+        else:
+            hyperparameters = _hyperparameters(source)
+        # Names are below the model root, which differs between exact and sparse GPs. Inducing inputs are reselected per fit
+        self._warm_start = {name: np.asarray(value) for name, value in hyperparameters.items() if name != "inducing_inputs"}
+        return True
 
 
 
@@ -39,11 +228,95 @@ class GaussianProcessSurrogate:
             mean_func = self.p_strat.get_mean_function(input_dim, output_dim=y.shape[1])
         
 
-            self.model = GPy.models.GPRegression(X, y, kernel=kernel, mean_function=mean_func, normalizer=True)
-        self.model.kern.constrain_bounded(1e-3, 1000.0, warning=False)
-        self.model.optimize(messages=True)
+            if self.num_inducing is not None and len(X) > self.num_inducing:
+                Z = select_inducing_points(X, self.num_inducing, self.inducing_method, kernel)
+                self.model = GPy.models.SparseGPRegression(X, y, kernel=kernel, Z=Z, mean_function=mean_func, normalizer=True)
+                # Inducing inputs stay where they were selected, optimising them adds num_inducing * input_dim parameters
+                self.model.inducing_inputs.fix(warning=False)
+            else:
+                self.model = GPy.models.GPRegression(X, y, kernel=kernel, mean_function=mean_func, normalizer=True)
+        self.column_order = list(column_order)
+        _set_hyperparameters(self.model, self._warm_start)
+        self.optimise()
         assert self.model.X is not None
 
+    def optimise(self, num_restarts: Optional[int] = None, messages: bool = True) -> None:
+        """
+        (Re-)optimises the hyperparameters on the current training data, starting from the current hyperparameters
+        and num_restarts - 1 random ones (defaults to self.num_restarts). messages prints the optimiser's progress.
+        """
+        num_restarts = self.num_restarts if num_restarts is None else num_restarts
+        self.model.kern.constrain_bounded(1e-3, 1000.0, warning=False)
+        if num_restarts > 1:
+            # Pool workers (e.g. compare_models') cannot start pools of their own, they run their restarts serially
+            parallel = self.workers != 1 and not multiprocessing.current_process().daemon
+            self.model.optimize_restarts(num_restarts, robust=True, parallel=parallel, num_processes=self.workers or None, verbose=messages)
+        else:
+            self.model.optimize(messages=messages)
+        self._since_optimise = 0
+        self._ll_optimised = np.asarray(self.model.log_likelihood()).item() / self.model.num_data
+
+    def reoptimise_due(self) -> bool:
+        """
+        Whether the hyperparameters are stale: gp_reoptimise_every observations have been added since they were optimised,
+        or the per-observation log marginal likelihood has drifted by more than gp_reoptimise_drift (see config.hyperparameters)
+        """
+        ll = np.asarray(self.model.log_likelihood()).item() / self.model.num_data
+        if self._ll_optimised is None:  # Loaded or given an already optimised model
+            self._ll_optimised = ll
+        every = hyperparameters.gp_reoptimise_every
+        return (every > 0 and self._since_optimise >= every) or abs(ll - self._ll_optimised) > hyperparameters.gp_reoptimise_drift
+
+    def add_data(self, X_new: np.ndarray, y_new: np.ndarray) -> None:
+        """
+        Conditions the posterior on new observations, keeping the hyperparameters (and output normalisation) fixed.
+        For exact GPs the Cholesky factor of the training covariance is extended by the new rows rather than refactorised:
+        O(n^2 k) for k new rows. Sparse GPs recompute their (O(n m^2)) posterior over the total set.
+        """
+        model = self.model
+        self._since_optimise += len(X_new)
+        if not isinstance(model.inference_method, ExactGaussianInference) or not isinstance(model.likelihood, GPy.likelihoods.Gaussian):
+            model.set_XY(np.vstack([model.X, X_new]), np.vstack([model.Y, y_new]))
+            return
+        X_new = np.asarray(X_new, dtype=np.float64)
+        y_new = np.asarray(y_new, dtype=np.float64)
+        X_old = np.asarray(model.X)
+        L = model.posterior.woodbury_chol
+        noise = float(model.likelihood.variance[0]) + 1e-8  # Same jitter as ExactGaussianInference
+
+        # [[L, 0], [B^T, C]] is the Cholesky factor of the extended covariance
+        K_cross = model.kern.K(X_old, X_new)
+        K_new = model.kern.K(X_new)
+        B = solve_triangular(L, K_cross, lower=True)
+        try:
+            C = np.linalg.cholesky(K_new + noise * np.eye(len(X_new)) - B.T @ B)
+        except np.linalg.LinAlgError:
+            # Numerically repeated inputs under a tiny noise variance: refactorise, with GPy adding jitter as needed
+            model.set_XY(np.vstack([X_old, X_new]), np.vstack([np.asarray(model.Y), y_new]))
+            return
+        n = len(X_old)
+        L_total = np.zeros((n + len(X_new), n + len(X_new)))
+        L_total[:n, :n] = L
+        L_total[n:, :n] = B.T
+        L_total[n:, n:] = C
+        K_total = np.block([[model.posterior._K, K_cross], [K_cross.T, K_new]])
+
+        X_total = np.vstack([X_old, X_new])
+        Y_total = np.vstack([np.asarray(model.Y), y_new])
+        Y_normalized = model.normalizer.normalize(Y_total) if model.normalizer is not None else Y_total
+        residual = Y_normalized - (model.mean_function.f(X_total) if model.mean_function is not None else 0)
+        alpha = cho_solve((L_total, True), residual)
+        log_det = 2 * np.sum(np.log(np.diag(L_total)))
+
+        model.X = ObsAr(X_total)
+        model.Y = Y_total if model.normalizer is not None else ObsAr(Y_total)
+        model.Y_normalized = ObsAr(Y_normalized)
+        previous = model.posterior
+        model.posterior = PosteriorExact(woodbury_chol=L_total, woodbury_vector=alpha, K=K_total)
+        model._log_marginal_likelihood = 0.5 * (-Y_total.size * np.log(2 * np.pi) - Y_total.shape[1] * log_det - np.sum(alpha * residual))
+        if self._grid_cache is not None and self._grid_cache.posterior is previous:
+            self._grid_cache.extend(model, X_new, B, C)
+
 
     def predict(self, X_new: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
         """
@@ -51,35 +324,136 @@ class GaussianProcessSurrogate:
         """
         if self.model is None:
             raise RuntimeError("Model has not been trained or loaded.")
+        if self._is_query_grid(X_new):
+            cache = self._cached_grid()
+            if cache is not None:
+                return cache.predict(self.model)
         return self.model.predict(X_new)
 
+    def posterior_covariance(self, X_new: np.ndarray, output: int = 0) -> np.ndarray:
+        """
+        Posterior covariance (without noise) of one output between the rows of X_new, in output units.
+        On the query grid of an exact GP this reuses the cached cross-covariance terms (see set_query_grid)
+        """
+        if self.model is None:
+            raise RuntimeError("Model has not been trained or loaded.")
+        model = self.model
+        if self._is_query_grid(X_new):
+            cache = self._cached_grid()
+            if cache is not None:
+                cov = cache.covariance(model)
+                return cov * model.normalizer.std[output] ** 2 if model.normalizer is not None else cov
+        _, cov = model.predict(X_new, full_cov=True, include_likelihood=False)
+        return cov[:, :, output] if cov.ndim == 3 else cov
+
     def save(self, filepath: str) -> None:
-        """Serializes the trained model to a pickle file."""
+        """
+        Saves the model to the directory filepath: a JSON manifest (format version, strategies, column order, hyperparameters
+        and output normalisation) plus the training data (and any inducing inputs) as memory-mappable .npy files.
+        Unlike pickled GPy models, this does not depend on the GPy version, see load.
+        """
         if self.model is None:
             raise RuntimeError("No model to save.")
-        
-        # Ensure directory exists
-        os.makedirs(os.path.dirname(filepath) or '.', exist_ok=True)
-        
-        with open(filepath, 'wb') as f:
-            pickle.dump(self.model, f)
+        if self.k_strat is None or self.column_order is None:
+            raise RuntimeError("Only models fit with a kernel strategy (or loaded from a saved model) can be saved.")
+        model = self.model
+        sparse = isinstance(model, GPy.core.SparseGP)
+        os.makedirs(filepath, exist_ok=True)
+
+        _save_array(os.path.join(filepath, "X.npy"), np.asarray(model.X))
+        _save_array(os.path.join(filepath, "Y.npy"), np.asarray(model.Y))
+        if sparse:
+            _save_array(os.path.join(filepath, "Z.npy"), np.asarray(model.Z))
+        manifest = {
+            "format_version": MODEL_FORMAT_VERSION,
+            "gpy_version": GPy.__version__,
+            "sparse": sparse,
+            "num_inducing": self.num_inducing,
+            "inducing_method": self.inducing_method,
+            "kernel_strategy": _strategy_spec(self.k_strat),
+            "prior_strategy": _strategy_spec(self.p_strat),
+            "column_order": self.column_order,
+            "num_data": int(model.num_data),
+            "hyperparameters": {name: value for name, value in _hyperparameters(model).items() if name != "inducing_inputs"},
+            "normalizer": None if model.normalizer is None else {"mean": np.asarray(model.normalizer.mean).tolist(),
+                                                                 "std": np.asarray(model.normalizer.std).tolist()},
+        }
+        # The manifest is written last, it is what makes the arrays a saved model
+        tmp_path = os.path.join(filepath, f"manifest.json.{os.getpid()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, os.path.join(filepath, "manifest.json"))
         print(f"GP Model saved to: {filepath}")
 
     def load(self, filepath: str) -> bool:
         """
-        Loads model if file exists. Returns True if successful, False otherwise.
+        Loads a saved model (see save) if it exists, rebuilding it from its strategies and hyperparameters without re-optimising.
+        Legacy pickled GPy models (a file at filepath) are still loaded, keeping this surrogate's strategies.
+        Returns True if successful, False otherwise.
         """
-        if not os.path.exists(filepath):
+        manifest_path = os.path.join(filepath, "manifest.json")
+        if os.path.isfile(filepath):
+            try:
+                with open(filepath, 'rb') as f:
+                    self.model = pickle.load(f)
+                print(f"GP Model loaded from: {filepath}")
+                return True
+            except (pickle.PickleError, EOFError) as e:
+                print(f"Failed to load model from {filepath}: {e}")
+                return False
+        if not os.path.isfile(manifest_path):
             return False
-            
+
         try:
-            with open(filepath, 'rb') as f:
-                self.model = pickle.load(f)
-            print(f"GP Model loaded from: {filepath}")
-            return True
-        except (pickle.PickleError, EOFError) as e:
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+            if manifest["format_version"] > MODEL_FORMAT_VERSION:
+                raise ValueError(f"format version {manifest['format_version']} is newer than this version of hullopt ({MODEL_FORMAT_VERSION})")
+            X = np.load(os.path.join(filepath, "X.npy"), mmap_mode='r')
+            Y = np.load(os.path.join(filepath, "Y.npy"), mmap_mode='r')
+            if len(X) != manifest["num_data"] or len(Y) != manifest["num_data"]:
+                raise ValueError("training data does not match the manifest")
+        except (OSError, ValueError, KeyError) as e:
             print(f"Failed to load model from {filepath}: {e}")
             return False
+
+        self.k_strat = _strategy_from_spec(manifest["kernel_strategy"])
+        self.p_strat = _strategy_from_spec(manifest["prior_strategy"])
+        self.column_order = manifest["column_order"]
+        self.num_inducing = manifest["num_inducing"]
+        self.inducing_method = manifest["inducing_method"]
+        hyperparameters = manifest["hyperparameters"]
+
+        # Hyperparameters are set on the parts before the model is built, so the posterior is only computed once
+        kernel = self.k_strat.build(X.shape[1], self.column_order)
+        _set_hyperparameters(kernel, hyperparameters, prefix=kernel.name)
+        mean_func = self.p_strat.get_mean_function(X.shape[1], output_dim=Y.shape[1]) if self.p_strat is not None else None
+        if mean_func is not None:
+            _set_hyperparameters(mean_func, hyperparameters, prefix=mean_func.name)
+        noise_var = hyperparameters.get("Gaussian_noise.variance", [1.0])[0]
+        # The saved normalisation is kept rather than recomputed: observations added since the last optimisation were
+        # normalised with the statistics of the data before them. The model is built on normalised Y, then given the normalizer
+        normalizer = None
+        Y_fit = Y
+        if manifest["normalizer"] is not None:
+            normalizer = GPy.util.normalizer.Standardize()
+            normalizer.mean, normalizer.std = np.asarray(manifest["normalizer"]["mean"]), np.asarray(manifest["normalizer"]["std"])
+            Y_fit = normalizer.normalize(Y)
+        if manifest["sparse"]:
+            Z = np.load(os.path.join(filepath, "Z.npy"))
+            self.model = GPy.models.SparseGPRegression(X, Y_fit, kernel=kernel, Z=Z, mean_function=mean_func)
+            self.model.inducing_inputs.fix(warning=False)
+            self.model.likelihood.variance[:] = noise_var
+        else:
+            self.model = GPy.models.GPRegression(X, Y_fit, kernel=kernel, mean_function=mean_func, noise_var=noise_var)
+        if normalizer is not None:
+            self.model.normalizer = normalizer
+            self.model.Y = Y
+        self._since_optimise = 0
+        self._ll_optimised = None
+        self._grid_cache = None
+        print(f"GP Model loaded from: {filepath}")
+        return True
         
         
 if __name__ == "__main__":   
@@ -89,8 +463,8 @@ if __name__ == "__main__":
     from strategies.priors import HydrostaticBaselinePrior, ZeroMeanPrior
     from utils import load_simulation_data
 
-    DATA_FILE = "gp_data.pkl"
-    MODEL_PATH = "models/boat_gp.pkl"
+    DATA_FILE = "gp_data.db"
+    MODEL_PATH = "models/boat_gp"
 
 
     X_full, y_full, column_order = load_simulation_data(DATA_FILE)
@@ -1,11 +1,39 @@
+import os
+import multiprocessing
 import numpy as np
 import matplotlib.pyplot as plt
-from typing import Dict, Any, List
+from copy import deepcopy
+from typing import Dict, Any, List, Optional, Tuple
 from hullopt.gps.gp import GaussianProcessSurrogate
 from sklearn.metrics import mean_squared_error
 
 
+# Set in each pool worker by _init_worker: the models and data, so only (name, n) crosses process boundaries per task
+_worker_state: Dict[str, Any] = {}
 
+# Surrogate attributes set by fit, sent back from the workers to the caller's models
+_FIT_STATE = ("model", "column_order", "_since_optimise", "_ll_optimised")
+
+
+def _init_worker(models, X_train, y_train, X_test, y_test, column_order) -> None:
+    _worker_state.update(models=models, X_train=X_train, y_train=y_train, X_test=X_test, y_test=y_test, column_order=column_order)
+
+
+def _fit_and_score(task: Tuple[str, int]) -> Tuple[float, Optional[Dict[str, Any]]]:
+    """
+    Fits a copy of model name on the first n training rows. Returns (test RMSE, the copy's fit state, see _FIT_STATE)
+    """
+    name, n = task
+    state = _worker_state
+    gp = deepcopy(state["models"][name])
+    try:
+        # We catch errors here so one failing model doesn't crash the whole comparison
+        gp.fit(state["X_train"][:n], state["y_train"][:n], state["column_order"])
+        mu, _ = gp.predict(state["X_test"])
+        return np.sqrt(mean_squared_error(state["y_test"], mu)), {k: getattr(gp, k) for k in _FIT_STATE}
+    except Exception as e:
+        print(f"  Err training {name}: {e}")
+        return np.nan, None  # NaN to maintain list length
 
 
 def compare_models(
@@ -16,10 +44,13 @@ def compare_models(
     y_test: np.ndarray= None,
     column_order: List[str]= None,
     ratios: List[float] = [0.2, 0.4, 0.6, 0.8, 1.0],
-    file_name: str = "gp_comparison_plot.png"
+    file_name: str = "gp_comparison_plot.png",
+    workers: int = 0
 ) -> None:
     """
     Trains multiple GP models on increasing subsets of data and plots the RMSE comparison.
+    Every (model, subset) fit is independent, they run over workers processes (0 for one per CPU, 1 to run serially).
+    Each model is left fitted on its largest subset.
     """
     print(f"\n--- Starting Comparison (Test Set Size: {len(X_test)}) ---")
     
@@ -27,7 +58,8 @@ def compare_models(
     results = {name: [] for name in models.keys()}
     valid_ratios = []
     
-    for name, gp in models.items():
+    tasks = []
+    for name in models.keys():
         for ratio in ratios:
             if X_train is not None:
                 n = int(len(X_train) * ratio)
@@ -40,20 +72,25 @@ def compare_models(
                 continue
             
             valid_ratios.append(ratio)
-            X_sub = X_train[:n]
-            y_sub = y_train[:n]
-        
-            print(f"Training on {n} samples ({int(ratio*100)}%)...")
+            print(f"Training {name} on {n} samples ({int(ratio*100)}%)...")
+            tasks.append((name, n))
+
+    state = (models, X_train, y_train, X_test, y_test, column_order)
+    workers = min(workers or os.cpu_count(), len(tasks))
+    if workers > 1:
+        with multiprocessing.Pool(workers, initializer=_init_worker, initargs=state) as pool:
+            scores = pool.map(_fit_and_score, tasks, chunksize=1)
+    else:
+        _init_worker(*state)
+        scores = [_fit_and_score(task) for task in tasks]
+    _worker_state.clear()
 
-            try:
-                # We catch errors here so one failing model doesn't crash the whole loop
-                gp.fit(X_sub, y_sub, column_order)
-                mu, _ = gp.predict(X_test)
-                rmse = np.sqrt(mean_squared_error(y_test, mu))
-                results[name].append(rmse)
-            except Exception as e:
-                print(f"  Err training {name}: {e}")
-                results[name].append(np.nan) # Append NaN to maintain list length
+    for (name, n), (rmse, fit_state) in zip(tasks, scores):
+        results[name].append(rmse)
+        if fit_state is not None:
+            # Tasks are in increasing n per model, so this leaves each fitted on its largest subset
+            for k, v in fit_state.items():
+                setattr(models[name], k, v)
 
     # --- Plotting ---
     if not valid_ratios:
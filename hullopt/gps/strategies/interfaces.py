@@ -17,6 +17,13 @@ class BaseStrategy(ABC):
     def get_config(self) -> Dict[str, Any]:
         return self.config
 
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "BaseStrategy":
+        """
+        Rebuilds a strategy from its (JSON round-tripped) get_config(), e.g. when loading a saved model
+        """
+        return cls(**config)
+
 class KernelStrategy(BaseStrategy):
     """
     Base class for Kernel construction.
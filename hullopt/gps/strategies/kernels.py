@@ -64,6 +64,10 @@ class ConfigurablePhysicsKernel(KernelStrategy):
         """
         super().__init__(name="Configurable Physics Kernel", config=config_map)
 
+    @classmethod
+    def from_config(cls, config: Dict[str, str]) -> "ConfigurablePhysicsKernel":
+        return cls(config)
+
     def build(self, input_dim: int, parameter_order: List[str]) -> GPy.kern.Kern:
         """
         Just goes through the column_map. If the key exists in self.config,
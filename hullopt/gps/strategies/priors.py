@@ -41,7 +41,7 @@ class HydrostaticMapping(GPy.core.Mapping):
 class HydrostaticBaselinePrior(PriorStrategy):
 
     def __init__(self, col_map: dict):
-        super().__init__(name="Hydrostatic Formula")
+        super().__init__(name="Hydrostatic Formula", config={"col_map": col_map})
         self.col_map = col_map
 
     def get_mean_function(self, input_dim: int, output_dim: int = 1):
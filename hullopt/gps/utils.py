@@ -1,7 +1,7 @@
 import pandas as pd # Optional, but good for visualizing
 import numpy as np
-import pickle
-from typing import Tuple, Dict, Any, List
+from typing import Tuple, Dict, Any, List, Optional
+from hullopt.simulations.storage import ResultStorage
 
 
 def get_category_heuristic(param_name: str) -> str:
@@ -21,68 +21,24 @@ def get_category_heuristic(param_name: str) -> str:
 def default_param_categories() -> Dict[str, str]:
     return {'heel': 'angles', 'length': 'shape', 'beam': 'shape', 'density': 'shape', 'draft': 'shape', 'section_shape_exponent': 'shape'}
 
-def load_simulation_data(filepath: str) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+def load_simulation_data(filepath: str, columns: Optional[List[str]] = None) -> Tuple[np.ndarray, np.ndarray, List[str]]:
     """
-    Loads simulation data from a pickle file.
+    Loads simulation data from a result store (see simulations.storage.ResultStorage).
     Returns the X matrix, y matrix, and the list of column names corresponding to X.
+    columns: input columns of X (defaults to every stored input column, in sorted order)
     """
+    X, y, feature_order = ResultStorage(filepath).to_arrays(columns)
 
-    raw_inputs = []
-    raw_outputs = []
-
-    with open(filepath, 'rb') as f:
-        while True:
-            try:
-                row_data = pickle.load(f)
-                
-                # Assuming row_data is a tuple like (input_dict, output_tuple)
-                input_data = row_data[0]
-                output_data = row_data[1]
-                assert len(output_data) == 2, f"length of output is wrong {len(output_data)}, output is {output_data}"
-                assert len(output_data[0]) == 3, "length of output 1 is wrong"
-                assert len(output_data[1]) == 2, "length of output 2 is wrong"
-                # Ensure input is a dictionary (convert if it's a tuple of pairs)
-                if not isinstance(input_data, dict):
-                    input_data = dict(input_data)
-                
-                flat_outputs = []
-                for group in output_data:
-
-                    for val in group:
-                        flat_outputs.append(float(val))
-
-                raw_inputs.append(input_data)
-                raw_outputs.append(flat_outputs)
-                
-            except EOFError:
-                break
-            except Exception as e:
-                print(f"Skipping corrupted line: {e}")
-                continue
-    
-    if not raw_inputs:
+    if len(X) == 0:
         print("No data loaded.")
         return np.array([]), np.array([]), []
 
-    # 1. Determine the column order based on the first row's keys
-    #    This ensures consistency for the entire X matrix construction.
-    feature_order = list(raw_inputs[0].keys())
-    
     print("-" * 40)
-    print(f"Loaded {len(raw_inputs)} rows.")
+    print(f"Loaded {len(X)} rows.")
     print(f"Data Column Order: {feature_order}")
     print("-" * 40)
 
-    # 2. Build X matrix enforcing the specific feature_order
-    X_list = []
-    for d in raw_inputs:
-        # Extract values in the exact order of feature_order
-        row = [float(d[k]) for k in feature_order]
-        X_list.append(row)
-
-    X = np.array(X_list, dtype=np.float64)
-    y = np.array(raw_outputs, dtype=np.float64)
-        # --- DIAGNOSTIC CHECK START ---
+    # --- DIAGNOSTIC CHECK START ---
     print("\n=== SHAPE VERIFICATION ===")
 
     # 1. Basic Shape Check
@@ -87,7 +87,7 @@ def plot_simulation(simulation, hull, lower = -np.pi, upper = np.pi, resolution
     plot_heels(params, results)
 
 def plot_pickle(hull_index = 0):
-    xs, ys, column_order = load_simulation_data("./gp_data.pkl")
+    xs, ys, column_order = load_simulation_data("./gp_data.db")
     i = column_order.index("heel")
     j = column_order.index("cost") # TODO: Make cost an output!
     print(j)
@@ -126,7 +126,7 @@ def plot_pickle(hull_index = 0):
     plot_heels(heels, rs)
 
 def view_pickle(hull_index = 0, heel = 0):
-    xs, ys, column_order = load_simulation_data("./gp_data.pkl")
+    xs, ys, column_order = load_simulation_data("./gp_data.db")
     i = column_order.index("heel")
     j = column_order.index("cost") # TODO: Make cost an output!
     split = list(zip(map(lambda x:
@@ -150,10 +150,10 @@ def view_pickle(hull_index = 0, heel = 0):
     hull_params["cockpit_opening"] = hull_params["cockpit_opening"] == 1.0    # Why is this stored / loading as a float?
     hull_obj = Hull(hullopt.ParamsHull(**hull_params))
     print(f"Hull params: {hullopt.ParamsHull(**hull_params)}")
-    simulations.analytic.run(hull_obj, simulations.Params(heel)).scene.show()
+    simulations.analytic.run(hull_obj, simulations.Params(heel), use_cache=False).scene.show()
 
 def resimulate_pickle(hull_index = 0):
-    xs, ys, column_order = load_simulation_data("./gp_data.pkl")
+    xs, ys, column_order = load_simulation_data("./gp_data.db")
     i = column_order.index("heel")
     j = column_order.index("cost") # TODO: Make cost an output!
     split = list(zip(map(lambda x:
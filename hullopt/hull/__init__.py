@@ -1,4 +1,5 @@
 from .hull import Hull
 from .params import Params
+from .cache import MeshCache, mesh_cache
 
-__all__ = ["Hull", "Params"]
+__all__ = ["Hull", "Params", "MeshCache", "mesh_cache"]
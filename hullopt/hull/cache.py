@@ -0,0 +1,177 @@
+"""
+Content-addressed cache of generated hull meshes.
+Meshes are keyed by a canonical hash of the hull Params and the generator settings,
+held in an in-memory LRU and persisted as memory-mappable .npy files on disk.
+"""
+
+import os
+import json
+import hashlib
+from collections import OrderedDict
+from dataclasses import asdict
+from typing import Callable, Dict, Optional, Tuple
+import numpy as np
+from trimesh import Trimesh
+from hullopt.config import constants
+from .params import Params
+from .generation import GENERATOR_VERSION, DEFAULT_RESOLUTION
+
+
+def params_key(params: Params, exclude: Tuple[str, ...] = (), **settings) -> str:
+    """
+    Canonical hash of hull params (less those in exclude) and generator settings (resolution, version, engine, ...)
+    Floats are written with repr so equal params always hash equally, regardless of numpy/python float types
+    """
+    def canonical(v):
+        if isinstance(v, (bool, np.bool_)):
+            return bool(v)
+        if isinstance(v, (int, float, np.integer, np.floating)):
+            return repr(float(v))
+        return v
+    payload = {
+        "params": {k: canonical(v) for k, v in asdict(params).items() if k not in exclude},
+        "settings": {k: canonical(v) for k, v in settings.items()},
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+class MeshCache:
+    """
+    Two tier hull mesh cache: in-memory LRU of (vertices, faces) arrays, backed by a size-bounded directory of .npy files.
+    Cached arrays are never handed out directly, each hit builds a fresh Trimesh so callers may mutate it freely.
+    """
+    def __init__(self,
+                 directory: Optional[str] = constants.mesh_cache_directory,
+                 max_memory_entries: int = 128,
+                 max_disk_bytes: int = 1 << 30) -> None:
+        """
+        directory: on-disk tier location (None for memory only), by default config.constants.mesh_cache_directory
+        max_memory_entries: number of meshes kept in the in-memory LRU
+        max_disk_bytes: total size of the on-disk tier before least recently used meshes are evicted
+        """
+        self.directory = directory
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: "OrderedDict[str, Tuple[np.ndarray, np.ndarray]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _paths(self, key: str) -> Tuple[str, str]:
+        assert self.directory is not None
+        return (os.path.join(self.directory, f"{key}_vertices.npy"),
+                os.path.join(self.directory, f"{key}_faces.npy"))
+
+    def _remember(self, key: str, arrays: Tuple[np.ndarray, np.ndarray]) -> None:
+        self._memory[key] = arrays
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _load(self, key: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        if self.directory is None:
+            return None
+        vertices_path, faces_path = self._paths(key)
+        try:
+            arrays = (np.load(vertices_path, mmap_mode='r'), np.load(faces_path, mmap_mode='r'))
+            # Mark as recently used for eviction
+            os.utime(vertices_path)
+            return arrays
+        except (OSError, ValueError):
+            # Missing, partially evicted or corrupt entry
+            return None
+
+    def _save(self, key: str, arrays: Tuple[np.ndarray, np.ndarray]) -> None:
+        if self.directory is None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        # Faces first, so a vertices file only ever exists alongside its faces
+        for path, array in reversed(list(zip(self._paths(key), arrays))):
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.save(f, np.ascontiguousarray(array))
+            os.replace(tmp_path, path)
+        self._evict()
+
+    def _evict(self) -> None:
+        """
+        Delete least recently used meshes until the on-disk tier fits in max_disk_bytes
+        """
+        entries: Dict[str, Tuple[float, int]] = {}
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(".npy"):
+                continue
+            key = entry.name.rsplit("_", 1)[0]
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue  # Evicted by another process since the scan
+            last_used, size = entries.get(key, (0.0, 0))
+            entries[key] = (max(last_used, stat.st_mtime), size + stat.st_size)
+
+        total = sum(size for _, size in entries.values())
+        for key, (_, size) in sorted(entries.items(), key=lambda kv: kv[1][0]):
+            if total <= self.max_disk_bytes:
+                break
+            for path in self._paths(key):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            total -= size
+
+    def get(self, key: str) -> Optional[Trimesh]:
+        """
+        Returns the cached mesh for key, or None on a miss
+        """
+        arrays = self._memory.get(key)
+        if arrays is not None:
+            self._memory.move_to_end(key)
+        else:
+            arrays = self._load(key)
+            if arrays is None:
+                self.misses += 1
+                return None
+            self._remember(key, arrays)
+        self.hits += 1
+        vertices, faces = arrays
+        return Trimesh(vertices=np.array(vertices), faces=np.array(faces), process=False)
+
+    def put(self, key: str, mesh: Trimesh) -> None:
+        arrays = (np.array(mesh.vertices, dtype=np.float64), np.array(mesh.faces, dtype=np.int64))
+        self._remember(key, arrays)
+        self._save(key, arrays)
+
+    def get_or_build(self, params: Params, build: Callable[..., Trimesh], engine: Optional[str] = None) -> Trimesh:
+        """
+        Returns the mesh for params from the cache, building (and caching) it with build(params, engine=engine) on a miss.
+        Density does not change the geometry, so it is left out of the key and set on the returned mesh
+        """
+        key = params_key(params,
+                         exclude=("density",),
+                         generator_version=GENERATOR_VERSION,
+                         n_stations=DEFAULT_RESOLUTION[0],
+                         n_points=DEFAULT_RESOLUTION[1],
+                         engine=engine)
+        mesh = self.get(key)
+        if mesh is None:
+            mesh = build(params, engine=engine)
+            self.put(key, mesh)
+        mesh.density = params.density
+        return mesh
+
+    def clear(self) -> None:
+        """
+        Empty both tiers
+        """
+        self._memory.clear()
+        if self.directory is not None and os.path.isdir(self.directory):
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith(".npy"):
+                    try:
+                        os.remove(entry.path)
+                    except FileNotFoundError:
+                        pass
+
+
+# Shared cache used by Hull
+mesh_cache = MeshCache()
@@ -2,7 +2,13 @@
 Hull constraint logic
 """
 
+import numpy as np
+
 class Constraints:
+  # Hull params the constraints depend on, the default columns of check_params_batch's candidates
+  PARAM_COLUMNS = ("length", "beam", "depth", "hull_thickness", "cross_section_exponent", "beam_position",
+                   "rocker_bow", "rocker_stern", "rocker_position", "rocker_exponent")
+
   def __init__(self,
               # Absolute parameter bounds
               length_range: tuple[float, float]=(1.5, 4.5), # Slightly widened for general use
@@ -56,7 +62,10 @@ class Constraints:
 
   def check_hull(self, hull):
     # Check hull satisfies constraints
-    params = hull.params
+    return self.check_params(hull.params)
+
+  def check_params(self, params):
+    # Check hull params satisfy constraints, without needing a mesh
 
     # Check absolute bounds
     absolute_bounds = [
@@ -121,3 +130,38 @@ class Constraints:
 
       
     return True
+
+  @classmethod
+  def params_array(cls, params_list, columns=PARAM_COLUMNS):
+    """
+    Candidate matrix (n, len(columns)) of a list of hull Params, for check_params_batch
+    """
+    return np.asarray([[getattr(params, c) for c in columns] for params in params_list], dtype=float).reshape(-1, len(columns))
+
+  def check_params_batch(self, candidates, columns=PARAM_COLUMNS):
+    """
+    Checks many candidate hulls at once, without meshes: the same constraints as check_params, vectorised over the rows of candidates (n, len(columns)).
+    Returns the (n,) mask of valid candidates and each constraint's violation magnitude per candidate, (n,) arrays that are 0 where it is satisfied
+    (in the units of the bounded param or ratio)
+    """
+    candidates = np.asarray(candidates, dtype=float)
+    column = {c: candidates[:, i] for i, c in enumerate(columns)}
+
+    def outside(x, bounds):
+      return np.maximum(np.maximum(bounds[0] - x, x - bounds[1]), 0)
+
+    violations = {
+      "length": outside(column["length"], self.length_range),
+      "hull_thickness": outside(column["hull_thickness"], self.hull_thickness_range),
+      "cross_section_exponent": outside(column["cross_section_exponent"], self.cross_section_exponent_range),
+      "beam_position": outside(column["beam_position"], self.beam_position_range),
+      "rocker_bow": outside(column["rocker_bow"], self.rocker_bow_range),
+      "rocker_stern": outside(column["rocker_stern"], self.rocker_stern_range),
+      "rocker_position": outside(column["rocker_position"], self.rocker_position_range),
+      "rocker_exponent": outside(column["rocker_exponent"], self.rocker_exponent_range),
+      "length_to_beam_ratio": outside(column["length"] / column["beam"], self.length_to_beam_ratio_range),
+      "beam_to_depth_ratio": outside(column["beam"] / column["depth"], self.beam_to_depth_ratio_range),
+    }
+    # Comparisons with NaN (e.g. 0/0 ratios) are False, so NaN never passes
+    mask = np.all([v == 0 for v in violations.values()], axis=0)
+    return mask, violations
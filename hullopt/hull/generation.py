@@ -7,6 +7,11 @@ from trimesh import Trimesh
 import trimesh
 from typing import Tuple, Any, cast
 
+# Bump whenever a change to mesh generation changes the meshes produced (invalidates cached meshes)
+GENERATOR_VERSION: int = 1
+# Default (stations, points per station) resolution of generated hulls
+DEFAULT_RESOLUTION: Tuple[int, int] = (60, 32)
+
 def super_ellipse(angle: float, width: float, height: float, n: float) -> Tuple[float, float]:
     """
     Takes an angle in radians, width and height, and exponent n
@@ -18,79 +23,116 @@ def super_ellipse(angle: float, width: float, height: float, n: float) -> Tuple[
     z_raw = np.sign(s) * (np.abs(s) ** (2 / n))
     return x_raw * width, z_raw * height
 
-def generate_simple_hull(length: float, beam: float, depth: float, cross_section_exponent: float, beam_position: float, N_STATIONS: int=60, N_POINTS: int=32, type: str='outer') -> Trimesh:
+# Column order of the stacked parameter array accepted by simple_hull_arrays
+SIMPLE_HULL_COLUMNS = ("length", "beam", "depth", "cross_section_exponent", "beam_position")
+
+def simple_hull_faces(N_STATIONS: int=DEFAULT_RESOLUTION[0], N_POINTS: int=DEFAULT_RESOLUTION[1]) -> np.ndarray:
     """
-    Generate a simple  mesh (with no rocker) based on global dimensions and cross-section shape of the hull
+    Face index array shared by every simple hull of a given resolution
+    Two triangles per quad (station-major), then interleaved bow/stern caps, all wound outwards
     """
+    i, j = np.meshgrid(np.arange(N_STATIONS - 1), np.arange(N_POINTS), indexing='ij')
+    next_j = (j + 1) % N_POINTS
+
+    # indices of current and next station
+    curr_stat_idx = i * N_POINTS + j
+    curr_stat_next_idx = i * N_POINTS + next_j
+    next_stat_idx = (i + 1) * N_POINTS + j
+    next_stat_next_idx = (i + 1) * N_POINTS + next_j
+
+    # two triangles per quad
+    # NOTE: wound outwards to agree with the caps, so fix_normals has nothing to flip (its BFS re-winding is slow)
+    quads = np.stack([
+        np.stack([next_stat_next_idx, curr_stat_next_idx, curr_stat_idx], axis=-1),
+        np.stack([next_stat_idx, next_stat_next_idx, curr_stat_idx], axis=-1),
+    ], axis=2).reshape(-1, 3)
 
-    vertices = []
-    faces = []
+    # connect bow and stern faces so it's not open at ends. We need a watertight mesh
+    bow_tip_idx = N_STATIONS * N_POINTS
+    stern_tip_idx = bow_tip_idx + 1
+    last_ring_start = (N_STATIONS - 1) * N_POINTS
+    j = np.arange(N_POINTS)
+    next_j = (j + 1) % N_POINTS
+    caps = np.stack([
+        np.stack([np.full(N_POINTS, bow_tip_idx), j, next_j], axis=-1),
+        np.stack([np.full(N_POINTS, stern_tip_idx), last_ring_start + next_j, last_ring_start + j], axis=-1),
+    ], axis=1).reshape(-1, 3)
+
+    return np.concatenate([quads, caps])
+
+def simple_hull_vertices(params: np.ndarray, N_STATIONS: int=DEFAULT_RESOLUTION[0], N_POINTS: int=DEFAULT_RESOLUTION[1], type: str='outer') -> np.ndarray:
+    """
+    Vertex grids for a batch of simple hulls (no rocker)
+    params: (B, 5) array with columns SIMPLE_HULL_COLUMNS
+    Returns a (B, N_STATIONS * N_POINTS + 2, 3) array, station-major then angle, followed by the bow and stern tips
+    """
+    params = np.atleast_2d(np.asarray(params, dtype=np.float64))
+    length, beam, depth, cross_section_exponent, beam_position = (params[:, k, None] for k in range(5))
 
     # setting up intial structure
     stat_vals = np.linspace(0, 1.0, N_STATIONS) # normalized points along the hull overall length, so that it can be easily scaled later
-    angle_vals = np.linspace(0, 2 * np.pi, N_POINTS, endpoint=False)  
-
-    # Generate vertices
-    for stat in stat_vals:
-        x_pos = length * stat
-
-        if stat <= beam_position:
-            # bow half of hull goes from 0 at bow to 1 at max_beam_position
-            width_taper_factor = np.sin((stat / beam_position) * (np.pi / 2.0))
-        else:
-            # stern half of hull goes from 1 at max_beam_position to 0 at stern
-            width_taper_factor = np.sin(((stat - beam_position) / (1.0 - beam_position)) * (np.pi / 2.0) + (np.pi / 2.0))
-
-        curr_width = max(beam * width_taper_factor, 1e-4)
-        curr_depth = max(depth * width_taper_factor, 1e-4)
-
-        for angle in angle_vals:
-            if 0 <= angle <= np.pi:
-                y_pos, z_raw = super_ellipse(angle, curr_width / 2.0, curr_depth, cross_section_exponent)
-                # bottom half of hull
-                z_pos = -np.abs(z_raw)  # lower half is fully submerged
-            else:
-                # top half of hull
-                y_pos, z_raw = super_ellipse(angle, curr_width / 2.0, curr_depth, n=2.0)
-                z_pos = np.abs(z_raw) * (0.2 if type == 'outer' else 0.1)  # upper half is shallower to create a deck, and adjusted for cockpit opening to have a lip
-            
-            vertices.append([x_pos, y_pos, z_pos])
-
-    # Generate faces
-    for i in range(N_STATIONS - 1):
-        for j in range(N_POINTS):
-            # indices of current station
-            curr_stat_idx = i * N_POINTS + j
-            curr_stat_next_idx = i * N_POINTS + ((j + 1) % N_POINTS)
-
-            # indices of next station
-            next_stat_idx = (i + 1) * N_POINTS + j
-            next_stat_next_idx = (i + 1) * N_POINTS + ((j + 1) % N_POINTS)
-            # two triangles per quad
-            faces.append([curr_stat_idx, curr_stat_next_idx, next_stat_next_idx])
-            faces.append([curr_stat_idx, next_stat_next_idx, next_stat_idx])
+    angle_vals = np.linspace(0, 2 * np.pi, N_POINTS, endpoint=False)
+
+    # bow half of hull goes from 0 at bow to 1 at max_beam_position
+    # stern half of hull goes from 1 at max_beam_position to 0 at stern
+    with np.errstate(divide='ignore', invalid='ignore'):
+        width_taper_factor = np.where(stat_vals <= beam_position,
+                                      np.sin((stat_vals / beam_position) * (np.pi / 2.0)),
+                                      np.sin(((stat_vals - beam_position) / (1.0 - beam_position)) * (np.pi / 2.0) + (np.pi / 2.0)))
+
+    curr_width = np.maximum(beam * width_taper_factor, 1e-4)  # (B, N_STATIONS)
+    curr_depth = np.maximum(depth * width_taper_factor, 1e-4)
+
+    # bottom half of hull uses the cross-section exponent and is fully submerged,
+    # top half is a shallower ellipse to create a deck, adjusted for cockpit opening to have a lip
+    bottom = angle_vals <= np.pi
+    n = np.where(bottom, cross_section_exponent, 2.0)  # (B, N_POINTS)
+    y_unit, z_unit = super_ellipse(angle_vals, 1.0, 1.0, n)
+    z_scale = np.where(bottom, -1.0, 0.2 if type == 'outer' else 0.1)
+
+    B = params.shape[0]
+    vertices = np.empty((B, N_STATIONS * N_POINTS + 2, 3))
+    grid = vertices[:, :-2].reshape(B, N_STATIONS, N_POINTS, 3)
+    grid[..., 0] = (length * stat_vals)[:, :, None]
+    grid[..., 1] = y_unit[:, None, :] * (curr_width / 2.0)[:, :, None]
+    grid[..., 2] = np.abs(z_unit[:, None, :] * curr_depth[:, :, None]) * z_scale
 
     # Close bow and stern
-    bow_tip_idx = len(vertices)
-    stern_tip_idx = len(vertices) + 1
+    vertices[:, -2] = 0.0  # bow tip
+    vertices[:, -1] = 0.0  # stern tip
+    vertices[:, -1, 0] = length[:, 0]
+    return vertices
 
-    vertices.append([0.0, 0.0, 0.0])  # bow tip
-    vertices.append([length, 0.0, 0.0])  # stern tip
+def simple_hull_arrays(params: np.ndarray, N_STATIONS: int=DEFAULT_RESOLUTION[0], N_POINTS: int=DEFAULT_RESOLUTION[1], type: str='outer') -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Generate vertex grids and the shared face index array for a stacked batch of simple hull parameters in one call
+    params: (B, 5) array with columns SIMPLE_HULL_COLUMNS
+    Returns (vertices (B, V, 3), faces (F, 3))
+    """
+    return simple_hull_vertices(params, N_STATIONS, N_POINTS, type), simple_hull_faces(N_STATIONS, N_POINTS)
 
-    # connect bow and stern faces so it's not open at ends. We need a watertight mesh
-    for j in range(N_POINTS):
-        next_j = (j + 1) % N_POINTS
-        # Bow faces
-        faces.append([bow_tip_idx, j, next_j])
-        # Stern faces
-        last_ring_start = (N_STATIONS - 1) * N_POINTS
-        faces.append([stern_tip_idx, last_ring_start + next_j, last_ring_start + j])
-    
-    hull_mesh = Trimesh(vertices=np.array(vertices), faces=np.array(faces), process=True)
+def generate_simple_hull(length: float, beam: float, depth: float, cross_section_exponent: float, beam_position: float, N_STATIONS: int=DEFAULT_RESOLUTION[0], N_POINTS: int=DEFAULT_RESOLUTION[1], type: str='outer') -> Trimesh:
+    """
+    Generate a simple  mesh (with no rocker) based on global dimensions and cross-section shape of the hull
+    """
+    vertices, faces = simple_hull_arrays([[length, beam, depth, cross_section_exponent, beam_position]], N_STATIONS, N_POINTS, type)
+
+    hull_mesh = Trimesh(vertices=vertices[0], faces=faces, process=True)
     hull_mesh.fix_normals()
 
     return hull_mesh
 
+def stitch_hollow_shell(outer: Trimesh, inner: Trimesh) -> Trimesh:
+    """
+    Builds a hollow shell from an outer hull and an inner hull lying entirely inside it, without a boolean
+    The shell is the outer surface plus the inner surface with its winding reversed, so it is watertight
+    with volume outer.volume - inner.volume. No rim is needed as the deck of both hulls is closed
+    """
+    inner = inner.copy()
+    inner.invert()
+    shell = trimesh.util.concatenate([outer, inner])
+    return cast(Trimesh, shell)
+
 def apply_rocker_to_hull(mesh: Trimesh, length: float, rocker_bow: float, rocker_stern: float, rocker_position: float, rocker_exponent: float) -> Trimesh:
     """
     Deforms a straight hull mesh to apply longitudinal curvature (rocker)
@@ -6,27 +6,33 @@ Including mesh and all info required for simulation
 from trimesh import Trimesh
 import trimesh
 from .params import Params
-from .generation import generate_simple_hull, apply_rocker_to_hull, add_cockpit_to_hull
+from .generation import generate_simple_hull, apply_rocker_to_hull, add_cockpit_to_hull, stitch_hollow_shell
 from typing import Optional
 from .constraints import Constraints
+from .cache import mesh_cache
 import numpy as np
 
 class Hull:
   """
   Class for hull objects, generated from a set of parameters, or directly from a mesh
   """
-  def __init__(self, params: Optional[Params], from_mesh: Optional[Trimesh] = None) -> None:
+  def __init__(self, params: Optional[Params], from_mesh: Optional[Trimesh] = None, constraints: Optional[Constraints] = None) -> None:
     """
     params: Generate hull from params (density, etc.)
     from_mesh: Generate from specified trimesh instead
+    constraints: Params are checked against these (default Constraints()) before any mesh is built
     """
     # Set unmodified params
     self.density: float = params.density
     self.hull_thickness: float = params.hull_thickness
     self.params: Params = params
+
+    # Check constraints
+    (constraints or Constraints()).check_params(params)
     
     if from_mesh is None:
-      self.mesh: Trimesh = Hull.generate_mesh(params)
+      # Meshes are content-addressed by params, so rebuilding an already seen hull is a cache load
+      self.mesh: Trimesh = mesh_cache.get_or_build(params, Hull.generate_mesh)
     else:
       self.mesh = from_mesh
       self.mesh.density = params.density
@@ -37,16 +43,17 @@ class Hull:
     if not self.mesh.is_watertight:
       # We must have a watertight hull mesh
       raise RuntimeError("Generated/Provided Hull contains Holes")
-    
-    # Check constraints
-    Constraints().check_hull(self)
   
   @classmethod
   def from_mesh(cls, mesh: Trimesh):
     return cls(None, from_mesh=mesh)
         
   @staticmethod
-  def generate_mesh(params: Params) -> Trimesh:
+  def generate_mesh(params: Params, engine: Optional[str] = None) -> Trimesh:
+    """
+    engine: None stitches the hollow shell directly from the outer and inner surfaces (no boolean needed),
+            otherwise the trimesh boolean engine used to subtract the inner hull from the outer hull (e.g. "blender")
+    """
     # Generate outer hull mesh
     outer_mesh = generate_simple_hull(
       length=params.length,
@@ -88,9 +95,13 @@ class Hull:
       rocker_exponent=params.rocker_exponent
     )
 
-    # Create a hollow hull shell by subtracting inner from outer
-    # Note: Use Blender, manifold3d (or Trimesh's integration with it) has a bug in it's difference calculations forgetting to invert normals of the subtracting mesh
-    mesh = outer_mesh.difference(inner_mesh, engine="blender")
+    # Create a hollow hull shell from outer and inner hulls
+    # The inner hull lies entirely inside the outer hull, so the shell is just the outer surface plus the reversed inner surface
+    # Note: If using a boolean, use Blender, manifold3d (or Trimesh's integration with it) has a bug in it's difference calculations forgetting to invert normals of the subtracting mesh
+    if engine is None:
+      mesh = stitch_hollow_shell(outer_mesh, inner_mesh)
+    else:
+      mesh = outer_mesh.difference(inner_mesh, engine=engine)
 
     # Add cockpit opening
     if params.cockpit_opening:
@@ -1,83 +1,126 @@
+import os
+import multiprocessing
+from typing import Optional
 import numpy as np
+from scipy.stats import qmc
 from .hull import Hull
 from .params import Params
 from .constraints import Constraints
 
 
-def generate_random_hulls(n: int, cockpit_opening: bool = False, seed: int = 42) -> list[Hull]:
+# Uniform draws per candidate hull, in the order generate_random_hulls has always drawn its params
+_DRAWS_PER_CANDIDATE = 12
+
+
+def _random_candidates(u: np.ndarray, constraints: Constraints) -> dict:
     """
-    Generate n random hulls that satisfy default constraints. 
+    Candidate hull params (arrays of length m) from uniform draws u (m, _DRAWS_PER_CANDIDATE)
+    """
+    def uniform(bounds, x):
+        # As np.random.uniform(*bounds) computes from its draw
+        return bounds[0] + (bounds[1] - bounds[0]) * x
+
+    length = uniform(constraints.length_range, u[:, 0])
+    # Absolute beam/depth bounds were dropped from Constraints, draw them through the ratio bounds instead
+    beam = length / uniform(constraints.length_to_beam_ratio_range, u[:, 1])
+    depth = beam / uniform(constraints.beam_to_depth_ratio_range, u[:, 2])
+    rocker_bow = uniform(constraints.rocker_bow_range, u[:, 6])
+    return {
+        "length": length,
+        "beam": beam,
+        "depth": depth,
+        "cross_section_exponent": uniform(constraints.cross_section_exponent_range, u[:, 3]),
+        "beam_position": uniform(constraints.beam_position_range, u[:, 4]),
+        "rocker_position": np.full(len(u), 0.5),  # Keep rocker position centered
+        "rocker_exponent": uniform(constraints.rocker_exponent_range, u[:, 5]),
+        "rocker_bow": rocker_bow,
+        "rocker_stern": uniform((np.maximum(rocker_bow - 0.05, constraints.rocker_stern_range[0]),
+                                 np.minimum(rocker_bow, constraints.rocker_stern_range[1])), u[:, 7]),
+        "hull_thickness": uniform(constraints.hull_thickness_range, u[:, 8]),
+        # Scale cockpit dimensions proportionally to hull size
+        # Use ratios from constraints for consistency
+        "cockpit_length": uniform(constraints.cockpit_length_ratio_range, u[:, 9]) * length,
+        "cockpit_width": uniform(constraints.cockpit_width_ratio_range, u[:, 10]) * beam,
+        # Cockpit position: slight variation around center
+        "cockpit_position": uniform(constraints.cockpit_position_range, u[:, 11]),
+    }
+
+
+def _candidate_params(candidates: dict, i: int, cockpit_opening: bool) -> Params:
+    return Params(density=900.0, cockpit_opening=cockpit_opening, **{k: float(v[i]) for k, v in candidates.items()})
+
+
+def _params_sampler(design: str, constraints: Constraints, cockpit_opening: bool, seed: int):
+    """
+    Returns draw(m): the params of the next m candidates of the design that satisfy constraints, in design order.
+    Successive draws continue the same design (Sobol sequence, Latin hypercubes or uniform stream)
+    """
+    match design:
+        case "sobol":
+            random = qmc.Sobol(_DRAWS_PER_CANDIDATE, seed=seed).random
+        case "lhs":
+            random = qmc.LatinHypercube(_DRAWS_PER_CANDIDATE, seed=seed).random
+        case "random":
+            # A private stream, the global np.random state is left alone
+            rng = np.random.RandomState(seed)
+            random = lambda m: rng.random_sample((m, _DRAWS_PER_CANDIDATE))
+        case _:
+            raise ValueError(f"Unknown design '{design}'. Supported: ['sobol', 'lhs', 'random']")
+
+    def draw(m: int) -> list[Params]:
+        candidates = _random_candidates(random(m), constraints)
+        # Only rounding in the ratios (a draw on a bound) can fail, those are dropped and made up by later draws
+        valid, _ = constraints.check_params_batch(np.stack([candidates[c] for c in Constraints.PARAM_COLUMNS], axis=1))
+        valid &= candidates["rocker_stern"] <= candidates["rocker_bow"]
+        return [_candidate_params(candidates, i, cockpit_opening) for i in np.flatnonzero(valid)]
+    return draw
+
+
+def sample_hull_params(n: int, design: str = "sobol", cockpit_opening: bool = False, seed: int = 42,
+                       constraints: Optional[Constraints] = None) -> list[Params]:
     """
-    np.random.seed(seed)
-    
-    # uses default constraints for now, we can define our own as well
-    constraints = Constraints()  
+    Draws n hull params satisfying constraints (default Constraints()), without meshing them.
+    Params are drawn in the ratio parameterisation (length, length/beam and beam/depth ratios), with the stern rocker drawn below the bow's,
+    so the constraints hold by construction. The rare candidate that fails them on rounding is replaced by the design's next point.
+    design: "sobol" (scrambled Sobol sequence) or "lhs" (Latin hypercube) space-filling designs over the constraint ranges,
+            or "random" for the uniform draws of generate_random_hulls (the same params for the same seed)
+    """
+    draw = _params_sampler(design, constraints or Constraints(), cockpit_opening, seed)
+    params = []
+    while len(params) < n:
+        params += draw(n - len(params))
+    return params
+
+
+def _build_hull(params: Params) -> Optional[Hull]:
+    try:
+        return Hull(params)
+    except (RuntimeError, ValueError):
+        return None  # Invalid hull, skipped
+
+
+def build_hulls(params_list: list[Params], workers: int = 1) -> list[Hull]:
+    """
+    Meshes hulls from params over workers processes (0 for one per CPU), skipping any that fail to build
+    """
+    workers = workers or os.cpu_count()
+    if workers == 1:
+        hulls = map(_build_hull, params_list)
+    else:
+        with multiprocessing.Pool(workers) as pool:
+            hulls = pool.map(_build_hull, params_list, chunksize=max(1, len(params_list) // (4 * workers)))
+    return [hull for hull in hulls if hull is not None]
+
+
+def generate_random_hulls(n: int, cockpit_opening: bool = False, seed: int = 42, design: str = "random", workers: int = 1) -> list[Hull]:
+    """
+    Generate n random hulls that satisfy default constraints, meshed over workers processes (0 for one per CPU).
+    design: "random" for uniform draws, or a space-filling "sobol"/"lhs" design (see sample_hull_params).
+    Hulls that fail to build are replaced by the design's next candidates
+    """
+    # Candidates are drawn and checked in batches, so only valid params are meshed, in the order one-at-a-time draws would give them
+    draw = _params_sampler(design, Constraints(), cockpit_opening, seed)
     hulls = []
-    
-    for _ in range(n):
-
-        while True:
-
-            # Get random values from constraint ranges
-            length = np.random.uniform(*constraints.length_range)
-            beam = np.random.uniform(*constraints.beam_range)
-            depth = np.random.uniform(*constraints.depth_range)
-            cross_section_exponent = np.random.uniform(*constraints.cross_section_exponent_range)
-            beam_position = np.random.uniform(*constraints.beam_position_range)
-            rocker_position = 0.5  # Keep rocker position centered
-            rocker_exponent = np.random.uniform(*constraints.rocker_exponent_range)
-            rocker_bow = np.random.uniform(*constraints.rocker_bow_range)
-            rocker_stern = np.random.uniform(max(rocker_bow - 0.05, constraints.rocker_stern_range[0]),
-                                            min(rocker_bow, constraints.rocker_stern_range[1]))
-            hull_thickness = np.random.uniform(*constraints.hull_thickness_range)
-            
-            # Scale cockpit dimensions proportionally to hull size
-            # Use ratios from constraints for consistency
-            cockpit_length_ratio = np.random.uniform(*constraints.cockpit_length_ratio_range)
-            cockpit_length = cockpit_length_ratio * length
-            
-            cockpit_width_ratio = np.random.uniform(*constraints.cockpit_width_ratio_range)
-            cockpit_width = cockpit_width_ratio * beam
-            
-            # Cockpit position: slight variation around center
-            cockpit_position = np.random.uniform(*constraints.cockpit_position_range)
-            
-            # Check if ratios are satisfied
-            length_to_beam = length / beam
-            beam_to_depth = beam / depth
-            
-            valid = (
-                constraints.length_to_beam_ratio_range[0] <= length_to_beam <= constraints.length_to_beam_ratio_range[1]
-                and constraints.beam_to_depth_ratio_range[0] <= beam_to_depth <= constraints.beam_to_depth_ratio_range[1]
-                and rocker_stern <= rocker_bow
-            )
-            
-            if valid:
-                # Create hull params
-                params = Params(
-                    density=900.0,
-                    hull_thickness=hull_thickness,
-                    length=length,
-                    beam=beam,
-                    depth=depth,
-                    cross_section_exponent=cross_section_exponent,
-                    beam_position=beam_position,
-                    rocker_bow=rocker_bow,
-                    rocker_stern=rocker_stern,
-                    rocker_position=rocker_position,
-                    rocker_exponent=rocker_exponent,
-                    cockpit_opening=cockpit_opening,
-                    cockpit_length=cockpit_length,
-                    cockpit_width=cockpit_width,
-                    cockpit_position=cockpit_position
-                )
-                try:
-                    hull = Hull(params)
-                except:
-                    continue  # Invalid hull, try again
-
-                hulls.append(hull)
-                break
-    
+    while len(hulls) < n:
+        hulls += build_hulls(draw(n - len(hulls)), workers)
     return hulls
-
@@ -1,156 +1,333 @@
 """
 This is the function that takes in a function F: Hullparams, Inputparams -> Score as well as a domain across the input parameters and then outputs.
-
+Trials are stored in an optuna study (SQLite by default), so a run can be resumed, extended or inspected later, and can be run by several worker processes at once.
 """
 
 
 
 
+import time as timer
+import multiprocessing
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+import numpy as np
 import optuna
+from hullopt import config
 from hullopt.hull.params import Params
 from hullopt.hull.hull import Hull
 from hullopt.hull.constraints import Constraints
-import hullopt
+
+# 970 kg/m^3 is typical for High-Density Polyethylene (HDPE) used in kayaks
+FIXED_DENSITY = 900.0
+
+# Objectives of a Pareto study (see optimise's objectives): each of F's metrics, in the direction that makes a hull better
+PARETO_OBJECTIVES = {
+    "overall_stability": "maximize",
+    "initial_stability": "maximize",
+    "diminishing_stability": "maximize",
+    "tipping_point": "maximize",
+    "righting_energy": "maximize",
+    "overall_buoyancy": "maximize",
+    "initial_buoyancy": "maximize",
+}
 
 
-def hull_constraints(trial):
+def hull_constraints(trial, Constraint: Optional[Constraints] = None):
     """
     This is to avoid check_hull failing too much.
+    Violation magnitudes of the trial's hull under Constraint (default Constraints()), plus preferences for the rocker
     """
+    params = _params_from_trial(trial.params)
+    _, violations = (Constraint or Constraints()).check_params_batch(Constraints.params_array([params]))
+    violations = [float(v[0]) for v in violations.values()]
 
-    l = trial.params.get("length", 3.0)
-    b = trial.params.get("beam", 0.6)
-    d = trial.params.get("depth", 0.3)
-    rb = trial.params.get("rocker_bow", 0.2)
-    rs = trial.params.get("rocker_stern", 0.2)
-    violations = []
-    l_b_ratio = l / b
-    violations.append(3.0 - l_b_ratio)  
-    violations.append(l_b_ratio - 7.5)  
-
-    # Ratio: Beam to Depth (1.5 to 3.0)
-    b_d_ratio = b / d
-    violations.append(1.5 - b_d_ratio)  
-    violations.append(b_d_ratio - 3.0) 
-
-
+    rb = params.rocker_bow
+    rs = params.rocker_stern
     violations.append(rs - rb)     
 
     violations.append(abs(rb - rs) - 0.05)
 
     return violations
 
-best_score = float('-inf')
-best_dic = {}
+def _params_from_trial(params: Dict[str, float]) -> Params:
+    return Params.from_ratio_parameterisation(
+        density=FIXED_DENSITY,
+        hull_thickness=params["hull_thickness"],
+        length=params["length"],
+        length_beam_ratio=params["length_beam_ratio"],
+        beam_depth_ratio=params["beam_depth_ratio"],
+        cross_section_exponent=params["cross_section_exponent"],
+        beam_position=params["beam_position"],
+        rocker_bow=params["rocker_bow"],
+        rocker_stern=params["rocker_stern"],
+        rocker_position=params["rocker_position"],
+        rocker_exponent=params["rocker_exponent"],
+        cockpit_length_ratio=params["cockpit_length_ratio"],
+        cockpit_width_ratio=params["cockpit_width_ratio"],
+        cockpit_position=params["cockpit_position"],
+        cockpit_opening=False
+    )
+
 
-def optimise(F, Constraint: Constraints, time=1) -> Params:
+# Stages of a trial, timed into its "timings" user attribute
+TRIAL_STAGES = ("suggest", "constraints", "screen", "mesh", "evaluate")
+
+
+class ScreenedOut(Exception):
     """
-    Optimizes hull parameters to maximize score from function F using Bayesian Optimization.
-    
-    Args:
-        F: A function that takes a Params object and returns a float score.
-        Constraint: An instance of Constraints defining the search space.
-        
-    Returns:
-        The best Params object found within the time limit.
+    Raised by a trial the screen rules out: it ends failed, so neither the sampler nor best/front selection sees a surrogate score
     """
-    
 
-    # 970 kg/m^3 is typical for High-Density Polyethylene (HDPE) used in kayaks
-    FIXED_DENSITY = 900.0 
-    best_score = float('-inf')
-    best_dict = {}
-   
-    
+
+def _simulations(F) -> Optional[int]:
+    # Simulations the last call of F ran, if F counts them (as Aggregator.f does)
+    return getattr(getattr(F, "__self__", None), "simulations", None)
+
+
+def _incumbent(study: optuna.Study) -> Optional[float]:
+    try:
+        return study.best_value
+    except ValueError:
+        return None  # No feasible trial has finished yet
+
+
+def _objective(F, Constraint: Constraints, screen: Optional[Callable[[Params], Tuple[float, float]]] = None,
+               objectives: Optional[Dict[str, str]] = None) -> Callable[[optuna.Trial], Union[float, List[float]]]:
     def objective(trial):
+        timings = {}
+        start = timer.perf_counter()
+        def stage(name):
+            nonlocal start
+            now = timer.perf_counter()
+            timings[name] = now - start
+            start = now
 
-        p_len = trial.suggest_float("length", *Constraint.length_range)
-        p_len_beam_ratio = trial.suggest_float("length_beam_ratio", *Constraint.length_to_beam_ratio_range)
-        p_beam_depth_ratio = trial.suggest_float("beam_depth_ratio", *Constraint.beam_to_depth_ratio_range)
-        p_thick = trial.suggest_float("hull_thickness", *Constraint.hull_thickness_range)
-        
-        p_cs_exp = trial.suggest_float("cross_section_exponent", *Constraint.cross_section_exponent_range)
-        p_beam_pos = trial.suggest_float("beam_position", *Constraint.beam_position_range)
-        
-        p_r_bow = trial.suggest_float("rocker_bow", *Constraint.rocker_bow_range)
-        p_r_stern = trial.suggest_float("rocker_stern", *Constraint.rocker_stern_range)
-        p_r_pos = trial.suggest_float("rocker_position", *Constraint.rocker_position_range)
-        p_r_exp = trial.suggest_float("rocker_exponent", *Constraint.rocker_exponent_range)
-        
-        p_c_len_ratio = trial.suggest_float("cockpit_length_ratio", *Constraint.cockpit_length_ratio_range)
-        p_c_wid_ratio = trial.suggest_float("cockpit_width_ratio", *Constraint.cockpit_width_ratio_range)
-        p_c_pos = trial.suggest_float("cockpit_position", *Constraint.cockpit_position_range)
-
-        current_params = Params.from_ratio_parameterisation(
-            density=FIXED_DENSITY,
-            hull_thickness=p_thick,
-            length=p_len,
-            length_beam_ratio=p_len_beam_ratio,
-            beam_depth_ratio=p_beam_depth_ratio,
-            cross_section_exponent=p_cs_exp,
-            beam_position=p_beam_pos,
-            rocker_bow=p_r_bow,
-            rocker_stern=p_r_stern,
-            rocker_position=p_r_pos,
-            rocker_exponent=p_r_exp,
-            cockpit_length_ratio=p_c_len_ratio,
-            cockpit_width_ratio=p_c_wid_ratio,
-            cockpit_position=p_c_pos,
-            cockpit_opening=False
-        )
-        print(f"Running Aggregator on: {current_params}")
-        try:
-            Constraint.check_hull(Hull(current_params))
-        except ValueError:
-            print("Trial pruned: Constraints not met!")
-            raise optuna.TrialPruned()
-        import traceback
         try:
-            score, dic = F(Hull(current_params))
-            if score > hullopt.optimise.best_score:
-                hullopt.optimise.best_score = score
-                hullopt.optimise.best_dict = dic
-
-            return score
-        except Exception as e:
-            traceback.print_exc()
-            return float('-inf')
-        
-    optuna.logging.set_verbosity(optuna.logging.WARNING) 
+            trial.suggest_float("length", *Constraint.length_range)
+            trial.suggest_float("length_beam_ratio", *Constraint.length_to_beam_ratio_range)
+            trial.suggest_float("beam_depth_ratio", *Constraint.beam_to_depth_ratio_range)
+            trial.suggest_float("hull_thickness", *Constraint.hull_thickness_range)
+
+            trial.suggest_float("cross_section_exponent", *Constraint.cross_section_exponent_range)
+            trial.suggest_float("beam_position", *Constraint.beam_position_range)
+
+            trial.suggest_float("rocker_bow", *Constraint.rocker_bow_range)
+            trial.suggest_float("rocker_stern", *Constraint.rocker_stern_range)
+            trial.suggest_float("rocker_position", *Constraint.rocker_position_range)
+            trial.suggest_float("rocker_exponent", *Constraint.rocker_exponent_range)
+
+            trial.suggest_float("cockpit_length_ratio", *Constraint.cockpit_length_ratio_range)
+            trial.suggest_float("cockpit_width_ratio", *Constraint.cockpit_width_ratio_range)
+            trial.suggest_float("cockpit_position", *Constraint.cockpit_position_range)
+
+            current_params = _params_from_trial(trial.params)
+            stage("suggest")
+            print(f"Running Aggregator on: {current_params}")
+            # Params alone decide the constraints, so rejected trials never build a mesh
+            try:
+                Constraint.check_params(current_params)
+            except ValueError:
+                print("Trial pruned: Constraints not met!")
+                raise optuna.TrialPruned()
+            finally:
+                stage("constraints")
+            if screen is not None:
+                # Designs the surrogate is confident cannot beat the incumbent are not simulated
+                incumbent = _incumbent(trial.study)
+                if incumbent is not None:
+                    expected, optimistic = screen(current_params)
+                    stage("screen")
+                    if optimistic <= incumbent:
+                        print(f"Trial screened: optimistic score {optimistic} does not beat {incumbent}")
+                        trial.set_user_attr("screened", {"expected": expected, "optimistic": optimistic, "incumbent": incumbent})
+                        raise ScreenedOut(f"Trial screened: optimistic score {optimistic} does not beat {incumbent}")
+            import traceback
+            try:
+                # Built once, and passed through to F
+                hull = Hull(current_params, constraints=Constraint)
+                stage("mesh")
+                score, dic = F(hull)
+                stage("evaluate")
+                simulations = _simulations(F)
+                if simulations is not None:
+                    trial.set_user_attr("simulations", simulations)
+                # Kept with the trial, so the best hull's metrics come from the study rather than shared state
+                trial.set_user_attr("metrics", {k: float(v) for k, v in dic.items()})
+                if objectives is not None:
+                    return [float(dic[k]) for k in objectives]
+                return score
+            except Exception as e:
+                traceback.print_exc()
+                if objectives is not None:
+                    # The worst value in every objective
+                    return [float('-inf') if direction == "maximize" else float('inf') for direction in objectives.values()]
+                return float('-inf')
+        finally:
+            # One storage write per trial, however it ends
+            trial.set_user_attr("timings", timings)
+    return objective
+
+
+def timing_report(study: optuna.Study) -> Dict[str, Tuple[int, float]]:
+    """
+    (trials reaching it, total seconds) per trial stage, over the study's trials. Prints a summary
+    """
+    report = {}
+    for name in TRIAL_STAGES:
+        times = [trial.user_attrs["timings"][name] for trial in study.trials if name in trial.user_attrs.get("timings", {})]
+        report[name] = (len(times), sum(times))
+    total = sum(t for _, t in report.values())
+    for name, (n, t) in report.items():
+        print(f"  {name:>11}: {n:5d} trials, {t:9.3f} s total, {t / max(n, 1) * 1e3:9.3f} ms mean ({t / (total or 1):6.1%})")
+    return report
+
+
+def screening_report(study: optuna.Study) -> Dict[str, float]:
+    """
+    Trials screened out and simulated, simulations per simulated trial, and the simulations the screened trials saved
+    (in total and per hour of the study's trials). Prints a summary
+    """
+    finished = [trial for trial in study.trials if trial.datetime_start is not None and trial.datetime_complete is not None]
+    screened = [trial for trial in finished if "screened" in trial.user_attrs]
+    simulated = [trial.user_attrs["simulations"] for trial in finished if "simulations" in trial.user_attrs]
+    hours = (max(t.datetime_complete for t in finished) - min(t.datetime_start for t in finished)).total_seconds() / 3600 if finished else 0
+    per_trial = sum(simulated) / len(simulated) if simulated else 0
+    saved = len(screened) * per_trial
+    report = {"screened": len(screened), "simulated": len(simulated), "simulations_per_trial": per_trial,
+              "simulations_saved": saved, "simulations_saved_per_hour": saved / hours if hours > 0 else 0}
+    print(f"  {len(screened)} trials screened out, {len(simulated)} simulated ({per_trial:.1f} simulations each): "
+          f"~{saved:.0f} simulations saved, {report['simulations_saved_per_hour']:.0f} per hour")
+    return report
 
-    sampler = optuna.samplers.TPESampler(
-        constraints_func=hull_constraints,
+
+def _storage(storage: str) -> optuna.storages.RDBStorage:
+    # Waits out the other workers' writes rather than failing with "database is locked"
+    engine_kwargs = {"connect_args": {"timeout": 60}} if storage.startswith("sqlite") else {}
+    return optuna.storages.RDBStorage(storage, engine_kwargs=engine_kwargs)
+
+
+def _sampler(Constraint: Constraints) -> optuna.samplers.BaseSampler:
+    return optuna.samplers.TPESampler(
+        constraints_func=partial(hull_constraints, Constraint=Constraint),
         multivariate=True
 
     )
+
+
+def _optimise_worker(F, Constraint: Constraints, storage: str, study_name: str, timeout: float, max_trials: Optional[int], screen=None,
+                     objectives: Optional[Dict[str, str]] = None) -> None:
+    # The objective reports its own errors, the only failed trials are screened ones, which optuna would log with a traceback each
+    optuna.logging.set_verbosity(optuna.logging.ERROR)
+    study = optuna.load_study(study_name=study_name, storage=_storage(storage), sampler=_sampler(Constraint))
+    callbacks = [optuna.study.MaxTrialsCallback(max_trials, states=None)] if max_trials is not None else []
+    study.optimize(_objective(F, Constraint, screen, objectives), timeout=timeout, callbacks=callbacks, catch=(ScreenedOut,))
+
+
+def optimise(F, Constraint: Constraints, time=1, storage: str = "sqlite:///hullopt_study.db", study_name: str = "hullopt",
+             workers: int = 1, n_trials: Optional[int] = None, screen: Optional[Callable[[Params], Tuple[float, float]]] = None,
+             objectives: Optional[Dict[str, str]] = None) -> Union[Params, List[Params]]:
+    """
+    Optimizes hull parameters to maximize score from function F using Bayesian Optimization.
     
-    study = optuna.create_study(direction="maximize", sampler=sampler)
+    Args:
+        F: A function that takes a Params object and returns a float score.
+        Constraint: An instance of Constraints defining the search space.
+        time: Minutes to run for.
+        storage: Database URL of the study. An existing study of the same name is resumed, adding to its trials.
+        study_name: Name of the study in storage.
+        workers: Processes running trials at once (0 for one per CPU). With more than one, each works on its own copy of F,
+                 so an Aggregator's GP updates stay in its worker and are lost when it exits: the caller's surrogates are not
+                 updated by a parallel run (the simulations themselves are kept in the shared ResultStorage, to refit from).
+        n_trials: Stop once this many more trials have run, if before the time limit.
+        screen: Scores params without simulating, as (expected, optimistic) scores (e.g. Aggregator.screen). Once the study has
+                a best score, trials whose optimistic score does not beat it are not run through F: they end failed, with their
+                screened scores in the "screened" user attribute, so only simulated scores reach the sampler and the best trial.
+        objectives: Metrics of F to optimise jointly, each "maximize" or "minimize" (e.g. PARETO_OBJECTIVES), instead of its score.
+                    The study keeps the Pareto front of the metric vector, so any weighting can be answered later by rerank without
+                    simulating. F's weights then only split its simulation budget.
+        
+    Returns:
+        The best Params object in the study (see best_result for its score and metrics), or with objectives,
+        the Params of each hull on the study's Pareto front (see pareto_front and rerank).
+    """
+    optuna.logging.set_verbosity(optuna.logging.WARNING) 
+    if objectives is not None and screen is not None:
+        raise ValueError("Screening compares single scores, it cannot be used with objectives")
+
+    directions = {"directions": list(objectives.values())} if objectives is not None else {"direction": "maximize"}
+    study = optuna.create_study(**directions, sampler=_sampler(Constraint), storage=_storage(storage), study_name=study_name, load_if_exists=True)
+    if objectives is not None:
+        study.set_user_attr("objectives", list(objectives))
+    max_trials = len(study.trials) + n_trials if n_trials is not None else None
+    workers = workers or multiprocessing.cpu_count()
     
     print("Starting Bayesian Optimization...")
-    print(f"Time limit: {time} minutes")
+    print(f"Time limit: {time} minutes, {workers} workers, {len(study.trials)} trials already in {study_name}")
     
-    study.optimize(objective, timeout=time * 60)
+    if workers == 1:
+        _optimise_worker(F, Constraint, storage, study_name, time * 60, max_trials, screen, objectives)
+    else:
+        processes = [multiprocessing.Process(target=_optimise_worker, args=(F, Constraint, storage, study_name, time * 60, max_trials, screen, objectives))
+                     for _ in range(workers)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+    study = optuna.load_study(study_name=study_name, storage=_storage(storage))
+    if objectives is not None:
+        front = study.best_trials
+        print(f"Optimization finished. {len(front)} hulls on the Pareto front")
+        print("Time per trial stage:")
+        timing_report(study)
+        return [_params_from_trial(trial.params) for trial in front]
 
     best_trial = study.best_trial
+    # Only this process writes these, once the workers are done
+    study.set_user_attr("best_trial", best_trial.number)
+    study.set_user_attr("best_score", best_trial.value)
+    study.set_user_attr("best_metrics", best_trial.user_attrs.get("metrics", {}))
     
     print(f"Optimization finished. Best Score: {best_trial.value}")
+    print("Time per trial stage:")
+    timing_report(study)
+    if screen is not None:
+        print("Pre-screening:")
+        screening_report(study)
     
-    best_params = Params.from_ratio_parameterisation(
-        density=FIXED_DENSITY,
-        hull_thickness=best_trial.params["hull_thickness"],
-        length_beam_ratio=best_trial.params["length_beam_ratio"],
-        beam_depth_ratio=best_trial.params["beam_depth_ratio"],
-        length=best_trial.params["length"],
-        cross_section_exponent=best_trial.params["cross_section_exponent"],
-        beam_position=best_trial.params["beam_position"],
-        rocker_bow=best_trial.params["rocker_bow"],
-        rocker_stern=best_trial.params["rocker_stern"],
-        rocker_position=best_trial.params["rocker_position"],
-        rocker_exponent=best_trial.params["rocker_exponent"],
-        cockpit_length_ratio=best_trial.params["cockpit_length_ratio"],
-        cockpit_width_ratio=best_trial.params["cockpit_width_ratio"],
-        cockpit_position=best_trial.params["cockpit_position"],
-        cockpit_opening=False
-    )
-    
-    return best_params
+    return _params_from_trial(best_trial.params)
+
+
+def best_result(storage: str = "sqlite:///hullopt_study.db", study_name: str = "hullopt") -> Tuple[Params, float, Dict[str, Any]]:
+    """
+    The best hull's params, score and metrics recorded by optimise in a study
+    """
+    study = optuna.load_study(study_name=study_name, storage=_storage(storage))
+    best_trial = study.trials[study.user_attrs["best_trial"]]
+    return _params_from_trial(best_trial.params), study.user_attrs["best_score"], study.user_attrs["best_metrics"]
+
+
+def pareto_front(storage: str = "sqlite:///hullopt_study.db", study_name: str = "hullopt") -> List[Tuple[Params, Dict[str, Any]]]:
+    """
+    The params and metrics of each hull on the Pareto front of a study run with objectives
+    """
+    study = optuna.load_study(study_name=study_name, storage=_storage(storage))
+    return [(_params_from_trial(trial.params), trial.user_attrs["metrics"]) for trial in study.best_trials]
+
+
+def rerank(user_weights: Dict[str, float], storage: str = "sqlite:///hullopt_study.db", study_name: str = "hullopt") -> Tuple[Params, float, Dict[str, Any]]:
+    """
+    The best stored hull's params, score and metrics under user_weights, scored from the stored metrics of every feasible trial
+    (as best_trial and the Pareto front count them) without simulating.
+    Any study optimise has run can be reranked, though only a study with objectives is searched without favouring one weighting
+    """
+    study = optuna.load_study(study_name=study_name, storage=_storage(storage))
+    trials = [trial for trial in study.get_trials(deepcopy=False, states=(optuna.trial.TrialState.COMPLETE,))
+              if set(config.hyperparameters.weight_normalisers) <= set(trial.user_attrs.get("metrics", {}))
+              and all(c <= 0 for c in trial.constraints.values())]
+    if not trials:
+        raise ValueError(f"No trials with metrics in {study_name}")
+    metrics = {k: np.asarray([trial.user_attrs["metrics"][k] for trial in trials]) for k in config.hyperparameters.weight_normalisers}
+    scores = config.hyperparameters.weighted_score(metrics, user_weights)
+    best = trials[int(np.argmax(scores))]
+    return _params_from_trial(best.params), float(np.max(scores)), best.user_attrs["metrics"]
@@ -1,5 +1,5 @@
 from . import analytic, static
-from .result import Result
+from .result import Result, SweepResult
 from .params import Params
 
-__all__ = ["analytic", "static", "Result", "Params"]
+__all__ = ["analytic", "static", "Result", "SweepResult", "Params"]
@@ -3,15 +3,16 @@ Analytic Simulation
 """
 
 from functools import reduce, partial
-from typing import Tuple, cast
+from typing import Optional, Tuple, cast
 import numpy as np
 from scipy import optimize
 import trimesh
 from trimesh import Trimesh, Scene
 from hullopt import config, Hull
 from .params import Params
-from .result import Result
+from .result import Result, SweepResult
 from .storage import ResultStorage
+from .hydrostatics import Hydrostatics, displacing_faces
 
 
 
@@ -69,10 +70,16 @@ def _calculate_centre_buoyancy_and_displacement(mesh: Trimesh, draught: float) -
     reduce(lambda acc, m: m.volume + acc, water_displaced, 0) * config.constants.water_density,\
     submerged.volume * config.constants.water_density
 
-def _calculate_righting_moment(mesh: Trimesh, hull_density: float, draught: float) -> Tuple[float, float, float]:
-  cob, _, _ = _calculate_centre_buoyancy_and_displacement(mesh, draught)
-  righting_lever = cob - mesh.center_mass
-  gravity_force = mesh.volume * hull_density * config.constants.gravity_on_earth * np.array([0,0,-1])
+def _calculate_righting_moment(mesh: Trimesh, hull_density: float, draught: float, hydrostatics: Optional[Hydrostatics] = None) -> Tuple[float, float, float]:
+  if hydrostatics is None:
+    cob, _, _ = _calculate_centre_buoyancy_and_displacement(mesh, draught)
+  else:
+    cob, _, _ = hydrostatics.centre_buoyancy_and_displacement(draught)
+  return _righting_moment(cob, mesh.center_mass, mesh.volume * hull_density)
+
+def _righting_moment(cob, center_mass, mass: float) -> Tuple[float, float, float]:
+  righting_lever = np.asarray(cob) - center_mass
+  gravity_force = mass * config.constants.gravity_on_earth * np.array([0,0,-1])
   righting_moment = np.cross(righting_lever, gravity_force)
   return tuple(righting_moment)
 
@@ -123,6 +130,14 @@ def _scene_draught(mesh: Trimesh, draught: float) -> Scene:
   return trimesh.Scene([mesh, water] + air_pockets)
 
 def run(hull: Hull, params: Params, use_cache: bool = True) -> Result:
+  """
+  use_cache: return the stored result for this hull and params if there is one (without a scene), otherwise store the new result
+  """
+  if use_cache:
+    cached = storage.lookup(params, hull)
+    if cached is not None:
+      return cached
+
   # temporary fix for weirdness in this range
   if 1.5 < params.heel < 2.8:
     res = run(hull, Params(-params.heel), use_cache=False)
@@ -141,19 +156,92 @@ def run(hull: Hull, params: Params, use_cache: bool = True) -> Result:
   mesh = hull.mesh.copy().apply_transform(T)
   R = trimesh.transformations.rotation_matrix(params.heel, [1,0,0], hull.mesh.center_mass)
   mesh.apply_transform(R)
-  iterations_draught, draught = _iterate_draught(mesh, hull_density)
-  iterations_reserve_buoyancy, reserve_buoyancy, reserve_buoyancy_hull =\
-    _reserve_buoyancy(mesh, hull_density, draught)
+  try:
+    hydrostatics: Optional[Hydrostatics] = Hydrostatics.from_mesh(mesh)
+  except ValueError:
+    # Open hulls (e.g. with a cockpit) fall back to slicing the mesh at each draught
+    hydrostatics = None
+  if hydrostatics is None:
+    iterations_draught, draught = _iterate_draught(mesh, hull_density)
+    iterations_reserve_buoyancy, reserve_buoyancy, reserve_buoyancy_hull =\
+      _reserve_buoyancy(mesh, hull_density, draught)
+    iterations = iterations_draught + iterations_reserve_buoyancy
+  else:
+    _, draught = hydrostatics.draught(hull_density)
+    _, reserve_buoyancy, reserve_buoyancy_hull = hydrostatics.reserve_buoyancy(hull_density, draught)
+    iterations = config.hyperparameters.hydrostatic_table_iterations
   new_result = Result(
-        righting_moment=_calculate_righting_moment(mesh, hull_density, draught),
+        righting_moment=_calculate_righting_moment(mesh, hull_density, draught, hydrostatics),
         reserve_buoyancy=float(reserve_buoyancy),
         reserve_buoyancy_hull=reserve_buoyancy_hull,
         scene=_scene_draught(mesh, draught),
-        cost=config.hyperparameters.cost_analytic(iterations_draught + iterations_reserve_buoyancy)
+        cost=config.hyperparameters.cost_analytic(iterations)
     )
   if use_cache:
         storage.store(new_result, params, hull)
   return new_result
 
+def _heel_rotations(heels: np.ndarray) -> np.ndarray:
+  """
+  Stacked (n, 3, 3) rotation matrices about the x axis for each heel angle
+  """
+  c, s = np.cos(heels), np.sin(heels)
+  rotations = np.zeros((len(heels), 3, 3))
+  rotations[:, 0, 0] = 1
+  rotations[:, 1, 1], rotations[:, 1, 2] = c, -s
+  rotations[:, 2, 1], rotations[:, 2, 2] = s, c
+  return rotations
+
+def run_sweep(hull: Hull, heels, use_cache: bool = True) -> SweepResult:
+  """
+  Simulate hull at every heel angle in heels, sharing the per-hull work (mass properties, mesh topology and triangle arrays) across angles.
+  Same results as run at each heel, without scenes. With use_cache, only heels missing from the storage are simulated.
+  """
+  heels = np.asarray(heels, dtype=np.float64).reshape(-1)
+  cached = [storage.lookup(Params(float(heel)), hull) if use_cache else None for heel in heels]
+  results = SweepResult(heels=heels,
+                        righting_moments=np.zeros((len(heels), 3)),
+                        reserve_buoyancy=np.zeros(len(heels)),
+                        reserve_buoyancy_hull=np.zeros(len(heels)),
+                        costs=np.zeros(len(heels)))
+  for i, r in enumerate(cached):
+    if r is not None:
+      results.righting_moments[i] = r.righting_moment
+      results.reserve_buoyancy[i], results.reserve_buoyancy_hull[i], results.costs[i] = r.reserve_buoyancy, r.reserve_buoyancy_hull, r.cost
+  todo = np.asarray([r is None for r in cached], dtype=bool)
+  if not np.any(todo):
+    return results
+  try:
+    displacing = displacing_faces(hull.mesh)
+  except ValueError:
+    # Open hulls (e.g. with a cockpit) fall back to a full simulation per heel
+    return SweepResult.from_results(heels, [r if r is not None else run(hull, Params(float(heel)), use_cache=use_cache) for heel, r in zip(heels, cached)])
+
+  # temporary fix for weirdness in this range (see run)
+  mirrored = (1.5 < heels[todo]) & (heels[todo] < 2.8)
+  rotations = _heel_rotations(np.where(mirrored, -heels[todo], heels[todo]))
+
+  # As in run: translate the mesh by its centre of mass, then heel about the original centre of mass
+  centre = hull.mesh.center_mass
+  volume = hull.mesh.volume
+  mass = volume * hull.density
+  triangles = np.asarray(hull.mesh.triangles, dtype=np.float64)
+  heeled = np.einsum('kij,ntj->knti', rotations, triangles) + centre
+  centres = rotations @ centre + centre
+
+  for k, i in enumerate(np.flatnonzero(todo)):
+    hydrostatics = Hydrostatics(heeled[k], displacing, volume)
+    _, draught = hydrostatics.draught(hull.density)
+    _, results.reserve_buoyancy[i], results.reserve_buoyancy_hull[i] = hydrostatics.reserve_buoyancy(hull.density, draught)
+    cob, _, _ = hydrostatics.centre_buoyancy_and_displacement(draught)
+    results.righting_moments[i] = _righting_moment(cob, centres[k], mass)
+    if mirrored[k]:
+      results.righting_moments[i, 0] *= -1
+    results.costs[i] = config.hyperparameters.cost_analytic(config.hyperparameters.hydrostatic_table_iterations)
+
+  if use_cache:
+    storage.store_many([results.result(i) for i in np.flatnonzero(todo)], [Params(float(heels[i])) for i in np.flatnonzero(todo)], hull)
+  return results
+
 
-__all__ = [ "run" ]
+__all__ = [ "run", "run_sweep" ]
@@ -0,0 +1,203 @@
+"""
+Hydrostatic tables for a (heeled) hull mesh.
+Displaced volume and centre of buoyancy as functions of the waterline, computed with the divergence theorem
+over the triangles below the waterline. Taking the origin on the waterline plane makes the cap over the
+waterline contribute nothing, so no slicing, capping or boolean operations are needed.
+"""
+
+from typing import Optional, Tuple
+import numpy as np
+from scipy import optimize
+import trimesh
+from trimesh import Trimesh
+from hullopt import config
+
+
+def _tetra_contributions(q0: np.ndarray, q1: np.ndarray, q2: np.ndarray, h: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+  """
+  Signed volumes and first moments of the tetrahedra (o, q0, q1, q2) with apex o = (0, 0, h) on the waterline
+  """
+  o = np.zeros_like(q0)
+  o[:, 2] = h
+  vol = np.einsum('ij,ij->i', q0 - o, np.cross(q1 - o, q2 - o)) / 6
+  return vol, vol[:, None] * (q0 + q1 + q2 + o) / 4
+
+def _clipped_contributions(triangles: np.ndarray, h: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+  """
+  Volume and moment contributions of the parts of triangles below waterlines h.
+  Each triangle must straddle its waterline (min z < h < max z)
+  """
+  z = triangles[:, :, 2]
+  below = z < h[:, None]
+  n_below = below.sum(axis=1)
+
+  # Cyclically rotate (preserving orientation) so vertex a is the odd one out: the only vertex below, or the only vertex above
+  lone = np.where(n_below == 1, np.argmax(below, axis=1), np.argmax(~below, axis=1))
+  rows = np.arange(len(triangles))[:, None]
+  rotated = triangles[rows, (lone[:, None] + np.arange(3)) % 3]
+  a, b, c = rotated[:, 0], rotated[:, 1], rotated[:, 2]
+
+  def intersect(u, v):
+    t = (h - u[:, 2]) / (v[:, 2] - u[:, 2])
+    return u + t[:, None] * (v - u)
+  ab, ca = intersect(a, b), intersect(c, a)
+
+  # One vertex below: the submerged part is triangle (a, ab, ca)
+  # Two vertices below: the submerged part is quad (ab, b, c, ca), split into (ab, b, c) and (ab, c, ca)
+  one = n_below == 1
+  vol_1, mom_1 = _tetra_contributions(np.where(one[:, None], a, ab), np.where(one[:, None], ab, b), np.where(one[:, None], ca, c), h)
+  vol_2, mom_2 = _tetra_contributions(ab, c, ca, h)
+  vol_2[one] = 0
+  mom_2[one] = 0
+  return vol_1 + vol_2, mom_1 + mom_2
+
+
+class _TriangleSet:
+  """
+  Triangles of a closed surface (or union of closed surfaces), pre-sorted for waterline sweeps
+  """
+  def __init__(self, triangles: np.ndarray) -> None:
+    z = triangles[:, :, 2]
+    order = np.argsort(z.max(axis=1), kind='stable')
+    self.triangles = triangles[order]
+    self.z_min = z.min(axis=1)[order]
+    self.z_max = z.max(axis=1)[order]
+
+    p0, p1, p2 = self.triangles[:, 0], self.triangles[:, 1], self.triangles[:, 2]
+    # Full triangle tetra with apex (0,0,h): volume (A - hB)/6, moment (A S - h B S + e_z h (A - hB))/24
+    A = np.einsum('ij,ij->i', p0, np.cross(p1, p2))
+    B = (np.cross(p0, p1) + np.cross(p1, p2) + np.cross(p2, p0))[:, 2]
+    S = p0 + p1 + p2
+    def prefix(x): return np.concatenate([np.zeros((1,) + x.shape[1:]), np.cumsum(x, axis=0)])
+    self._A, self._B = prefix(A), prefix(B)
+    self._AS, self._BS = prefix(A[:, None] * S), prefix(B[:, None] * S)
+
+  def _full(self, h: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # Triangles entirely below the waterline are a prefix in z_max order
+    n = np.searchsorted(self.z_max, h, side='right')
+    vol6 = self._A[n] - h * self._B[n]
+    moment = (self._AS[n] - h[:, None] * self._BS[n]) / 24
+    moment[:, 2] += h * vol6 / 24
+    return vol6 / 6, moment
+
+  def evaluate(self, h: float) -> Tuple[float, np.ndarray]:
+    """
+    Exact volume and first moment below a single waterline
+    """
+    vol, moment = self._full(np.asarray([h], dtype=np.float64))
+    straddling = (self.z_min < h) & (h < self.z_max)
+    if np.any(straddling):
+      v, m = _clipped_contributions(self.triangles[straddling], np.full(straddling.sum(), h))
+      return vol[0] + v.sum(), moment[0] + m.sum(axis=0)
+    return vol[0], moment[0]
+
+  def sweep(self, levels: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Exact volumes and first moments below each of the sorted waterlines in levels, in one pass
+    """
+    vol, moment = self._full(levels)
+    # Each triangle straddles a contiguous run of levels
+    lo = np.searchsorted(levels, self.z_min, side='right')
+    hi = np.searchsorted(levels, self.z_max, side='left')
+    counts = np.maximum(hi - lo, 0)
+    tri_idx = np.repeat(np.arange(len(self.triangles)), counts)
+    level_idx = np.repeat(lo, counts) + (np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts))
+    v, m = _clipped_contributions(self.triangles[tri_idx], levels[level_idx])
+    vol += np.bincount(level_idx, weights=v, minlength=len(levels))
+    for k in range(3):
+      moment[:, k] += np.bincount(level_idx, weights=m[:, k], minlength=len(levels))
+    return vol, moment
+
+
+def displacing_faces(mesh: Trimesh) -> np.ndarray:
+  """
+  Mask of the faces bounding the water displaced by a closed hull mesh: every closed component with positive volume.
+  Inverted components (the inside surface of a hollow shell) are the air pockets.
+  Depends only on the mesh's topology and orientation, so is unchanged by heeling the mesh.
+  Raises ValueError for hulls with openings (e.g. a cockpit), as whether their cavity floods depends on the waterline
+  """
+  triangles = np.asarray(mesh.triangles, dtype=np.float64)
+  labels = trimesh.graph.connected_component_labels(mesh.face_adjacency, node_count=len(mesh.faces))
+  # Every closed component of genus 0 has Euler number 2, anything with a handle (e.g. a cockpit opening) has less
+  if mesh.euler_number != 2 * (labels.max() + 1):
+    raise ValueError("Hydrostatic tables require a hull without openings")
+  component_volumes = np.bincount(labels, weights=np.einsum('ij,ij->i', triangles[:, 0], np.cross(triangles[:, 1], triangles[:, 2])))
+  # Nested outward facing components (e.g. a shell whose inside surface was flipped) would be displaced twice
+  if component_volumes[component_volumes > 0].sum() / 6 > mesh.convex_hull.volume:
+    raise ValueError("Hydrostatic tables require air pockets to face inwards")
+  return component_volumes[labels] > 0
+
+
+class Hydrostatics:
+  """
+  Hydrostatic tables for a hull in a fixed (heeled) orientation, with the waterline normal to z.
+  Displacement counts the water displaced by the hull and the sealed air pockets it encloses (see displacing_faces).
+  """
+  def __init__(self, triangles: np.ndarray, displacing: np.ndarray, volume: float, n_levels: Optional[int] = None) -> None:
+    """
+    triangles: (n, 3, 3) triangles of the heeled hull mesh
+    displacing: mask of the triangles bounding the displaced water, from displacing_faces
+    volume: hull (material) volume
+    n_levels: number of evenly spaced waterlines tabulated (defaults to config.hyperparameters.hydrostatic_table_levels)
+    """
+    self.volume = float(volume)
+    self._displacing = _TriangleSet(triangles[displacing])
+    self._all = _TriangleSet(triangles)
+
+    n_levels = n_levels or config.hyperparameters.hydrostatic_table_levels
+    self.levels = np.linspace(triangles[:, :, 2].min(), triangles[:, :, 2].max(), n_levels)
+    self.displaced_volumes, _ = self._displacing.sweep(self.levels)
+
+  @classmethod
+  def from_mesh(cls, mesh: Trimesh, n_levels: Optional[int] = None) -> "Hydrostatics":
+    """
+    Tables for a heeled hull mesh. Raises ValueError if the hull is not supported (see displacing_faces)
+    """
+    return cls(np.asarray(mesh.triangles, dtype=np.float64), displacing_faces(mesh), mesh.volume, n_levels)
+
+  def centre_buoyancy_and_displacement(self, draught: float) -> Tuple[Tuple[float, float, float], float, float]:
+    """
+    Same outputs as analytic._calculate_centre_buoyancy_and_displacement:
+    centre of buoyancy, displacement (kg, including air pockets) and displacement of the hull alone (kg)
+    """
+    draught = float(np.asarray(draught).item())
+    volume, moment = self._displacing.evaluate(draught)
+    hull_volume, _ = self._all.evaluate(draught)
+    cob = moment / volume if volume > 0 else np.array([0.0, 0.0, draught])
+    return tuple(cob), volume * config.constants.water_density, hull_volume * config.constants.water_density
+
+  def draught(self, hull_density: float) -> Tuple[int, float]:
+    """
+    Waterline at which displacement equals the hull's weight.
+    Returns (iterations, draught), iterations counting the exact evaluations made
+    """
+    target = self.volume * hull_density / config.constants.water_density
+    lower = self.levels[0] + 0.001 # 1mm buffer, as in analytic._iterate_draught
+    upper = self.levels[-1] - 0.001
+    if self._displacing.evaluate(upper)[0] < target:
+      # Hull sinks
+      return 1, upper
+
+    # O(log n) bracket from the (monotone) displacement table, then solve exactly within it
+    i = int(np.clip(np.searchsorted(self.displaced_volumes, target), 1, len(self.levels) - 1))
+    lower, upper = max(self.levels[i - 1], lower), min(self.levels[i], upper)
+    draught, result = optimize.brentq(lambda h: self._displacing.evaluate(h)[0] - target,
+                                      lower, upper,
+                                      xtol=config.hyperparameters.draught_threshold * (self.levels[-1] - self.levels[0]),
+                                      maxiter=config.hyperparameters.draught_max_iterations,
+                                      full_output=True)
+    return 1 + result.function_calls, float(draught)
+
+  def reserve_buoyancy(self, hull_density: float, draught: float) -> Tuple[int, float, float]:
+    """
+    Same outputs as analytic._reserve_buoyancy: (iterations, reserve buoyancy, reserve buoyancy of the hull alone), in kg
+    The greatest displacement above the draught is read from the table, then evaluated exactly
+    """
+    weight = self.volume * hull_density
+    above = np.flatnonzero(self.levels > draught)
+    _, displacement, hull_displacement = self.centre_buoyancy_and_displacement(draught)
+    if len(above) == 0:
+      return 1, displacement - weight, hull_displacement - weight
+    best = self.levels[above[np.argmax(self.displaced_volumes[above])]]
+    _, displacement2, hull_displacement2 = self.centre_buoyancy_and_displacement(best)
+    return 2, max(displacement, displacement2) - weight, max(hull_displacement, hull_displacement2) - weight
@@ -0,0 +1,16 @@
+"""
+One-shot migration of a legacy gp_data.pkl pickle stream into a result store.
+Usage: python -m hullopt.simulations.migrate <gp_data.pkl> [<gp_data.db>]
+"""
+import os
+import sys
+from .storage import ResultStorage, migrate_pickle
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3):
+        print("Usage: python -m hullopt.simulations.migrate <gp_data.pkl> [<gp_data.db>]")
+        sys.exit(1)
+    storage = ResultStorage(sys.argv[2] if len(sys.argv) == 3 else os.path.splitext(sys.argv[1])[0] + ".db")
+    n = migrate_pickle(sys.argv[1], storage)
+    print(f"Migrated {n} records from {sys.argv[1]} to {storage.filepath} ({len(storage)} records stored)")
@@ -1,6 +1,7 @@
 from dataclasses import dataclass, asdict
 from trimesh import Scene
-from typing import Tuple
+from typing import List, Tuple
+import numpy as np
 
 
 @dataclass
@@ -28,3 +29,42 @@ class Result:
 
     def to_dict(self):
         return asdict(self)
+
+
+
+@dataclass
+class SweepResult:
+    """
+    Columnar simulation results for a sweep over heel angles, row i holding the results for heels[i] (units as in Result).
+    Sweeps do not render scenes.
+
+    heels - rad (n,)
+    righting_moments - Nm (n, 3)
+    reserve_buoyancy - kg (n,)
+    reserve_buoyancy_hull - kg (n,)
+    costs - (n,)
+    """
+
+
+    heels: np.ndarray
+    righting_moments: np.ndarray
+    reserve_buoyancy: np.ndarray
+    reserve_buoyancy_hull: np.ndarray
+    costs: np.ndarray
+
+    def __len__(self): return len(self.heels)
+
+    def result(self, i: int) -> Result:
+        return Result(righting_moment=tuple(self.righting_moments[i]),
+                      reserve_buoyancy=float(self.reserve_buoyancy[i]),
+                      reserve_buoyancy_hull=float(self.reserve_buoyancy_hull[i]),
+                      scene=None,
+                      cost=float(self.costs[i]))
+
+    @classmethod
+    def from_results(cls, heels, results: List[Result]) -> "SweepResult":
+        return cls(heels=np.asarray(heels, dtype=np.float64),
+                   righting_moments=np.asarray([r.righting_moment for r in results], dtype=np.float64).reshape(-1, 3),
+                   reserve_buoyancy=np.asarray([r.reserve_buoyancy for r in results], dtype=np.float64),
+                   reserve_buoyancy_hull=np.asarray([r.reserve_buoyancy_hull for r in results], dtype=np.float64),
+                   costs=np.asarray([r.cost for r in results], dtype=np.float64))
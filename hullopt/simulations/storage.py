@@ -1,9 +1,18 @@
+"""
+Simulation result storage.
+Results are rows of an SQLite table: one column per input (hull params, sim params and cost) and per output,
+indexed on a canonical hash of the hull (and non-heel sim params) plus the heel for cache lookups.
+"""
+
 import pickle
 import os
+import sqlite3
+import numpy as np
 from .result import Result
-from dataclasses import asdict
-from typing import Dict, Tuple, Any
+from dataclasses import asdict, fields
+from typing import Dict, Tuple, Any, Optional, List, Iterator
 from hullopt.hull.hull import Params as hullParams
+from hullopt.hull.cache import params_key
 from dataclasses import dataclass, is_dataclass
 
 
@@ -25,80 +34,209 @@ class InputParameters:
 
             if isinstance(source, dict):
                 combined_data.update(source)
-            
+
             elif is_dataclass(source):
                 combined_data.update(asdict(source))
             elif hasattr(source, "__dict__"):
                 combined_data.update(source.__dict__)
-                
+
         return combined_data
 
-class ResultStorage:
-    def __init__(self, filepath: str = "gp_data.pkl"):
-        self.filepath = filepath
-        self.data: Dict[Tuple, Tuple[float, float, float]] = self._load_all()
 
-    def _load_all(self) -> Dict:
-        """
-        Reads the pickle file sequentially. 
-        The file is now a stream of separate pickle objects, not one big dict.
-        """
-        data = {}
-        if os.path.exists(self.filepath):
-            with open(self.filepath, "rb") as f:
-                while True:
-                    try:
-                        entry = pickle.load(f)
-                        key, val = entry
-                        data[key] = val
-                    except EOFError:
-
-                        break
-                    except pickle.UnpicklingError:
-                        print(f"Warning: Corrupt data found in {self.filepath}")
-                        break
-                    
-        return data
-
-    def _append_to_file(self, key: Tuple, value: Any):
-        """
-        Appends a SINGLE entry to the end of the file.
-        This is instant (O(1)), regardless of file size.
-        """
-        assert type(key) is tuple, "Key must be a tuple"
+# Output columns, in the order of the y matrix
+OUTPUT_COLUMNS = ("righting_moment_heel", "righting_moment_pitch", "righting_moment_yaw", "reserve_buoyancy", "reserve_buoyancy_hull")
 
-        with open(self.filepath, "ab") as f:  
+_HULL_FIELDS = tuple(f.name for f in fields(hullParams))
 
-            pickle.dump((key, value), f)
 
+def _hull_key(param_dict: Dict[str, Any]) -> str:
+    """
+    Canonical key of everything but the heel and cost: the hull params and any other sim params
+    """
+    hull_params = hullParams(**{k: param_dict[k] for k in _HULL_FIELDS if k in param_dict})
+    hull_params.cockpit_opening = bool(hull_params.cockpit_opening)
+    return params_key(hull_params, **{k: v for k, v in param_dict.items() if k not in _HULL_FIELDS and k not in ("heel", "cost")})
 
 
+def read_pickle_stream(filepath: str) -> Iterator[Tuple[Dict[str, Any], Tuple]]:
+    """
+    Reads the legacy gp_data.pkl stream of (key tuple, (righting_moment, (reserve_buoyancy, reserve_buoyancy_hull))) records.
+    Stops at the first corrupt record, reporting where
+    """
+    with open(filepath, "rb") as f:
+        n = 0
+        while True:
+            try:
+                key, val = pickle.load(f)
+            except EOFError:
+                break
+            except Exception as e:
+                print(f"Warning: Corrupt data found in {filepath} after {n} records: {e}")
+                break
+            n += 1
+            yield dict(key), val
 
-    def store(self, result_obj: 'Result', sim_params: Any, hull: Any) -> None:
 
-        res_dict = result_obj.to_dict()
-        params = InputParameters(sim_params, hull.params)
+class ResultStorage:
+    """
+    Append-only store of simulation results, also used as a read-through cache by the simulators.
+    Safe for many processes to write to at once: each batch is appended in a single transaction.
+    Results are looked up by their (hull params, sim params) key. The cost of a stored result is kept as an input
+    column (for training data), but is not part of the lookup key.
+    """
+    def __init__(self, filepath: str = "gp_data.db", heel_tolerance: float = 0.0, timeout: float = 60.0):
+        """
+        heel_tolerance: lookups return the nearest stored heel within this many radians, 0 for exact matches only
+        timeout: seconds to wait for other processes writing to the same store before giving up
+        """
+        self.filepath = filepath
+        self.heel_tolerance = heel_tolerance
+        self.timeout = timeout
+        self._pid = os.getpid()
+        self.hits = 0
+        self.misses = 0
+        self._connection: Optional[sqlite3.Connection] = None
+        self._columns: List[str] = []
+
+    def _connect(self, create: bool = True) -> Optional[sqlite3.Connection]:
+        """
+        Opens the database (creating it if create), or returns None if it does not exist yet.
+        Connections are not shared with forked processes, each process opens its own
+        """
+        if self._connection is not None and self._pid != os.getpid():
+            self._connection = None
+        if self._connection is None:
+            if not create and not os.path.exists(self.filepath):
+                return None
+            # Autocommit mode: transactions are begun explicitly, so a batch (including any new columns) commits atomically
+            self._connection = sqlite3.connect(self.filepath, timeout=self.timeout, isolation_level=None)
+            self._pid = os.getpid()
+            # Write-ahead logging lets readers carry on while another process writes
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS results (hull_key TEXT NOT NULL, heel REAL NOT NULL, "
+                + ", ".join(f'"{c}" REAL' for c in OUTPUT_COLUMNS) + ")")
+            self._connection.execute("CREATE INDEX IF NOT EXISTS results_key ON results (hull_key, heel)")
+            self._refresh_columns()
+        return self._connection
+
+    def _refresh_columns(self) -> List[str]:
+        # Other processes may have added columns since we last looked
+        self._columns = [row[1] for row in self._connection.execute("PRAGMA table_info(results)")]
+        return self._columns
+
+    def input_columns(self) -> List[str]:
+        """
+        Names of the stored input columns (hull params, sim params and cost), in sorted order
+        """
+        if self._connect(create=False) is None:
+            return []
+        return sorted(c for c in self._refresh_columns() if c not in OUTPUT_COLUMNS and c != "hull_key")
 
+    def __len__(self) -> int:
+        connection = self._connect(create=False)
+        return 0 if connection is None else connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
 
+    def lookup(self, sim_params: Any, hull: Any) -> Optional[Result]:
+        """
+        Returns the stored result for the hull and sim params (without a scene, and with the cost it took to simulate), or None on a miss
+        """
+        connection = self._connect(create=False)
+        row = None
+        if connection is not None and ("cost" in self._columns or "cost" in self._refresh_columns()):
+            param_dict = InputParameters(sim_params, hull.params).to_dict()
+            heel = float(param_dict["heel"])
+            row = connection.execute(
+                "SELECT " + ", ".join(f'"{c}"' for c in OUTPUT_COLUMNS + ("cost",)) + " FROM results "
+                "WHERE hull_key = ? AND heel BETWEEN ? AND ? ORDER BY ABS(heel - ?) LIMIT 1",
+                (_hull_key(param_dict), heel - self.heel_tolerance, heel + self.heel_tolerance, heel)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return Result(righting_moment=tuple(row[:3]),
+                      reserve_buoyancy=row[3],
+                      reserve_buoyancy_hull=row[4],
+                      scene=None,
+                      cost=row[5])
+
+    def append(self, rows: List[Tuple[Dict[str, Any], Tuple]]) -> None:
+        """
+        Appends (inputs, (righting_moment, (reserve_buoyancy, reserve_buoyancy_hull))) rows in one transaction.
+        inputs maps every input column (hull params, sim params and cost) to its value
+        """
+        if not rows:
+            return
+        connection = self._connect()
+        names = sorted({k for inputs, _ in rows for k in inputs})
+        columns = ["hull_key", *(f'"{c}"' for c in names), *(f'"{c}"' for c in OUTPUT_COLUMNS)]
+        values = [(_hull_key(inputs), *(float(inputs[k]) if k in inputs else None for k in names), *map(float, right_moment), *map(float, buoyancy))
+                  for inputs, (right_moment, buoyancy) in rows]
+        # Take the write lock up front, so concurrent writers queue (up to timeout) rather than interleave
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            missing = [name for name in names if name not in self._refresh_columns()]
+            for name in missing:
+                connection.execute(f'ALTER TABLE results ADD COLUMN "{name}" REAL')
+            connection.executemany(f"INSERT INTO results ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})", values)
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            self._refresh_columns()
+            raise
+        self._columns += missing
+
+    def _row(self, result_obj: 'Result', sim_params: Any, hull: Any) -> Tuple[Dict[str, Any], Tuple]:
+        res_dict = result_obj.to_dict()
+        params = InputParameters(sim_params, hull.params)
         param_dict = params.to_dict()
 
-
-
         right_moment = res_dict.pop('righting_moment')
         assert len(right_moment) == 3, "Expected righting_moment to be a tuple of 3 floats."
         buoyancy = res_dict.pop('reserve_buoyancy')
         hull_buoyancy = res_dict.pop('reserve_buoyancy_hull')
         buoy_tuple = (buoyancy, hull_buoyancy)
-        target_val = (right_moment,buoy_tuple)
-        
+        target_val = (right_moment, buoy_tuple)
+
         if 'scene' in res_dict:
             del res_dict['scene']
-            
-            
+
         merged_data = {**res_dict, **param_dict}
-        key_tuple = tuple(sorted(merged_data.items()))
-        
+        return merged_data, target_val
+
+    def store(self, result_obj: 'Result', sim_params: Any, hull: Any) -> None:
+        self.append([self._row(result_obj, sim_params, hull)])
+
+    def store_many(self, results: List['Result'], sim_params: List[Any], hull: Any) -> None:
+        """
+        Stores the results of one hull at each of sim_params, in one transaction
+        """
+        self.append([self._row(r, p, hull) for r, p in zip(results, sim_params)])
+
+    def to_arrays(self, columns: Optional[List[str]] = None) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+        """
+        Returns the X matrix (inputs), y matrix (outputs, in OUTPUT_COLUMNS order) and the list of column names corresponding to X.
+        columns: input columns of X (defaults to every input column, in sorted order)
+        """
+        columns = list(columns) if columns is not None else self.input_columns()
+        connection = self._connect(create=False)
+        if connection is None or not columns:
+            return np.empty((0, len(columns))), np.empty((0, len(OUTPUT_COLUMNS))), columns
+        rows = connection.execute("SELECT " + ", ".join(f'"{c}"' for c in columns + list(OUTPUT_COLUMNS)) + " FROM results").fetchall()
+        data = np.array(rows, dtype=np.float64).reshape(-1, len(columns) + len(OUTPUT_COLUMNS))
+        return data[:, :len(columns)], data[:, len(columns):], columns
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+def migrate_pickle(pickle_path: str, storage: ResultStorage) -> int:
+    """
+    One-shot migration of a legacy gp_data.pkl stream into storage. Returns the number of records migrated
+    """
+    rows = list(read_pickle_stream(pickle_path))
+    storage.append(rows)
+    return len(rows)
 
-        self.data[key_tuple] = target_val
-        self._append_to_file(key_tuple, target_val)
-        # print(f"Stored result for params: {param_dict}")